@@ -220,6 +220,13 @@ class Bear(Printer, LogPrinter):
             self.warn(error_string)
             raise RuntimeError(error_string)
 
+    def __getstate__(self):
+        # The message queue can only be inherited by processes, whoever
+        # unpickles the bear has to set its own one.
+        state = self.__dict__.copy()
+        state["message_queue"] = None
+        return state
+
     def _print(self, output, **kwargs):
         self.debug(output)
 
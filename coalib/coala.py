@@ -15,15 +15,9 @@ import functools
 
 from pyprint.ConsolePrinter import ConsolePrinter
 
-from coalib.coala_main import run_coala
 from coalib.misc.Exceptions import get_exitcode
-from coalib.collecting.Collectors import filter_capabilities_by_languages
-from coalib.output.ConsoleInteraction import (
-    acquire_settings, nothing_done, print_results, print_section_beginning,
-    show_bears, show_language_bears_capabilities)
 from coalib.output.printers.LogPrinter import LogPrinter
 from coalib.parsing.DefaultArgParser import default_arg_parser
-from coalib.settings.ConfigurationGathering import get_filtered_bears
 
 
 def main():
@@ -34,6 +28,18 @@ def main():
         # not.
         args = default_arg_parser().parse_args()
 
+        # Analysing and printing results take most of the modules, they are
+        # not loaded before the arguments were parsed, so that e.g.
+        # ``coala --version`` starts quickly.
+        from coalib.coala_main import run_coala
+        from coalib.collecting.Collectors import (
+            filter_capabilities_by_languages)
+        from coalib.output.ConsoleInteraction import (
+            acquire_settings, nothing_done, print_results,
+            print_section_beginning, show_bears,
+            show_language_bears_capabilities)
+        from coalib.settings.ConfigurationGathering import get_filtered_bears
+
         if args.show_bears:
             local_bears, global_bears = get_filtered_bears(
                 args.filter_by_language, log_printer)
@@ -15,12 +15,13 @@ import functools
 
 from pyprint.ConsolePrinter import ConsolePrinter
 
-from coalib.coala_main import run_coala
-from coalib.output.ConsoleInteraction import (
-    print_results_no_input, print_section_beginning)
-
 
 def main():
+    # Like in coala, the modules for analysing are loaded only when running.
+    from coalib.coala_main import run_coala
+    from coalib.output.ConsoleInteraction import (
+        print_results_no_input, print_section_beginning)
+
     console_printer = ConsolePrinter()
     partial_print_sec_beg = functools.partial(
         print_section_beginning,
@@ -11,11 +11,12 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from coalib.coala_main import run_coala
-from coalib.output.ConsoleInteraction import print_results_formatted
-
 
 def main():
+    # Like in coala, the modules for analysing are loaded only when running.
+    from coalib.coala_main import run_coala
+    from coalib.output.ConsoleInteraction import print_results_formatted
+
     results, exitcode, _ = run_coala(print_results=print_results_formatted)
 
     return exitcode
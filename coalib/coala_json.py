@@ -13,13 +13,11 @@
 
 import json
 
-from coalib.coala_main import run_coala
 from coalib.misc.DictUtilities import inverse_dicts
 from coalib.misc.Exceptions import get_exitcode
 from coalib.output.JSONEncoder import create_json_encoder
 from coalib.output.printers.ListLogPrinter import ListLogPrinter
 from coalib.parsing.DefaultArgParser import default_arg_parser
-from coalib.settings.ConfigurationGathering import get_filtered_bears
 
 
 def main():
@@ -30,6 +28,10 @@ def main():
     arg_parser = default_arg_parser()
     args = arg_parser.parse_args()
 
+    # Like in coala, the modules for analysing are loaded only if needed.
+    from coalib.coala_main import run_coala
+    from coalib.settings.ConfigurationGathering import get_filtered_bears
+
     log_printer = None if args.text_logs else ListLogPrinter()
     JSONEncoder = create_json_encoder(use_relpath=args.relpath)
     results = []
@@ -1,7 +1,7 @@
 import os
 import platform
+from collections import OrderedDict
 
-import pip
 from pyprint.ConsolePrinter import ConsolePrinter
 
 from coalib import VERSION
@@ -9,11 +9,10 @@ from coalib.misc.Exceptions import get_exitcode
 from coalib.output.Interactions import fail_acquire_settings
 from coalib.output.printers.LogPrinter import LogPrinter
 from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
-from coalib.processes.Processing import execute_section, simplify_section_result
+from coalib.processes.Processing import (
+    execute_sections, simplify_section_result)
 from coalib.settings.ConfigurationGathering import gather_configuration
 from coalib.misc.Caching import FileCache
-from coalib.misc.CachingUtilities import (
-    settings_changed, update_settings_db, get_settings_hash)
 
 do_nothing = lambda *args: True
 
@@ -71,15 +70,24 @@ def run_coala(log_printer=None,
             arg_parser=arg_parser,
             arg_list=arg_list)
 
-        log_printer.debug("Platform {} -- Python {}, pip {}, coalib {}"
-                          .format(platform.system(), platform.python_version(),
-                                  pip.__version__, VERSION))
+        # Importing pip takes long, so it is only done for debug output.
+        if log_printer.log_level <= LOG_LEVEL.DEBUG:
+            import pip
+            log_printer.debug(
+                "Platform {} -- Python {}, pip {}, coalib {}".format(
+                    platform.system(), platform.python_version(),
+                    pip.__version__, VERSION))
 
         config_file = os.path.abspath(str(sections["default"].get("config")))
 
-        settings_hash = get_settings_hash(sections, targets)
-        flush_cache = bool(sections["default"].get("flush_cache", False) or
-                           settings_changed(log_printer, settings_hash))
+        enabled_sections = OrderedDict(
+            (section_name, section)
+            for section_name, section in sections.items()
+            if section.is_enabled(targets))
+
+        # Cached results are bound to the settings of their bears, so
+        # changed settings do not require flushing the cache.
+        flush_cache = bool(sections["default"].get("flush_cache", False))
 
         disable_caching = bool(sections["default"].get(
             "disable_caching", False))
@@ -87,18 +95,15 @@ def run_coala(log_printer=None,
         if not sections["default"].get("disable_caching", False):
             cache = FileCache(log_printer, os.getcwd(), flush_cache)
 
-        for section_name, section in sections.items():
-            if not section.is_enabled(targets):
-                continue
-
-            print_section_beginning(section)
-            section_result = execute_section(
-                section=section,
-                global_bear_list=global_bears[section_name],
-                local_bear_list=local_bears[section_name],
+        # The processes running the bears are shared by all sections.
+        for section_name, section_result in execute_sections(
+                sections=enabled_sections,
+                global_bears=global_bears,
+                local_bears=local_bears,
                 print_results=print_results,
+                print_section_beginning=print_section_beginning,
                 cache=cache,
-                log_printer=log_printer)
+                log_printer=log_printer):
             yielded, yielded_unfixed, results[section_name] = (
                 simplify_section_result(section_result))
 
@@ -109,7 +114,6 @@ def run_coala(log_printer=None,
 
             file_dicts[section_name] = section_result[3]
 
-        update_settings_db(log_printer, settings_hash)
         if cache:
             cache.write()
 
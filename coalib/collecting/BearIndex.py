@@ -0,0 +1,126 @@
+import os
+from collections import namedtuple
+
+from pyprint.NullPrinter import NullPrinter
+
+from coalib import VERSION
+from coalib.misc.CachingUtilities import pickle_dump, pickle_load
+from coalib.output.printers.LogPrinter import LogPrinter
+
+
+BearInfo = namedtuple("BearInfo",
+                      ("name", "kind", "languages", "can_detect", "can_fix"))
+BearInfo.__doc__ = """
+The information about a bear that is needed to select it, kept so that the
+module of the bear does not need to be imported.
+"""
+
+
+def get_bear_info(bear, kind):
+    """
+    Gathers the information about a bear class to store in the index.
+
+    :param bear: The bear class.
+    :param kind: The kind of the bear.
+    :return:     A ``BearInfo``.
+    """
+    return BearInfo(bear.name,
+                    kind,
+                    tuple(bear.LANGUAGES),
+                    frozenset(bear.can_detect),
+                    frozenset(bear.CAN_FIX))
+
+
+class BearIndex:
+    """
+    Remembers which bears are defined in which bear files, so that listing
+    the available bears does not need to import all of them on every run.
+    The bears of a file are looked up again when its modification time or
+    size changes.
+
+    >>> from coalib.bears.LocalBear import LocalBear
+    >>> class SomeBear(LocalBear):
+    ...     LANGUAGES = {"Python"}
+    >>> index = BearIndex(None, identifier="bear_index_doctest")
+    >>> index.get("unknown_bear_file.py") is None
+    True
+    >>> index.set(__file__, [get_bear_info(SomeBear, "LOCAL")])
+    >>> [info.name for info in index.get(__file__)]
+    ['SomeBear']
+
+    The index is stored in the user's data directory when written:
+
+    >>> index.write()
+    >>> [info.languages for info in
+    ...  BearIndex(None, identifier="bear_index_doctest").get(__file__)]
+    [('Python',)]
+    """
+
+    def __init__(self, log_printer, identifier="bear_index"):
+        """
+        Loads the index.
+
+        :param log_printer: The log printer to log errors to, may be None.
+        :param identifier:  The name of the index in the data directory.
+        """
+        self.log_printer = (LogPrinter(NullPrinter()) if log_printer is None
+                            else log_printer)
+        self.identifier = identifier
+        data = pickle_load(self.log_printer, identifier, fallback={})
+        # The stored bear information changes with coala versions.
+        self._files = data.get(VERSION, {}) if isinstance(data, dict) else {}
+        self._changed = False
+
+    @staticmethod
+    def _get_stamp(filename):
+        status = os.stat(filename)
+        return status.st_mtime_ns, status.st_size
+
+    def get(self, filename):
+        """
+        Retrieves the bears defined in a file.
+
+        :param filename: The path of the bear file.
+        :return:         A list of ``BearInfo`` objects or None if the file
+                         was not indexed or changed since.
+        """
+        try:
+            stamp = self._get_stamp(filename)
+        except OSError:
+            return None
+
+        entry = self._files.get(filename)
+        if entry is None or entry[0] != stamp:
+            return None
+
+        return entry[1]
+
+    def set(self, filename, bear_infos):
+        """
+        Stores the bears defined in a file.
+
+        :param filename:   The path of the bear file.
+        :param bear_infos: A list of ``BearInfo`` objects.
+        """
+        try:
+            self._files[filename] = (self._get_stamp(filename),
+                                     list(bear_infos))
+            self._changed = True
+        except OSError:
+            pass
+
+    def write(self):
+        """
+        Stores the index in the user's data directory if it changed.
+        """
+        if not self._changed:
+            return
+
+        try:
+            pickle_dump(self.log_printer,
+                        self.identifier,
+                        {VERSION: self._files})
+            self._changed = False
+        except OSError as exception:
+            self.log_printer.warn("Unable to write the bear index: {}"
+                                  .format(exception))
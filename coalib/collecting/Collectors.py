@@ -1,16 +1,27 @@
 import functools
 import os
-import pkg_resources
 import itertools
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from pyprint.NullPrinter import NullPrinter
 
 from coalib.bears.BEAR_KIND import BEAR_KIND
+from coalib.collecting.BearIndex import BearIndex, get_bear_info
+from coalib.collecting.GitIndex import get_git_files, get_git_root
 from coalib.collecting.Importers import iimport_objects
 from coala_utils.decorators import yield_once
 from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
-from coalib.parsing.Globbing import fnmatch, iglob, glob_escape
+from coalib.parsing.Globbing import (
+    fnmatch, iglob, iglob_entries, glob_escape)
 from coalib.output.printers.LogPrinter import LogPrinter
+from coalib.misc.Constants import GLOBBING_SPECIAL_CHARS
+
+
+# Globs are evaluated in this many threads at once, walking directories is
+# mostly waiting for the file system.
+FILE_COLLECTING_THREADS = 8
 
 
 def _get_kind(bear_class):
@@ -36,6 +47,26 @@ def _import_bears(file_path, kinds):
             yield bear_class
 
 
+def _icollect_entries(file_paths, ignored_globs=None):
+    """
+    Evaluate globs in file paths and return all matching files along with
+    their ``os.DirEntry`` if it is known.
+
+    :param file_paths:    File path or list of such that can include globs
+    :param ignored_globs: List of globs to ignore when matching files
+    :return:              Iterator that yields tuple of path of a matching
+                          file, its ``os.DirEntry`` or None and the glob where
+                          it was found
+    """
+    if isinstance(file_paths, str):
+        file_paths = [file_paths]
+
+    for file_path in file_paths:
+        for match, entry in iglob_entries(file_path, ignored_globs):
+            if not ignored_globs or not fnmatch(match, ignored_globs):
+                yield match, entry, file_path
+
+
 @yield_once
 def icollect(file_paths, ignored_globs=None):
     """
@@ -46,40 +77,149 @@ def icollect(file_paths, ignored_globs=None):
     :return:              Iterator that yields tuple of path of a matching
                           file, the glob where it was found
     """
-    if isinstance(file_paths, str):
-        file_paths = [file_paths]
+    for match, _, file_path in _icollect_entries(file_paths, ignored_globs):
+        yield match, file_path
+
+
+@yield_once
+def _icollect_of_type(file_paths, ignored_globs, want_dirs):
+    """
+    Like ``icollect`` but only yields files or only directories. The types
+    known from walking directories are used instead of looking them up again.
+    """
+    for match, entry, file_path in _icollect_entries(file_paths,
+                                                     ignored_globs):
+        try:
+            if entry is None:
+                is_type = (os.path.isdir(match) if want_dirs
+                           else os.path.isfile(match))
+            else:
+                is_type = entry.is_dir() if want_dirs else entry.is_file()
+        except OSError:
+            is_type = False
+        if is_type:
+            yield match, file_path
+
+
+def _get_glob_root(glob):
+    """
+    Determines the deepest directory all paths matched by a glob are in.
+
+    :param glob: File path that can include globs.
+    :return:     The path of the directory.
+    """
+    directory = os.path.dirname(os.path.expanduser(glob))
+    while any(char in directory for char in GLOBBING_SPECIAL_CHARS):
+        directory = os.path.dirname(directory)
+    return directory
+
 
+def _get_git_files_of_globs(file_paths, log_printer):
+    """
+    Lists the files in the git repositories the given globs are in that are
+    tracked or not ignored.
+
+    :param file_paths:  List of file paths that can include globs.
+    :param log_printer: The log printer to warn to.
+    :return:            A list holding a list of the paths of the files
+                        for every glob or None if the glob is not in a
+                        git repository.
+    """
+    git_files = {}
+    glob_files = []
     for file_path in file_paths:
-        for match in iglob(file_path):
-            if not ignored_globs or not fnmatch(match, ignored_globs):
-                yield match, file_path
+        root = get_git_root(_get_glob_root(file_path) or os.curdir)
+        if root not in git_files:
+            git_files[root] = None if root is None else get_git_files(root)
+        if git_files[root] is None:
+            log_printer.warn("Unable to list the files tracked by git for "
+                             "'{}'. Collecting them from the file system "
+                             "instead.".format(file_path))
+        glob_files.append(git_files[root])
+
+    return glob_files
+
+
+def _collect_glob_files(file_path, ignored_file_paths, git_files=None):
+    """
+    Evaluates a single glob and measures how long it takes.
+
+    :param file_path:          File path that can include globs.
+    :param ignored_file_paths: List of globs that match to-be-ignored files.
+    :param git_files:          The files to match the glob against instead of
+                               walking the file system, e.g. the files
+                               listed by git.
+    :return:                   A tuple of the list of paths of all matching
+                               files and the duration in seconds.
+    """
+    start_time = time.perf_counter()
+    if git_files is None:
+        files = [match for match, _ in _icollect_of_type(file_path,
+                                                         ignored_file_paths,
+                                                         want_dirs=False)]
+    else:
+        files = [filename
+                 for filename in git_files
+                 if fnmatch(filename, file_path) and
+                 not (ignored_file_paths and
+                      fnmatch(filename, ignored_file_paths)) and
+                 os.path.isfile(filename)]
+    return files, time.perf_counter() - start_time
 
 
 def collect_files(file_paths, log_printer, ignored_file_paths=None,
-                  limit_file_paths=None):
+                  limit_file_paths=None, thread_count=FILE_COLLECTING_THREADS,
+                  from_git=False):
     """
-    Evaluate globs in file paths and return all matching files
+    Evaluate globs in file paths and return all matching files. The globs
+    are evaluated in a pool of threads, the files are returned in the order
+    of the globs matching them first.
 
     :param file_paths:         File path or list of such that can include globs
     :param ignored_file_paths: List of globs that match to-be-ignored files
     :param limit_file_paths:   List of globs that the files are limited to
+    :param thread_count:       The number of globs evaluated at once
+    :param from_git:           Whether to match the globs against the files
+                               git tracks or does not ignore instead of
+                               walking the file system. Globs that are not in
+                               a git repository are evaluated on the file
+                               system still.
     :return:                   List of paths of all matching files
     """
+    if isinstance(file_paths, str):
+        file_paths = [file_paths]
+
     limit_fnmatch = (functools.partial(fnmatch, globs=limit_file_paths)
                      if limit_file_paths else lambda fname: True)
 
-    valid_files = list(filter(lambda fname: os.path.isfile(fname[0]),
-                              icollect(file_paths, ignored_file_paths)))
-
-    # Find globs that gave no files and warn the user
-    if valid_files:
-        collected_files, file_globs_with_files = zip(*valid_files)
+    git_files = (_get_git_files_of_globs(file_paths, log_printer)
+                 if from_git else [None] * len(file_paths))
+
+    if file_paths:
+        with ThreadPoolExecutor(min(thread_count,
+                                    len(file_paths))) as executor:
+            glob_results = list(executor.map(
+                lambda file_path, files: _collect_glob_files(
+                    file_path, ignored_file_paths, files),
+                file_paths,
+                git_files))
     else:
-        collected_files, file_globs_with_files = [], []
+        glob_results = []
+
+    collected_files = []
+    file_globs_with_files = []
+    for file_path, (files, duration) in zip(file_paths, glob_results):
+        log_printer.debug("Collected {} files matching '{}' in {:.2f} "
+                          "seconds.".format(len(files), file_path, duration))
+        if files:
+            file_globs_with_files.append(file_path)
+        collected_files.extend(files)
 
+    # Find globs that gave no files and warn the user
     _warn_if_unused_glob(log_printer, file_paths, file_globs_with_files,
                          "No files matching '{}' were found.")
-    limited_files = list(filter(limit_fnmatch, collected_files))
+    limited_files = list(filter(limit_fnmatch,
+                                OrderedDict.fromkeys(collected_files)))
     return limited_files
 
 
@@ -91,8 +231,9 @@ def collect_dirs(dir_paths, ignored_dir_paths=None):
     :param ignored_dir_paths: List of globs that match to-be-ignored dirs
     :return:                  List of paths of all matching directories
     """
-    valid_dirs = list(filter(lambda fname: os.path.isdir(fname[0]),
-                             icollect(dir_paths, ignored_dir_paths)))
+    valid_dirs = list(_icollect_of_type(dir_paths,
+                                        ignored_dir_paths,
+                                        want_dirs=True))
     if valid_dirs:
         collected_dirs, _ = zip(*valid_dirs)
         return list(collected_dirs)
@@ -101,16 +242,14 @@ def collect_dirs(dir_paths, ignored_dir_paths=None):
 
 
 @yield_once
-def icollect_bears(bear_dir_glob, bear_globs, kinds, log_printer):
+def icollect_bear_files(bear_dir_glob, bear_globs):
     """
-    Collect all bears from bear directories that have a matching kind.
+    Collect all files from bear directories matching the given bear globs.
 
     :param bear_dir_glob: Directory globs or list of such that can contain bears
     :param bear_globs:    Globs of bears to collect
-    :param kinds:         List of bear kinds to be collected
-    :param log_printer:   Log_printer to handle logging
-    :return:              Iterator that yields a tuple with bear class and
-                          which bear_glob was used to find that bear class.
+    :return:              Iterator that yields a tuple with the path of a bear
+                          file and which bear_glob was used to find it.
     """
     for bear_dir, dir_glob in filter(lambda x: os.path.isdir(x[0]),
                                      icollect(bear_dir_glob)):
@@ -120,33 +259,116 @@ def icollect_bears(bear_dir_glob, bear_globs, kinds, log_printer):
         for bear_glob in bear_globs:
             for matching_file in iglob(
                     os.path.join(bear_dir, bear_glob + '.py')):
+                yield matching_file, bear_glob
 
-                try:
-                    for bear in _import_bears(matching_file, kinds):
-                        yield bear, bear_glob
-                except pkg_resources.VersionConflict as exception:
-                    log_printer.log_exception(
-                        ("Unable to collect bears from {file} because there "
-                         "is a conflict with the version of a dependency "
-                         "you have installed. This may be resolved by "
-                         "creating a separate virtual environment for coala "
-                         "or running `pip install \"{pkg}\"`. Be aware that "
-                         "the latter solution might break other python "
-                         "packages that depend on the currently installed "
-                         "version.").format(file=matching_file,
-                                            pkg=exception.req),
-                        exception, log_level=LOG_LEVEL.WARNING)
-                except BaseException as exception:
-                    log_printer.log_exception(
-                        "Unable to collect bears from {file}. Probably the "
-                        "file is malformed or the module code raises an "
-                        "exception.".format(file=matching_file),
-                        exception,
-                        log_level=LOG_LEVEL.WARNING)
+
+def _import_bear_file(matching_file, kinds, log_printer):
+    """
+    Imports the bears of the given kinds from a bear file.
+
+    :param matching_file: The path of the bear file.
+    :param kinds:         List of bear kinds to be collected
+    :param log_printer:   Log_printer to handle logging
+    :return:              A list of the bear classes or None if the file
+                          could not be imported.
+    """
+    import pkg_resources
+
+    try:
+        return list(_import_bears(matching_file, kinds))
+    except pkg_resources.VersionConflict as exception:
+        log_printer.log_exception(
+            ("Unable to collect bears from {file} because there "
+             "is a conflict with the version of a dependency "
+             "you have installed. This may be resolved by "
+             "creating a separate virtual environment for coala "
+             "or running `pip install \"{pkg}\"`. Be aware that "
+             "the latter solution might break other python "
+             "packages that depend on the currently installed "
+             "version.").format(file=matching_file,
+                                pkg=exception.req),
+            exception, log_level=LOG_LEVEL.WARNING)
+    except BaseException as exception:
+        log_printer.log_exception(
+            "Unable to collect bears from {file}. Probably the "
+            "file is malformed or the module code raises an "
+            "exception.".format(file=matching_file),
+            exception,
+            log_level=LOG_LEVEL.WARNING)
+
+    return None
+
+
+@yield_once
+def icollect_bears(bear_dir_glob, bear_globs, kinds, log_printer):
+    """
+    Collect all bears from bear directories that have a matching kind.
+
+    :param bear_dir_glob: Directory globs or list of such that can contain bears
+    :param bear_globs:    Globs of bears to collect
+    :param kinds:         List of bear kinds to be collected
+    :param log_printer:   Log_printer to handle logging
+    :return:              Iterator that yields a tuple with bear class and
+                          which bear_glob was used to find that bear class.
+    """
+    for matching_file, bear_glob in icollect_bear_files(bear_dir_glob,
+                                                        bear_globs):
+        for bear in _import_bear_file(matching_file, kinds, log_printer) or ():
+            yield bear, bear_glob
+
+
+def collect_bear_infos(bear_dirs, log_printer, bear_index=None):
+    """
+    Lists the bears in bear directories without importing them if they are
+    known from the bear index. Bear files that are not in the index yet or
+    changed are imported and added to it.
+
+    :param bear_dirs:   Directory name or list of such that can contain bears.
+    :param log_printer: log_printer to handle logging.
+    :param bear_index:  The ``BearIndex`` to use. The index in the user's data
+                        directory is loaded and written back if None.
+    :return:            A list of tuples of the path of every bear file and
+                        a list of ``BearInfo`` objects for the bears in it.
+    """
+    index = BearIndex(log_printer) if bear_index is None else bear_index
+    kinds = [BEAR_KIND.LOCAL, BEAR_KIND.GLOBAL]
+    bear_files = []
+    for bear_file, _ in icollect_bear_files(bear_dirs, ["**"]):
+        bear_infos = index.get(bear_file)
+        if bear_infos is None:
+            bears = _import_bear_file(bear_file, kinds, log_printer)
+            if bears is None:
+                continue
+            bear_infos = [get_bear_info(bear, _get_kind(bear))
+                          for bear in bears]
+            index.set(bear_file, bear_infos)
+        bear_files.append((bear_file, bear_infos))
+
+    if bear_index is None:
+        index.write()
+    return bear_files
+
+
+def _collect_bears_from_files(bear_files, kinds, log_printer):
+    """
+    Imports the bears of the given kinds from the given bear files.
+
+    :param bear_files:  List of paths of bear files.
+    :param kinds:       List of bear kinds to be collected.
+    :param log_printer: log_printer to handle logging.
+    :return:            Tuple of list of bear classes based on kind. The lists
+                        are in the same order as kinds.
+    """
+    bears_found = tuple([] for i in range(len(kinds)))
+    for bear in OrderedDict.fromkeys(itertools.chain.from_iterable(
+            _import_bear_file(bear_file, kinds, log_printer) or ()
+            for bear_file in bear_files)):
+        bears_found[kinds.index(_get_kind(bear))].append(bear)
+    return bears_found
 
 
 def collect_bears(bear_dirs, bear_globs, kinds, log_printer,
-                  warn_if_unused_glob=True):
+                  warn_if_unused_glob=True, bear_cache=None):
     """
     Collect all bears from bear directories that have a matching kind
     matching the given globs.
@@ -158,15 +380,44 @@ def collect_bears(bear_dirs, bear_globs, kinds, log_printer,
     :param log_printer:         log_printer to handle logging.
     :param warn_if_unused_glob: True if warning message should be shown if a
                                 glob didn't give any bears.
+    :param bear_cache:          A dictionary to remember the collected bears
+                                in, keyed by the resolved bear directories, the
+                                globs and the kinds. Collecting bears again
+                                with the same dictionary and arguments reuses
+                                them, how often that happened is logged. If
+                                None, the bears are not remembered.
     :return:                    Tuple of list of matching bear classes based on
                                 kind. The lists are in the same order as kinds.
     """
-    bears_found = tuple([] for i in range(len(kinds)))
-    bear_globs_with_bears = set()
-    for bear, glob in icollect_bears(bear_dirs, bear_globs, kinds, log_printer):
-        index = kinds.index(_get_kind(bear))
-        bears_found[index].append(bear)
-        bear_globs_with_bears.add(glob)
+    if isinstance(bear_dirs, str):
+        bear_dirs = [bear_dirs]
+    key = (tuple(os.path.abspath(os.path.expanduser(bear_dir))
+                 for bear_dir in bear_dirs),
+           tuple(bear_globs),
+           tuple(kinds))
+
+    if bear_cache is not None and key in bear_cache:
+        cached_bears, bear_globs_with_bears, hits = bear_cache[key]
+        bear_cache[key] = (cached_bears, bear_globs_with_bears, hits + 1)
+        bears_found = tuple(list(bears) for bears in cached_bears)
+    else:
+        bears_found = tuple([] for i in range(len(kinds)))
+        bear_globs_with_bears = set()
+        for bear, glob in icollect_bears(bear_dirs, bear_globs, kinds,
+                                         log_printer):
+            index = kinds.index(_get_kind(bear))
+            bears_found[index].append(bear)
+            bear_globs_with_bears.add(glob)
+        if bear_cache is not None:
+            bear_cache[key] = (tuple(tuple(bears) for bears in bears_found),
+                               frozenset(bear_globs_with_bears),
+                               0)
+
+    if bear_cache is not None:
+        log_printer.debug("Collected bears {} times and reused them {} times "
+                          "in this run.".format(
+                              len(bear_cache),
+                              sum(hits for _, _, hits in bear_cache.values())))
 
     if warn_if_unused_glob:
         _warn_if_unused_glob(log_printer, bear_globs, bear_globs_with_bears,
@@ -230,35 +481,66 @@ def filter_capabilities_by_languages(bears, languages):
 def get_all_bears_names():
     from coalib.settings.Section import Section
     printer = LogPrinter(NullPrinter())
-    local_bears, global_bears = collect_bears(
-        Section("").bear_dirs(),
-        ["**"],
-        [BEAR_KIND.LOCAL, BEAR_KIND.GLOBAL],
-        printer,
-        warn_if_unused_glob=False)
-    return [bear.name for bear in itertools.chain(local_bears, global_bears)]
+    return list(OrderedDict.fromkeys(
+        bear_info.name
+        for _, bear_infos in collect_bear_infos(Section("").bear_dirs(),
+                                                printer)
+        for bear_info in bear_infos))
 
 
-def collect_all_bears_from_sections(sections, log_printer):
+def collect_all_bears_from_sections(sections, log_printer, languages=None,
+                                    bear_cache=None):
     """
     Collect all kinds of bears from bear directories given in the sections.
 
     :param sections:    List of sections so bear_dirs are taken into account
     :param log_printer: Log_printer to handle logging
+    :param languages:   Languages the bears are going to be filtered on. Bear
+                        files without bears for one of the languages are not
+                        imported if they are known from the bear index. The
+                        returned bears are not filtered.
+    :param bear_cache:  The dictionary to remember the collected bears in, see
+                        ``collect_bears``. If None, the bears are only reused
+                        for sections with the same bear directories.
     :return:            Tuple of dictionaries of local and global bears.
                         The dictionary key is section class and
                         dictionary value is a list of Bear classes
     """
+    bear_cache = {} if bear_cache is None else bear_cache
     local_bears = {}
     global_bears = {}
+    bear_index = BearIndex(log_printer) if languages else None
+    bear_files_of_dirs = {}
+    if languages:
+        languages = {language.lower() for language in languages} | {'all'}
     for section in sections:
         bear_dirs = sections[section].bear_dirs()
-        local_bears[section], global_bears[section] = collect_bears(
-            bear_dirs,
-            ["**"],
-            [BEAR_KIND.LOCAL, BEAR_KIND.GLOBAL],
-            log_printer,
-            warn_if_unused_glob=False)
+        if languages:
+            dirs_key = (bear_dirs if isinstance(bear_dirs, str)
+                        else tuple(bear_dirs))
+            if dirs_key not in bear_files_of_dirs:
+                bear_files_of_dirs[dirs_key] = [
+                    bear_file
+                    for bear_file, bear_infos in collect_bear_infos(
+                        bear_dirs, log_printer, bear_index)
+                    if any({language.lower()
+                            for language in bear_info.languages} & languages
+                           for bear_info in bear_infos)]
+            local_bears[section], global_bears[section] = (
+                _collect_bears_from_files(
+                    bear_files_of_dirs[dirs_key],
+                    [BEAR_KIND.LOCAL, BEAR_KIND.GLOBAL],
+                    log_printer))
+        else:
+            local_bears[section], global_bears[section] = collect_bears(
+                bear_dirs,
+                ["**"],
+                [BEAR_KIND.LOCAL, BEAR_KIND.GLOBAL],
+                log_printer,
+                warn_if_unused_glob=False,
+                bear_cache=bear_cache)
+    if bear_index is not None:
+        bear_index.write()
     return local_bears, global_bears
 
 
@@ -286,6 +568,8 @@ def collect_registered_bears_dirs(entrypoint):
     :param entrypoint: The entrypoint to find packages with.
     :return:           List of bear directories.
     """
+    import pkg_resources
+
     collected_dirs = []
     for ep in pkg_resources.iter_entry_points(entrypoint):
         registered_package = None
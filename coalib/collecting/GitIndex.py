@@ -0,0 +1,176 @@
+import os
+import struct
+
+from coalib.misc.Shell import run_interactive_shell_command
+
+
+# Types of index entries in the mode field, only these are files.
+_REGULAR_FILE = 0o100000
+_SYMLINK = 0o120000
+_ENTRY_HEADER = struct.Struct(">10L20sH")
+_EXTENDED_FLAG = 0x4000
+
+
+def _read_offset(data, position):
+    """
+    Reads a variable length number as used by version 4 git index files.
+
+    :param data:     The contents of the index.
+    :param position: The position of the number in data.
+    :return:         A tuple of the number and the position behind it.
+    """
+    byte = data[position]
+    position += 1
+    value = byte & 0x7f
+    while byte & 0x80:
+        byte = data[position]
+        position += 1
+        value = ((value + 1) << 7) | (byte & 0x7f)
+    return value, position
+
+
+def read_git_index(index_path):
+    """
+    Reads the paths of the files tracked in a git index file. Versions 2, 3
+    and 4 of the format are supported, submodules are left out.
+
+    :param index_path:  The path of the index file, usually ``.git/index``.
+    :return:            A list of the paths of the tracked files, relative to
+                        the root of the repository and separated by ``/``.
+    :raises OSError:    If the index cannot be read.
+    :raises ValueError: If the file is no index in a known format.
+    """
+    with open(index_path, "rb") as index_file:
+        data = index_file.read()
+
+    try:
+        signature, version, count = struct.unpack_from(">4sLL", data)
+    except struct.error:
+        raise ValueError("The git index {} is truncated.".format(index_path))
+    if signature != b"DIRC" or version not in (2, 3, 4):
+        raise ValueError("The git index {} has an unsupported format."
+                         .format(index_path))
+
+    paths = []
+    previous_path = b""
+    position = 12
+    try:
+        for _ in range(count):
+            entry = _ENTRY_HEADER.unpack_from(data, position)
+            mode, flags = entry[6], entry[11]
+            path_position = position + _ENTRY_HEADER.size
+            if version >= 3 and flags & _EXTENDED_FLAG:
+                path_position += 2
+
+            if version == 4:
+                # Paths are stored as the number of bytes to remove from the
+                # end of the previous path and the bytes to append to it.
+                strip, path_position = _read_offset(data, path_position)
+                end = data.index(b"\0", path_position)
+                path = (previous_path[:len(previous_path) - strip] +
+                        data[path_position:end])
+                position = end + 1
+            else:
+                end = data.index(b"\0", path_position)
+                path = data[path_position:end]
+                # Entries are padded with null bytes to a multiple of 8.
+                position += (end - position + 8) & ~7
+            previous_path = path
+
+            # Entries in merge conflicts appear once per stage.
+            if (mode & 0o170000 in (_REGULAR_FILE, _SYMLINK) and
+                    (not paths or paths[-1] != path)):
+                paths.append(path)
+    except (struct.error, IndexError, ValueError):
+        raise ValueError("The git index {} is truncated.".format(index_path))
+
+    return [os.fsdecode(path) for path in paths]
+
+
+def _run_git(root, *args):
+    """
+    Runs git in the given repository.
+
+    :param root: The root directory of the repository.
+    :param args: The arguments to git.
+    :return:     The output of git split at null bytes or None if git is not
+                 installed or fails.
+    """
+    try:
+        with run_interactive_shell_command(("git",) + args,
+                                           cwd=root) as process:
+            output, _ = process.communicate()
+    except OSError:
+        return None
+
+    if process.returncode != 0:
+        return None
+
+    return [path for path in output.split("\0") if path]
+
+
+def get_git_root(path):
+    """
+    Finds the repository the given path is in.
+
+    :param path: A path of a file or a directory, it does not need to exist.
+    :return:     The root directory of the repository or None if the path is
+                 not in a git repository.
+    """
+    path = os.path.abspath(path)
+    while True:
+        if os.path.exists(os.path.join(path, ".git")):
+            return path
+
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def get_git_files(root):
+    """
+    Lists the files in a git repository that are tracked or not ignored. The
+    tracked files are read from the index directly, if that is not possible,
+    e.g. for worktrees, ``git ls-files`` lists them together with the
+    untracked ones. Like git itself, files matched by ``.gitignore`` are only
+    listed if they are tracked.
+
+    :param root: The root directory of the repository.
+    :return:     A list of the absolute paths of the files or None if they
+                 cannot be determined.
+    """
+    untracked_args = ("--others", "--exclude-standard", "-z")
+    try:
+        paths = read_git_index(os.path.join(root, ".git", "index"))
+    except (OSError, ValueError):
+        paths = _run_git(root, "ls-files", "--cached", *untracked_args)
+    else:
+        untracked = _run_git(root, "ls-files", *untracked_args)
+        paths = None if untracked is None else paths + untracked
+
+    if paths is None:
+        return None
+
+    return [os.path.join(root, os.path.normpath(path)) for path in paths]
+
+
+def get_changed_git_files(root, ref):
+    """
+    Lists the files changed in a git repository since the given revision,
+    including changes that are not committed and new files that are not
+    ignored.
+
+    :param root: The root directory of the repository.
+    :param ref:  The revision to compare to, e.g. ``HEAD`` or ``master``.
+    :return:     A set of the absolute paths of the changed files or None if
+                 git is not installed or the revision is unknown.
+    """
+    changed = _run_git(root, "diff", "--name-only", "-z", ref, "--")
+    untracked = _run_git(root, "ls-files", "--others", "--exclude-standard",
+                         "-z")
+    if changed is None or untracked is None:
+        return None
+
+    return {os.path.join(root, os.path.normpath(path))
+            for path in changed + untracked}
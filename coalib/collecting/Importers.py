@@ -1,22 +1,104 @@
 from contextlib import ExitStack
+from functools import lru_cache
+import importlib.machinery
+import importlib.util
 import inspect
 import os
 import platform
 import sys
+import zlib
 
 from coalib.misc.ContextManagers import suppress_stdout
 from coala_utils.decorators import arguments_to_lists, yield_once
 
+try:
+    from importlib.util import module_from_spec
+except ImportError:  # pragma: no cover, Python 3.4
+    import types
+
+    def module_from_spec(spec):
+        module = types.ModuleType(spec.name)
+        module.__spec__ = spec
+        module.__loader__ = spec.loader
+        module.__file__ = spec.origin
+        return module
+
+
+# The modules imported by ``_import_module`` keyed by the absolute path of
+# their file, along with the modification time of the file at that point.
+_module_cache = {}
+
+
+class _BearDirectoryFinder:
+    """
+    Finds the modules in the directories modules were imported from by
+    ``_import_module``, so that they can import the modules next to them by
+    name without the directories being added to ``sys.path``. It is used
+    after all other finders, so the standard library and installed packages
+    take precedence.
+    """
+
+    def __init__(self):
+        self.directories = []
+
+    def add_directory(self, directory):
+        """
+        Makes the modules in the given directory importable by name.
+
+        :param directory: The absolute path of the directory.
+        """
+        if directory not in self.directories:
+            self.directories.insert(0, directory)
+        if self not in sys.meta_path:
+            sys.meta_path.append(self)
+
+    def find_spec(self, fullname, path=None, target=None):
+        # Submodules of packages are found through their package.
+        if path is not None:
+            return None
+        return importlib.machinery.PathFinder.find_spec(fullname,
+                                                        self.directories)
+
+
+_bear_directory_finder = _BearDirectoryFinder()
+
+
+def _get_module_path(module):
+    module_file = getattr(module, "__file__", None)
+    return None if module_file is None else os.path.abspath(module_file)
+
 
 def _import_module(file_path):
-    if not os.path.exists(file_path):
-        raise ImportError
+    """
+    Imports a module from the given path. The module is only executed again
+    if its file was modified since.
+
+    The module is registered under the name of its file, so other modules can
+    import it by that name as before. If a different module has that name
+    already, e.g. one of the standard library, a unique name is used. The
+    modules next to it can be imported by name, ``sys.path`` is not changed
+    for that.
+
+    :param file_path:   The path of the module file.
+    :return:            The module.
+    :raises ImportError: If there is no file at the path.
+    """
+    try:
+        mtime = os.stat(file_path).st_mtime_ns
+    except OSError:
+        raise ImportError("No module at {}.".format(file_path))
+
+    path = os.path.abspath(file_path)
+    cached = _module_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
 
     module_name = os.path.splitext(os.path.basename(file_path))[0]
-    module_dir = os.path.dirname(file_path)
+    module_dir = os.path.dirname(path)
 
-    if module_dir not in sys.path:
-        sys.path.insert(0, module_dir)
+    # Modules may import the modules next to them by name, also later on
+    # when their functions run, so the directory is remembered.
+    _bear_directory_finder.add_directory(module_dir)
 
     # Ugly inconsistency: Python will insist on correctly cased module names
     # independent of whether the OS is case-sensitive or not.
@@ -28,7 +110,31 @@ def _import_module(file_path):
                 module_name = cased_module_name
                 break
 
-    return __import__(module_name)
+    existing = sys.modules.get(module_name)
+    if existing is not None:
+        if _get_module_path(existing) != path:
+            module_name = "{}_{:08x}".format(module_name,
+                                             zlib.crc32(os.fsencode(path)))
+            existing = sys.modules.get(module_name)
+        elif cached is None:
+            # Another module imported it by name.
+            _module_cache[path] = (mtime, existing)
+            return existing
+
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    module = module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        if existing is None:
+            del sys.modules[module_name]
+        else:
+            sys.modules[module_name] = existing
+        raise
+
+    _module_cache[path] = (mtime, module)
+    return module
 
 
 def _is_subclass(test_class, superclasses):
@@ -88,7 +194,20 @@ def _is_defined_in(obj, file_path):
     if not inspect.isclass(obj):
         return object_defined_in(obj, file_path)
 
-    for base in inspect.getmro(obj):
+    try:
+        return _is_class_defined_in(obj, file_path)
+    except TypeError:  # The metaclass makes the class unhashable
+        return _is_class_defined_in.__wrapped__(obj, file_path)
+
+
+@lru_cache(maxsize=4096)
+def _is_class_defined_in(cls, file_path):
+    """
+    Checks if a class or any of its parent classes is defined in the given
+    file. Bear files are mostly checked for the same classes again, e.g. the
+    ones imported from coalib, so the results are remembered.
+    """
+    for base in inspect.getmro(cls):
         if object_defined_in(base, file_path):
             return True
 
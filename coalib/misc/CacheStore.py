@@ -0,0 +1,160 @@
+import sqlite3
+
+
+class CacheStore:
+    """
+    A sqlite database holding the caches of all projects. Unlike a pickled
+    dictionary it does not need to be read and rewritten as a whole: results
+    are looked up and stored one by one. The database is used in
+    WAL mode so that several coala runs can use it at the same time.
+
+    >>> store = CacheStore(":memory:")
+
+    Projects are identified by a string, e.g. a hash of their directory:
+
+    >>> store.set_time("project", 42)
+    >>> store.get_time("project")
+    42
+    >>> store.get_time("other project") is None
+    True
+
+    Results are bound to the contents of a file and the key of a bear:
+
+    >>> bear_key = ("SpaceConsistencyBear", "settings hash", "version")
+    >>> store.set_results("project", "a.c", "content hash", {bear_key: b"[]"})
+    >>> store.get_results("project", "a.c", "content hash", bear_key)
+    b'[]'
+    >>> store.get_results("project", "a.c", "new content hash",
+    ...                   bear_key) is None
+    True
+
+    Changes have to be committed to be visible to other connections:
+
+    >>> store.commit()
+    >>> store.close()
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS projects ("
+        "project TEXT PRIMARY KEY, time INTEGER NOT NULL)",
+        # Older coala versions tracked the last run time of every file and
+        # the settings of every project.
+        "DROP TABLE IF EXISTS files",
+        "DROP TABLE IF EXISTS settings",
+        "DROP TABLE IF EXISTS section_settings",
+        "CREATE TABLE IF NOT EXISTS results ("
+        "project TEXT, filename TEXT, bear TEXT, settings_hash TEXT, "
+        "version TEXT, content_hash TEXT NOT NULL, results BLOB NOT NULL, "
+        "PRIMARY KEY (project, filename, bear, settings_hash, version))")
+
+    def __init__(self, path, timeout=30):
+        """
+        Opens the database and creates its tables if needed.
+
+        :param path:                  The path of the database file or
+                                      ``":memory:"`` for a database that is
+                                      not persisted.
+        :param timeout:               The number of seconds to wait for other
+                                      coala runs writing to the database.
+        :raises sqlite3.DatabaseError: If the file is no valid database.
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=timeout)
+        try:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.SCHEMA:
+                self.connection.execute(statement)
+            self.connection.commit()
+        except sqlite3.DatabaseError:
+            self.connection.close()
+            raise
+
+    def commit(self):
+        """
+        Commits all changes made since the last commit.
+        """
+        self.connection.commit()
+
+    def rollback(self):
+        """
+        Discards all changes made since the last commit.
+        """
+        self.connection.rollback()
+
+    def close(self):
+        """
+        Closes the database, uncommitted changes are discarded.
+        """
+        self.connection.close()
+
+    def get_time(self, project):
+        """
+        :param project: The identifier of the project.
+        :return:        The time of the last run on the project or ``None``
+                        if it was not cached yet.
+        """
+        row = self.connection.execute(
+            "SELECT time FROM projects WHERE project = ?",
+            (project,)).fetchone()
+        return None if row is None else row[0]
+
+    def set_time(self, project, time):
+        """
+        :param project: The identifier of the project.
+        :param time:    The time of the last run on the project.
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO projects (project, time) VALUES (?, ?)",
+            (project, time))
+
+    def remove_project(self, project):
+        """
+        Removes the last run time and all results of a project from the cache.
+
+        :param project: The identifier of the project.
+        """
+        for table in ("projects", "results"):
+            self.connection.execute(
+                "DELETE FROM {} WHERE project = ?".format(table),
+                (project,))
+
+    def get_results(self, project, filename, content_hash, bear_key):
+        """
+        :param project:      The identifier of the project.
+        :param filename:     The name of the file.
+        :param content_hash: A hash of the current contents of the file.
+        :param bear_key:     A tuple of the name, the settings hash and the
+                             version of the bear.
+        :return:             The serialized results of the bear or ``None``
+                             if there are none for these contents.
+        """
+        row = self.connection.execute(
+            "SELECT results FROM results WHERE project = ? AND filename = ? "
+            "AND bear = ? AND settings_hash = ? AND version = ? "
+            "AND content_hash = ?",
+            (project, filename) + tuple(bear_key) + (content_hash,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def set_results(self, project, filename, content_hash, bear_results):
+        """
+        Stores the results of bears on a file. Results stored for other
+        contents of the file are removed.
+
+        :param project:      The identifier of the project.
+        :param filename:     The name of the file.
+        :param content_hash: A hash of the contents the bears ran on.
+        :param bear_results: A dictionary with the keys of the bears as keys
+                             and their serialized results as values.
+        """
+        self.connection.execute(
+            "DELETE FROM results WHERE project = ? AND filename = ? "
+            "AND content_hash != ?",
+            (project, filename, content_hash))
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO results (project, filename, bear, "
+            "settings_hash, version, content_hash, results) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((project, filename) + tuple(bear_key) + (content_hash, results)
+             for bear_key, results in bear_results.items()))
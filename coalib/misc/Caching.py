@@ -1,66 +1,52 @@
+import pickle
+import sqlite3
 import time
-import os
 
 from coala_utils.decorators import enforce_signature
 from coalib.output.printers.LogPrinter import LogPrinter
 from coalib.misc.CachingUtilities import (
-    pickle_load, pickle_dump, delete_files)
+    delete_files, hash_id, open_cache_store)
 
 
 class FileCache:
     """
-    This object is a file cache that helps in collecting only the changed
-    and new files since the last run. Example/Tutorial:
+    This object is a file cache that stores the results each bear yielded on
+    a file, so that bears do not need to run again on files whose contents
+    did not change since the last run. The caches of all projects are kept
+    in one ``CacheStore`` in the user's data directory. Example/Tutorial:
 
     >>> from pyprint.NullPrinter import NullPrinter
     >>> from coalib.output.printers.LogPrinter import LogPrinter
-    >>> import copy, time
     >>> log_printer = LogPrinter(NullPrinter())
 
     To initialize the cache create an instance for the project:
 
     >>> cache = FileCache(log_printer, "test", flush_cache=True)
 
-    Now we can track new files by running:
+    The results are bound to the contents of the file, identified by a hash
+    of them, and to a key of the bear:
 
-    >>> cache.track_files(["a.c", "b.c"])
+    >>> bear_key = ("SpaceConsistencyBear", "settings hash", "version")
+    >>> cache.set_results("a.c", "content hash", bear_key, [])
+    >>> cache.get_results("a.c", "content hash", bear_key)
+    []
 
     Since all cache operations are lazy (for performance), we need to
     explicitly write the cache to disk for persistence in future uses:
     (Note: The cache will automatically figure out the write location)
 
     >>> cache.write()
-
-    Let's go into the future:
-
-    >>> time.sleep(1)
-
-    Let's create a new instance to simulate a separate run:
-
     >>> cache = FileCache(log_printer, "test", flush_cache=False)
+    >>> cache.get_results("a.c", "content hash", bear_key)
+    []
 
-    >>> old_data = copy.deepcopy(cache.data)
-
-    We can mark a file as changed by doing:
-
-    >>> cache.untrack_files({"a.c"})
+    The results are not used anymore if the file or the bear changes:
 
-    Again write to disk after calculating the new cache times for each file:
-
-    >>> cache.write()
-    >>> new_data = cache.data
-
-    Since we marked 'a.c' as a changed file:
-
-    >>> "a.c" not in cache.data
+    >>> cache.get_results("a.c", "new content hash", bear_key) is None
     True
-    >>> "a.c" in old_data
-    True
-
-    Since 'b.c' was untouched after the second run, its time was updated
-    to the latest value:
-
-    >>> old_data["b.c"] < new_data["b.c"]
+    >>> cache.get_results("a.c", "content hash",
+    ...                   ("SpaceConsistencyBear", "new settings hash",
+    ...                    "version")) is None
     True
     """
 
@@ -80,12 +66,16 @@ class FileCache:
         """
         self.log_printer = log_printer
         self.project_dir = project_dir
+        self.project = hash_id(project_dir)
         self.current_time = int(time.time())
+        self.store = open_cache_store(log_printer)
+
+        if not flush_cache:
+            self._remove_pickle_cache()
 
-        cache_data = pickle_load(log_printer, project_dir, {})
-        last_time = -1
-        if "time" in cache_data:
-            last_time = cache_data["time"]
+        last_time = self.store.get_time(self.project)
+        if last_time is None:
+            last_time = -1
         if not flush_cache and last_time > self.current_time:
             log_printer.warn("It seems like you went back in time - your "
                              "system time is behind the last recorded run "
@@ -93,15 +83,29 @@ class FileCache:
                              "be force flushed.")
             flush_cache = True
 
-        self.data = cache_data.get("files", {})
+        self._new_results = {}
         if flush_cache:
             self.flush_cache()
 
+    def _remove_pickle_cache(self):
+        """
+        Removes the cache of the project pickled by older coala versions. It
+        only holds the times the files were last analyzed, not their results,
+        so it cannot be moved into the store and the files it tracked are
+        analyzed again.
+        """
+        if delete_files(self.log_printer, [self.project_dir]):
+            self.log_printer.info("The file cache written by an older coala "
+                                  "version was reset.")
+
     def flush_cache(self):
         """
         Flushes the cache and deletes the relevant file.
         """
-        self.data = {}
+        self._new_results = {}
+        self.store.remove_project(self.project)
+        self.store.commit()
+        # Older coala versions pickled the cache to a file of its own.
         delete_files(self.log_printer, [self.project_dir])
         self.log_printer.debug("The file cache was successfully flushed.")
 
@@ -110,62 +114,76 @@ class FileCache:
 
     def write(self):
         """
-        Update the last run time on the project for each file
+        Stores the new results and updates the last run time on the project
         to the current time. Using this object as a contextmanager is
         preferred (that will automatically call this method on exit).
         """
-        for file_name in self.data:
-            self.data[file_name] = self.current_time
-        pickle_dump(
-            self.log_printer,
-            self.project_dir,
-            {"time": self.current_time, "files": self.data})
+        try:
+            for file_name, (content_hash, bear_results) in (
+                    self._new_results.items()):
+                self.store.set_results(self.project,
+                                       file_name,
+                                       content_hash,
+                                       bear_results)
+            self.store.set_time(self.project, self.current_time)
+            self.store.commit()
+        except sqlite3.OperationalError as exception:
+            self.store.rollback()
+            self.log_printer.warn("The cache could not be written: {}"
+                                  .format(exception))
+            return
+
+        self._new_results = {}
 
     def __exit__(self, type, value, traceback):
         """
-        Update the last run time on the project for each file
+        Stores the new results and updates the last run time on the project
         to the current time.
         """
         self.write()
 
-    def untrack_files(self, files):
+    def get_results(self, filename, content_hash, bear_key):
         """
-        Removes the given files from the cache so that they are no longer
-        considered cached for this and the next run.
-
-        :param files: A set of files to remove from cache.
+        Retrieves the results a bear yielded on a file in a previous run.
+
+        :param filename:     The name of the file.
+        :param content_hash: A hash of the current contents of the file.
+        :param bear_key:     A tuple of the name, the settings hash and the
+                             version of the bear.
+        :return:             The list of results or None if there are no
+                             results cached for these contents and bear.
         """
-        for file in files:
-            if file in self.data:
-                del self.data[file]
-
-    def track_files(self, files):
+        cached_hash, bear_results = self._new_results.get(filename,
+                                                          (None, {}))
+        if cached_hash == content_hash and bear_key in bear_results:
+            return pickle.loads(bear_results[bear_key])
+
+        # Results of other contents are dropped when the cache is written.
+        if cached_hash not in (None, content_hash):
+            return None
+
+        results = self.store.get_results(self.project,
+                                         filename,
+                                         content_hash,
+                                         bear_key)
+        return None if results is None else pickle.loads(results)
+
+    def set_results(self, filename, content_hash, bear_key, results):
         """
-        Start tracking files given in ``files`` by adding them to the
-        database.
-
-        :param files: A set of files that need to be tracked.
-                      These files are initialized with their last
-                      modified tag as -1.
+        Stores the results a bear yielded on a file. Results cached for other
+        contents of the file are dropped. The results are copied, changing
+        them afterwards does not affect the cache.
+
+        :param filename:     The name of the file.
+        :param content_hash: A hash of the contents the bear ran on.
+        :param bear_key:     A tuple of the name, the settings hash and the
+                             version of the bear.
+        :param results:      The list of results of the bear.
         """
-        for file in files:
-            if file not in self.data:
-                self.data[file] = -1
+        cached_hash, bear_results = self._new_results.get(filename,
+                                                          (None, {}))
+        if cached_hash != content_hash:
+            bear_results = {}
+            self._new_results[filename] = (content_hash, bear_results)
 
-    def get_uncached_files(self, files):
-        """
-        Returns the set of files that are not in the cache yet or have been
-        untracked.
-
-        :param files: The list of collected files.
-        :return:      A set of files that are uncached.
-        """
-        if self.data == {}:
-            # The first run on this project. So all files are new
-            # and must be returned irrespective of whether caching is turned on.
-            return files
-        else:
-            return {file
-                    for file in files
-                    if (file not in self.data or
-                        int(os.path.getmtime(file)) > self.data[file])}
+        bear_results[bear_key] = pickle.dumps(results)
@@ -1,9 +1,16 @@
-import copy
 import hashlib
+import inspect
 import os
 import pickle
+import sqlite3
+import sys
+import sysconfig
+from functools import lru_cache
+from itertools import chain
 
+from coalib import VERSION
 from coalib.misc import Constants
+from coalib.misc.CacheStore import CacheStore
 
 
 def get_data_path(log_printer, identifier):
@@ -122,72 +129,188 @@ def hash_id(text):
     """
     Hashes the given text.
 
-    :param text: String to to be hashed
+    :param text: String or UTF-8 encoded bytes to be hashed
     :return:     A MD5 hash of the given string
     """
-    return hashlib.md5(text.encode("utf-8")).hexdigest()
+    if isinstance(text, str):
+        text = text.encode("utf-8")
+    return hashlib.md5(text).hexdigest()
 
 
-def get_settings_hash(sections,
-                      targets=[],
-                      ignore_settings: list=["disable_caching"]):
+def get_bear_settings_hash(bear_class, section):
     """
-    Compute and return a unique hash for the settings.
+    Compute a hash of the settings a bear takes from a section. The settings
+    of the bears it depends on are included as their results are passed to
+    it.
 
-    :param sections:        A dict containing the settings for each section.
-    :param targets:         The list of sections that are enabled.
-    :param ignore_settings: Setting keys to remove from sections before
-                            hashing.
-    :return:                A MD5 hash that is unique to the settings used.
+    :param bear_class: The class of the bear.
+    :param section:    The section the bear is run in.
+    :return:           A MD5 hash that is unique to the settings of the bear.
     """
-    settings = []
-    for section in sections:
-        if section in targets or targets == []:
-            section_copy = copy.deepcopy(sections[section])
-            for setting in ignore_settings:
-                if setting in section_copy:
-                    section_copy.delete_setting(setting)
-            settings.append(str(section_copy))
+    metadata = bear_class.get_metadata()
+    settings = sorted(
+        (name, get_setting_fingerprint(section[name])
+         if name in section else None)
+        for name in chain(metadata.non_optional_params,
+                          metadata.optional_params))
+    for dependency in sorted(bear_class.BEAR_DEPS, key=lambda bear: bear.name):
+        settings.append(get_bear_settings_hash(dependency, section))
 
     return hash_id(str(settings))
 
 
-def settings_changed(log_printer, settings_hash):
+def _is_stdlib_file(path):
     """
-    Determine if the settings have changed since the last run with caching.
+    Checks if a file belongs to the standard library, i.e. it is in its
+    directory but not in the ``site-packages`` directory within.
+    """
+    paths = sysconfig.get_paths()
+    path = os.path.normcase(os.path.abspath(path))
+
+    def is_in(directory):
+        directory = os.path.normcase(os.path.abspath(directory))
+        return path.startswith(directory + os.sep)
+
+    return (any(is_in(paths[name]) for name in ("stdlib", "platstdlib")) and
+            not any(is_in(paths[name]) for name in ("purelib", "platlib")))
 
-    :param log_printer:   A LogPrinter object to use for logging.
-    :param settings_hash: A MD5 hash that is unique to the settings used.
-    :return:              Return True if the settings hash has changed
-                          Return False otherwise.
+
+def _get_used_modules(module):
+    """
+    Yields the modules a module uses: the modules and the modules of the
+    classes and functions in its namespace.
     """
-    project_hash = hash_id(os.getcwd())
+    for value in vars(module).values():
+        if inspect.ismodule(value):
+            yield value
+        elif inspect.isclass(value) or inspect.isfunction(value):
+            used_module = sys.modules.get(value.__module__)
+            if used_module is not None:
+                yield used_module
 
-    settings_hash_db = pickle_load(log_printer, "settings_hash_db", {})
-    if project_hash not in settings_hash_db:
-        # This is the first time coala is run on this project, so the cache
-        # will be flushed automatically.
-        return False
 
-    result = settings_hash_db[project_hash] != settings_hash
-    if result:
-        del settings_hash_db[project_hash]
-        log_printer.debug("Since the configuration settings have "
-                          "changed since the last run, the "
-                          "cache will be flushed and rebuilt.")
+def get_module_files(module):
+    """
+    Finds the files of a module and of all modules it uses, directly or
+    through other modules, except for the standard library.
 
-    return result
+    >>> import coalib.misc.CachingUtilities as module
+    >>> module.__file__ in get_module_files(module)
+    True
+    >>> sysconfig.__file__ in get_module_files(module)
+    False
+
+    :param module: The module.
+    :return:       A set of the paths of the files.
+    """
+    files = set()
+    seen = {module}
+    modules = [module]
+    while modules:
+        module = modules.pop()
+        path = getattr(module, "__file__", None)
+        # Builtin modules have no file.
+        if path is None or _is_stdlib_file(path):
+            continue
+
+        files.add(path)
+        for used_module in _get_used_modules(module):
+            if used_module not in seen:
+                seen.add(used_module)
+                modules.append(used_module)
+
+    return files
+
+
+@lru_cache(maxsize=None)
+def _hash_file(path, mtime, size):
+    with open(path, "rb") as file:
+        return hashlib.md5(file.read()).hexdigest()
+
+
+def hash_file(path):
+    """
+    Hashes the contents of a file. The hash is only computed again when the
+    file was modified.
 
+    :param path:     The path of the file.
+    :return:         A MD5 hash of the contents.
+    :raises OSError: If the file cannot be read.
+    """
+    stat = os.stat(path)
+    return _hash_file(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=None)
+def get_bear_version(bear_class):
+    """
+    Compute a version of the given bear that changes whenever the code of the
+    bear, of the bears it depends on or of coala changes. The code of the
+    bear includes all modules its module uses except for the standard
+    library, e.g. helper modules next to the bear.
+
+    :param bear_class: The class of the bear.
+    :return:           A MD5 hash identifying the version of the bear or
+                       ``None`` if its source file cannot be read.
+    """
+    versions = [VERSION]
+    try:
+        versions.append(hash_file(inspect.getsourcefile(bear_class)))
+    except (OSError, TypeError):
+        return None
+
+    module = sys.modules.get(bear_class.__module__)
+    for path in sorted(get_module_files(module) if module else ()):
+        try:
+            versions.append(hash_file(path))
+        except OSError:
+            # E.g. modules imported from zip files.
+            pass
+
+    for dependency in sorted(bear_class.BEAR_DEPS, key=lambda bear: bear.name):
+        versions.append(get_bear_version(dependency))
+        if versions[-1] is None:
+            return None
 
-def update_settings_db(log_printer, settings_hash):
+    return hash_id(str(versions))
+
+
+def get_setting_fingerprint(setting):
     """
-    Update the config file last modification date.
+    Describe a setting by what determines its meaning: its value and the
+    file it originates from, which relative paths are resolved against.
+
+    :param setting: The setting.
+    :return:        A tuple of the value and the origin of the setting.
+    """
+    return str(setting), setting.origin
+
 
-    :param log_printer:   A LogPrinter object to use for logging.
-    :param settings_hash: A MD5 hash that is unique to the settings used.
+def open_cache_store(log_printer):
     """
-    project_hash = hash_id(os.getcwd())
+    Open the database holding the caches of all projects in the user's data
+    directory. The ``settings_hash_db`` older coala versions pickled is
+    removed, cached results are bound to the settings of their bears
+    instead.
 
-    settings_hash_db = pickle_load(log_printer, "settings_hash_db", {})
-    settings_hash_db[project_hash] = settings_hash
-    pickle_dump(log_printer, "settings_hash_db", settings_hash_db)
+    :param log_printer: A LogPrinter object to use for logging.
+    :return:            A ``CacheStore``. If the data directory cannot be
+                        used, the store is kept in memory only.
+    """
+    file_path = get_data_path(log_printer, "cache_store")
+    if file_path is None:
+        return CacheStore(":memory:")
+
+    try:
+        store = CacheStore(file_path)
+    except sqlite3.DatabaseError:
+        log_printer.warn("The cache database is corrupted and will be "
+                         "removed.")
+        delete_files(log_printer, ["cache_store"])
+        store = CacheStore(file_path)
+
+    settings_hash_db = get_data_path(log_printer, "settings_hash_db")
+    if os.path.isfile(settings_hash_db):
+        delete_files(log_printer, ["settings_hash_db"])
+
+    return store
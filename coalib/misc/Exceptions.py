@@ -1,9 +1,19 @@
+import sys
+
 from pyprint.NullPrinter import NullPrinter
 
 from coalib.misc import Constants
 from coalib.output.printers.LogPrinter import LogPrinter
 
-from pkg_resources import VersionConflict
+
+def _is_version_conflict(exception):
+    # Only pkg_resources raises version conflicts, there is no need to load
+    # it, which takes long, if it was not used.
+    if "pkg_resources" not in sys.modules:
+        return False
+
+    from pkg_resources import VersionConflict
+    return isinstance(exception, VersionConflict)
 
 
 def get_exitcode(exception, log_printer=None):
@@ -18,7 +28,7 @@ def get_exitcode(exception, log_printer=None):
         exitcode = 0
     elif isinstance(exception, SystemExit):
         exitcode = exception.code
-    elif isinstance(exception, VersionConflict):
+    elif _is_version_conflict(exception):
         log_message = Constants.VERSION_CONFLICT_MESSAGE % str(exception.req)
         log_printer.log_exception(log_message, exception)
         exitcode = 13
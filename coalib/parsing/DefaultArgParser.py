@@ -2,7 +2,13 @@ import argparse
 import sys
 
 from coalib.misc import Constants
-from coalib.collecting.Collectors import get_all_bears_names
+
+
+def _complete_bear_names(*args, **kwargs):  # pragma: no cover
+    # Collecting bears needs many modules, they are loaded only when
+    # completing.
+    from coalib.collecting.Collectors import get_all_bears_names
+    return get_all_bears_names()
 
 
 class CustomFormatter(argparse.RawDescriptionHelpFormatter):
@@ -116,8 +122,7 @@ coala can also automatically fix your code:
 
     inputs_group.add_argument(
         '-b', '--bears', nargs='+', metavar='NAME',
-        help='names of bears to use').completer = (
-            lambda *args, **kwargs: get_all_bears_names())  # pragma: no cover
+        help='names of bears to use').completer = _complete_bear_names
 
     inputs_group.add_argument(
         '-f', '--files', nargs='+', metavar='FILE',
@@ -3,6 +3,11 @@ import platform
 import re
 from functools import lru_cache
 
+try:
+    from os import scandir
+except ImportError:  # pragma: no cover (Python 3.4)
+    from scandir import scandir
+
 from coala_utils.decorators import yield_once
 from coalib.misc.Constants import GLOBBING_SPECIAL_CHARS
 
@@ -219,18 +224,92 @@ def fnmatch(name, globs):
     if len(globs) == 0:
         return True
 
-    name = os.path.normcase(name)
+    return _get_glob_set(globs).match(name)
+
+
+class GlobSet:
+    """
+    A list of globs compiled to be matched at once. Globs without wildcards,
+    globs like ``*.py`` and globs like ``vendor/**`` are matched with plain
+    string operations, all others with one combined regular expression.
+
+    >>> glob_set = GlobSet(["*.py", "vendor/**", "(setup|conf).cfg"])
+    >>> glob_set.match("Globbing.py")
+    True
+    >>> glob_set.match(os.path.join("vendor", "lib", "module.c"))
+    True
+    >>> glob_set.match("conf.cfg")
+    True
+    >>> glob_set.match(os.path.join("coalib", "Globbing.py"))
+    False
+    """
+
+    def __init__(self, globs):
+        """
+        Compiles the given globs.
+
+        :param globs: Glob string with wildcards or list of globs. The syntax
+                      is the one of ``fnmatch``.
+        """
+        globs = (globs,) if isinstance(globs, str) else globs
+        # '*' does not match these characters.
+        self._separators = ('/\\' if platform.system() == 'Windows'
+                            else os.sep)
+
+        self._literals = set()
+        self._prefixes = []
+        self._suffixes = []
+        regexes = []
+        for glob in globs:
+            for pattern in _iter_alternatives(glob):
+                pattern = os.path.normcase(os.path.expanduser(pattern))
+                if not has_wildcard(pattern):
+                    self._literals.add(pattern)
+                elif (pattern.endswith('**') and
+                        not has_wildcard(pattern[:-2])):
+                    self._prefixes.append(pattern[:-2])
+                elif (pattern.startswith('*') and
+                        not has_wildcard(pattern[1:])):
+                    self._suffixes.append(pattern[1:])
+                else:
+                    # Flags are given to re.compile for the whole expression.
+                    regexes.append(translate(pattern)[:-len('(?ms)')])
+
+        self._prefixes = tuple(self._prefixes)
+        self._suffixes = tuple(self._suffixes)
+        self._regex = (re.compile('|'.join('(?:' + regex + ')'
+                                           for regex in regexes),
+                                  re.MULTILINE | re.DOTALL)
+                       if regexes else None)
+
+    def _match_suffix(self, name):
+        for suffix in self._suffixes:
+            if name.endswith(suffix):
+                head = name[:len(name)-len(suffix)]
+                if not any(separator in head
+                           for separator in self._separators):
+                    return True
+        return False
+
+    def match(self, name):
+        """
+        Tests whether name matches one of the globs.
 
-    return any(compiled_pattern.match(name)
-               for glob in globs
-               for compiled_pattern in _compile_pattern(glob))
+        :param name: File or directory name
+        :return:     Boolean: Whether or not name is matched by a glob
+        """
+        name = os.path.normcase(name)
 
+        return (name in self._literals or
+                name.startswith(self._prefixes) or
+                self._match_suffix(name) or
+                (self._regex is not None and
+                 self._regex.match(name) is not None))
 
-@lru_cache()
-def _compile_pattern(pattern):
-    return tuple(re.compile(translate(os.path.normcase(
-                     os.path.expanduser(pat))))
-                 for pat in _iter_alternatives(pattern))
+
+@lru_cache(maxsize=256)
+def _get_glob_set(globs):
+    return GlobSet(globs)
 
 
 def _absolute_flat_glob(pattern):
@@ -252,6 +331,37 @@ def _absolute_flat_glob(pattern):
     return
 
 
+def _iter_relative_entries(dirname, prune=None):
+    """
+    Recursively iterates the entries of dirname and all its subdirectories.
+    The type of every entry is taken from ``os.scandir``, so no additional
+    system calls are needed to tell files and directories apart.
+
+    :param dirname: Directory name
+    :param prune:   Function that gets the path of a directory relative to
+                    dirname and returns whether its contents shall be left
+                    out. The directory itself is still yielded.
+    :return:        Iterator that yields tuples of the path of every file and
+                    directory relative to dirname and its ``os.DirEntry``
+    """
+    try:
+        entries = list(scandir(dirname or os.curdir))
+    except OSError:
+        return
+    for entry in entries:
+        yield entry.name, entry
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            continue
+        if is_dir and not (prune and prune(entry.name)):
+            for sub_name, sub_entry in _iter_relative_entries(
+                    entry.path,
+                    prune and (lambda name, parent=entry.name:
+                               prune(os.path.join(parent, name)))):
+                yield os.path.join(entry.name, sub_name), sub_entry
+
+
 def _iter_relative_dirs(dirname):
     """
     Recursively iterates subdirectories of all levels from dirname
@@ -260,73 +370,111 @@ def _iter_relative_dirs(dirname):
     :return:        Iterator that yields files and directory from the given dir
                     and all it's (recursive) subdirectories
     """
-    if not dirname:
-        dirname = os.curdir
-    try:
-        files_or_dirs = os.listdir(dirname)
-    except os.error:
-        return
-    for file_or_dir in files_or_dirs:
-        yield file_or_dir
-        path = os.path.join(dirname, file_or_dir)
-        for sub_file_or_dir in _iter_relative_dirs(path):
-            yield os.path.join(file_or_dir, sub_file_or_dir)
+    for name, _ in _iter_relative_entries(dirname):
+        yield name
 
 
-def relative_wildcard_glob(dirname, pattern):
+def get_prune_function(ignored_globs):
+    """
+    Creates a function telling whether all paths inside a directory are
+    matched by one of the given globs, so the directory does not need to be
+    walked at all. This is the case for globs ending with ``**`` after a
+    separator, like ``node_modules/**``.
+
+    >>> prune = get_prune_function(["**/node_modules/**", "*.pyc"])
+    >>> prune(os.path.join("project", "node_modules"))
+    True
+    >>> prune("project")
+    False
+    >>> get_prune_function(["*.pyc"]) is None
+    True
+
+    :param ignored_globs: Glob string with wildcards or list of globs.
+    :return:              A function getting the path of a directory and
+                          returning whether it can be left out or None if no
+                          directory can be left out.
+    """
+    globs = (ignored_globs,) if isinstance(ignored_globs, str) \
+        else tuple(ignored_globs or ())
+    suffix = os.sep + '**'
+    dir_globs = tuple(pattern[:-len(suffix)]
+                      for glob in globs
+                      for pattern in map(os.path.normcase,
+                                         _iter_alternatives(glob))
+                      if pattern.endswith(suffix))
+
+    if not dir_globs:
+        return None
+
+    return lambda path: fnmatch(path, dir_globs)
+
+
+def relative_wildcard_glob(dirname, pattern, prune=None):
     """
     Non-recursive glob for one directory. Accepts wildcards.
 
     :param dirname: Directory name
     :param pattern: Glob pattern with wildcards
-    :return:        List of files in the dir of dirname that match the pattern
-    """
-    if not dirname:
-        dirname = os.curdir
-    try:
-        if '**' in pattern:
-            names = list(_iter_relative_dirs(dirname))
-        else:
-            names = os.listdir(dirname)
-    except OSError:
-        return []
+    :param prune:   Function telling whether the contents of a directory
+                    given by its path shall be left out when ``**`` is in the
+                    pattern
+    :return:        List of tuples of the names of the files in the dir of
+                    dirname that match the pattern and their ``os.DirEntry``
+    """
+    if '**' in pattern:
+        entries = _iter_relative_entries(
+            dirname,
+            prune and (lambda name: prune(os.path.join(dirname, name))))
+    else:
+        try:
+            entries = [(entry.name, entry)
+                       for entry in scandir(dirname or os.curdir)]
+        except OSError:
+            return []
     result = []
     pattern = os.path.normcase(pattern)
     match = re.compile(translate(pattern)).match
-    for name in names:
+    for name, entry in entries:
         if match(os.path.normcase(name)):
-            result.append(name)
+            result.append((name, entry))
     return result
 
 
-def relative_flat_glob(dirname, basename):
+def relative_flat_glob(dirname, basename, prune=None):
     """
     Non-recursive glob for one directory. Does not accept wildcards.
 
     :param dirname:  Directory name
     :param basename: Basename of a file in dir of dirname
-    :return:         List containing Basename if the file exists
+    :param prune:    Unused, for compatibility with the other relative glob
+                     functions
+    :return:         List containing a tuple of basename and None if the file
+                     exists
     """
     if os.path.exists(os.path.join(dirname, basename)):
-        return [basename]
-    return[]
+        return [(basename, None)]
+    return []
 
 
-def relative_recursive_glob(dirname, pattern):
+def relative_recursive_glob(dirname, pattern, prune=None):
     """
     Recursive Glob for one directory and all its (nested) subdirectories.
     Accepts only '**' as pattern.
 
     :param dirname: Directory name
     :param pattern: The recursive wildcard '**'
-    :return:        Iterator that yields all the (nested) subdirectories of the
-                    given dir
+    :param prune:   Function telling whether the contents of a directory
+                    given by its path shall be left out
+    :return:        Iterator that yields tuples of all the (nested)
+                    subdirectories of the given dir and their ``os.DirEntry``
+                    or None for the given dir itself
     """
     assert pattern == '**'
     if dirname:
-        yield pattern[:0]
-    for relative_dir in _iter_relative_dirs(dirname):
-        yield relative_dir
+        yield pattern[:0], None
+    yield from _iter_relative_entries(
+        dirname,
+        prune and (lambda name: prune(os.path.join(dirname, name))))
 
 
 wildcard_check_pattern = re.compile('([*?[])')
@@ -343,21 +491,31 @@ def has_wildcard(pattern):
     return match is not None
 
 
-def iglob(pattern):
+def iglob_entries(pattern, ignored_globs=None):
     """
-    Iterates all filesystem paths that get matched by the glob pattern.
+    Iterates all filesystem paths that get matched by the glob pattern along
+    with their ``os.DirEntry`` if it is known from walking the directories.
     Syntax is equal to that of fnmatch.
 
-    :param pattern: Glob pattern with wildcards
-    :return:        Iterator that yields all file names that match pattern
+    :param pattern:       Glob pattern with wildcards
+    :param ignored_globs: Globs of paths that are going to be ignored. The
+                          contents of directories that can only contain
+                          ignored paths are not walked. Other paths matching
+                          them are still yielded.
+    :return:              Iterator that yields tuples of all file names that
+                          match pattern and their ``os.DirEntry`` or None
     """
+    return _iglob_entries(pattern, get_prune_function(ignored_globs))
+
+
+def _iglob_entries(pattern, prune):
     for pat in _iter_alternatives(pattern):
         pat = os.path.expanduser(pat)
         pat = os.path.normcase(pat)
         dirname, basename = os.path.split(pat)
         if not has_wildcard(pat):
             for file in _absolute_flat_glob(pat):
-                yield file
+                yield file, None
             return
 
         if basename == '**':
@@ -368,20 +526,39 @@ def iglob(pattern):
             relative_glob_function = relative_flat_glob
 
         if not dirname:
-            for file in relative_glob_function(dirname, basename):
-                yield file
+            yield from relative_glob_function(dirname, basename, prune)
             return
 
         # Prevent an infinite recursion if a drive or UNC path contains
         # wildcard characters (i.e. r'\\?\C:').
         if dirname != pat and has_wildcard(dirname):
-            dirs = iglob(dirname)
+            dirs = (path for path, _ in _iglob_entries(dirname, prune))
         else:
             dirs = [dirname]
 
         for dirname in dirs:
-            for name in relative_glob_function(dirname, basename):
-                yield os.path.join(dirname, name)
+            if prune and prune(dirname):
+                continue
+            for name, entry in relative_glob_function(dirname,
+                                                      basename,
+                                                      prune):
+                yield os.path.join(dirname, name), entry
+
+
+def iglob(pattern, ignored_globs=None):
+    """
+    Iterates all filesystem paths that get matched by the glob pattern.
+    Syntax is equal to that of fnmatch.
+
+    :param pattern:       Glob pattern with wildcards
+    :param ignored_globs: Globs of paths that are going to be ignored. The
+                          contents of directories that can only contain
+                          ignored paths are not walked.
+    :return:              Iterator that yields all file names that match
+                          pattern
+    """
+    for path, _ in iglob_entries(pattern, ignored_globs):
+        yield path
 
 
 def glob(pattern):
@@ -0,0 +1,124 @@
+import multiprocessing
+import pickle
+
+from coalib.processes.BearRunning import run_tasks
+from coalib.processes.LogPrinterThread import LogPrinterThread
+
+
+class BearPool:
+    """
+    A pool of processes running bears that is reused for several sections.
+
+    Queues can only be shared with processes that are started after they are
+    created, so the pool creates one set of queues for every section it will
+    run up front. The bears of a section are sent to the processes as a task
+    and the processes run them just like the processes ``execute_section``
+    spawns for a single section. As a process takes the next task as soon as
+    it is done with a section, the sections may run concurrently.
+    """
+
+    def __init__(self, process_count, section_count, log_printer):
+        """
+        Creates the processes and queues of the pool. The processes are not
+        started yet, use ``start`` to do so.
+
+        :param process_count: The number of processes to run bears in.
+        :param section_count: The number of sections that will be run.
+        :param log_printer:   The log printer to print the messages of the
+                              bears to.
+        """
+        self.message_queue = multiprocessing.Queue()
+        self.task_queue = multiprocessing.Queue()
+        self.section_queues = [(multiprocessing.Queue(),
+                                multiprocessing.Queue(),
+                                multiprocessing.Queue(),
+                                multiprocessing.Queue())
+                               for i in range(section_count)]
+        self._used_sections = 0
+
+        self.processes = [
+            multiprocessing.Process(target=run_tasks,
+                                    args=(self.task_queue,
+                                          self.section_queues,
+                                          self.message_queue))
+            for i in range(process_count)]
+        self.logger_thread = LogPrinterThread(self.message_queue, log_printer)
+        self._manager = None
+
+    def start(self):
+        """
+        Starts the processes and the thread printing their messages.
+        """
+        for process in self.processes:
+            process.start()
+
+        self.logger_thread.start()
+
+    def next_section_queues(self):
+        """
+        Reserves the queues for the next section.
+
+        :return:           A tuple of the index of the queues to pass to
+                           ``submit`` and a tuple of the file name queue, the
+                           global bear queue, the control queue and the
+                           global finished queue.
+        :raises IndexError: If the queues of all sections are used already.
+        """
+        section_index = self._used_sections
+        queues = self.section_queues[section_index]
+        self._used_sections += 1
+        return section_index, queues
+
+    def create_dict(self):
+        """
+        Creates a dictionary shared with the processes. The dictionaries of
+        all sections live in the server process of one
+        ``multiprocessing.Manager``, which is started when the first one is
+        created.
+
+        :return: A proxy of the new dictionary.
+        """
+        if self._manager is None:
+            self._manager = multiprocessing.Manager()
+
+        return self._manager.dict()
+
+    def submit(self, section_index, job_count, run_args):
+        """
+        Lets processes of the pool run the bears of a section. The queues of
+        the section have to be filled with one ``None`` at the end for every
+        job.
+
+        :param section_index:     The index of the section queues the
+                                  processes use.
+        :param job_count:         The number of processes that work on the
+                                  section at most.
+        :param run_args:          The arguments the ``run`` method of
+                                  ``BearRunning`` gets except for the queues.
+        :raises PicklingError:    If the bears cannot be sent to the
+                                  processes. Other exceptions like TypeError
+                                  and AttributeError are raised by some
+                                  unpicklable objects too.
+        """
+        # The arguments are pickled only once for all processes.
+        task = (section_index, pickle.dumps(run_args))
+        for i in range(job_count):
+            self.task_queue.put(task)
+
+    def close(self):
+        """
+        Waits for the processes to finish all tasks and stops them and the
+        thread printing their messages.
+        """
+        for process in self.processes:
+            self.task_queue.put(None)
+
+        for process in self.processes:
+            process.join()
+
+        self.logger_thread.stop()
+        self.logger_thread.join()
+
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
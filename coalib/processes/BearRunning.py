@@ -1,5 +1,8 @@
+import pickle
 import queue
+import time
 import traceback
+from itertools import chain
 
 from coalib.bears.BEAR_KIND import BEAR_KIND
 from coalib.bears.GlobalBear import GlobalBear
@@ -244,6 +247,79 @@ def run_global_bear(message_queue,
                     **kwargs)
 
 
+def get_local_results(message_queue,
+                      timeout,
+                      file_dict,
+                      local_bear_list,
+                      filename,
+                      failed_bears=None):
+    """
+    Runs a list of local bears on one file and returns all their results.
+
+    :param message_queue:   A queue that contains messages of type
+                            errors/warnings/debug statements to be printed
+                            in the Log.
+    :param timeout:         The queue blocks at most timeout seconds for a
+                            free slot to execute the put operation on. After
+                            the timeout it returns queue Full exception.
+    :param file_dict:       Dictionary that contains contents of files.
+    :param local_bear_list: List of local bears to run on file.
+    :param filename:        The name of file on which to run the bears.
+    :param failed_bears:    A list the names of the bears that failed to run
+                            are appended to.
+    :return:                The list of all results or None if the file is
+                            not in the file dictionary.
+    """
+    if filename not in file_dict:
+        send_msg(message_queue,
+                 timeout,
+                 LOG_LEVEL.ERROR,
+                 "An internal error occurred.",
+                 Constants.THIS_IS_A_BUG)
+        send_msg(message_queue,
+                 timeout,
+                 LOG_LEVEL.DEBUG,
+                 "The given file through the queue is not in the file "
+                 "dictionary.")
+
+        return None
+
+    local_result_list = []
+    for bear_instance in local_bear_list:
+        result = run_local_bear(message_queue,
+                                timeout,
+                                local_result_list,
+                                file_dict,
+                                bear_instance,
+                                filename)
+        if result is not None:
+            local_result_list.extend(result)
+        elif failed_bears is not None:
+            failed_bears.append(bear_instance.__class__.__name__)
+
+    return local_result_list
+
+
+def store_results(result_dict, key, results):
+    """
+    Stores results so the main process can access them.
+
+    :param result_dict: A Manager.dict to store the results in or None to
+                        send them along with the control element.
+    :param key:         The key of the results, i.e. a filename or a bear
+                        name.
+    :param results:     The results to store.
+    :return:            The index to put into the control queue: the key if
+                        the results were stored in the result_dict, else a
+                        tuple of the key and the results.
+    """
+    if result_dict is None:
+        return key, results
+
+    result_dict[key] = results
+    return key
+
+
 def run_local_bears_on_file(message_queue,
                             timeout,
                             file_dict,
@@ -264,41 +340,95 @@ def run_local_bears_on_file(message_queue,
     :param local_bear_list:   List of local bears to run on file.
     :param local_result_dict: A Manager.dict that will be used to store local
                               bear results. A list of all local bear results
-                              will be stored with the filename as key.
+                              will be stored with the filename as key. If
+                              None, the results are sent along with the
+                              control element instead.
     :param control_queue:     If any result gets written to the result_dict a
                               tuple containing a CONTROL_ELEMENT (to indicate
                               what kind of event happened) and either a bear
                               name(for global results) or a file name to
                               indicate the result will be put to the queue.
+                              Results that are not stored in a result_dict
+                              are put as a tuple of the file name and the
+                              result list instead of the file name.
     :param filename:          The name of file on which to run the bears.
     """
-    if filename not in file_dict:
-        send_msg(message_queue,
-                 timeout,
-                 LOG_LEVEL.ERROR,
-                 "An internal error occurred.",
-                 Constants.THIS_IS_A_BUG)
-        send_msg(message_queue,
-                 timeout,
-                 LOG_LEVEL.DEBUG,
-                 "The given file through the queue is not in the file "
-                 "dictionary.")
-
-        return
-
-    local_result_list = []
-    for bear_instance in local_bear_list:
-        result = run_local_bear(message_queue,
-                                timeout,
-                                local_result_list,
-                                file_dict,
-                                bear_instance,
-                                filename)
-        if result is not None:
-            local_result_list.extend(result)
+    failed_bears = []
+    local_result_list = get_local_results(message_queue,
+                                          timeout,
+                                          file_dict,
+                                          local_bear_list,
+                                          filename,
+                                          failed_bears)
+    if failed_bears:
+        control_queue.put((CONTROL_ELEMENT.LOCAL_FAILED,
+                           [(filename, failed_bears)]))
+    if local_result_list is not None:
+        control_queue.put((CONTROL_ELEMENT.LOCAL,
+                           store_results(local_result_dict,
+                                         filename,
+                                         local_result_list)))
+
+
+def run_local_bears_on_files(message_queue,
+                             timeout,
+                             file_dict,
+                             local_bear_list,
+                             local_result_dict,
+                             control_queue,
+                             filenames):
+    """
+    This method runs a list of local bears on a chunk of files. Unlike
+    ``run_local_bears_on_file`` only one control element is put to the
+    control queue for the whole chunk, its index is a list of the indices
+    ``run_local_bears_on_file`` would have put for each file. The same goes
+    for the names of bears that failed to run.
 
-    local_result_dict[filename] = local_result_list
-    control_queue.put((CONTROL_ELEMENT.LOCAL, filename))
+    :param message_queue:     A queue that contains messages of type
+                              errors/warnings/debug statements to be printed
+                              in the Log.
+    :param timeout:           The queue blocks at most timeout seconds for a
+                              free slot to execute the put operation on. After
+                              the timeout it returns queue Full exception.
+    :param file_dict:         Dictionary that contains contents of files.
+    :param local_bear_list:   List of local bears to run on the files.
+    :param local_result_dict: A Manager.dict that will be used to store local
+                              bear results or None to send them along with the
+                              control element.
+    :param control_queue:     The queue to put the control element for the
+                              chunk to.
+    :param filenames:         A list of names of files on which to run the
+                              bears. To run only some of the bears on a file,
+                              a tuple of its name and the indices of those
+                              bears in the local_bear_list can be given
+                              instead.
+    """
+    indices = []
+    failures = []
+    for filename in filenames:
+        bears = local_bear_list
+        if isinstance(filename, tuple):
+            filename, bear_indices = filename
+            bears = [local_bear_list[index] for index in bear_indices]
+
+        failed_bears = []
+        local_result_list = get_local_results(message_queue,
+                                              timeout,
+                                              file_dict,
+                                              bears,
+                                              filename,
+                                              failed_bears)
+        if failed_bears:
+            failures.append((filename, failed_bears))
+        if local_result_list is not None:
+            indices.append(store_results(local_result_dict,
+                                         filename,
+                                         local_result_list))
+
+    if failures:
+        control_queue.put((CONTROL_ELEMENT.LOCAL_FAILED, failures))
+    if indices:
+        control_queue.put((CONTROL_ELEMENT.LOCAL, indices))
 
 
 def get_global_dependency_results(global_result_dict, bear_instance):
@@ -335,10 +465,16 @@ def get_global_dependency_results(global_result_dict, bear_instance):
 def get_next_global_bear(timeout,
                          global_bear_queue,
                          global_bear_list,
-                         global_result_dict):
+                         global_result_dict,
+                         postponed_bears=None):
     """
     Retrieves the next global bear.
 
+    Bears whose dependencies did not finish yet are put back to the queue.
+    Their indices are remembered in ``postponed_bears``: the end of the queue
+    is only accepted when all of them are finished, otherwise they could end
+    up behind the ``None`` elements that mark the end of the queue.
+
     :param timeout:            The queue blocks at most timeout seconds for a
                                free slot to execute the put operation on. After
                                the timeout it returns queue Full exception.
@@ -349,18 +485,34 @@ def get_next_global_bear(timeout,
     :param global_result_dict: A Manager.dict that will be used to store global
                                results. The list of results of one global bear
                                will be stored with the bear name as key.
-    :return:                   (bear, bearname, dependency_results)
+    :param postponed_bears:    A set of indices of bears that were put back to
+                               the queue. It is updated in place.
+    :return:                   (bear, dependency_results) or (None, None) if
+                               the end of the queue was reached.
     """
+    postponed_bears = set() if postponed_bears is None else postponed_bears
     dependency_results = False
 
     while dependency_results is False:
         bear_id = global_bear_queue.get(timeout=timeout)
+        if bear_id is None:
+            postponed_bears -= {
+                index for index in postponed_bears
+                if global_bear_list[index].__class__.__name__ in
+                global_result_dict}
+            if not postponed_bears:
+                return None, None
+
+            global_bear_queue.put(bear_id)
+            continue
+
         bear = global_bear_list[bear_id]
 
         dependency_results = (
             get_global_dependency_results(global_result_dict, bear))
         if dependency_results is False:
             global_bear_queue.put(bear_id)
+            postponed_bears.add(bear_id)
 
     return bear, dependency_results
 
@@ -382,12 +534,16 @@ def run_local_bears(filename_queue,
                     file_dict,
                     local_bear_list,
                     local_result_dict,
-                    control_queue):
+                    control_queue,
+                    before_chunk=None):
     """
     Run local bears on all the files given.
 
-    :param filename_queue:    queue (read) of file names to check with
-                              local bears.
+    :param filename_queue:    queue (read) of file names or lists of file
+                              names to check with local bears. A list can
+                              come in a tuple with a file dictionary holding
+                              its files, which is used instead of the
+                              given one then.
     :param message_queue:     A queue that contains messages of type
                               errors/warnings/debug statements to be printed
                               in the Log.
@@ -398,34 +554,121 @@ def run_local_bears(filename_queue,
     :param local_bear_list:   List of local bears to run.
     :param local_result_dict: A Manager.dict that will be used to store local
                               bear results. A list of all local bear results
-                              will be stored with the filename as key.
+                              will be stored with the filename as key. If
+                              None, the results are sent along with the
+                              control elements instead.
     :param control_queue:     If any result gets written to the result_dict a
                               tuple containing a CONTROL_ELEMENT (to indicate
                               what kind of event happened) and either a bear
                               name(for global results) or a file name to
                               indicate the result will be put to the queue.
+    :param before_chunk:      A callable that is called before the next file
+                              names are taken from the queue, e.g. to run
+                              global bears in between.
     """
     try:
         while True:
-            filename = filename_queue.get(timeout=timeout)
-            run_local_bears_on_file(message_queue,
-                                    timeout,
-                                    file_dict,
-                                    local_bear_list,
-                                    local_result_dict,
-                                    control_queue,
-                                    filename)
+            if before_chunk is not None:
+                before_chunk()
+
+            filenames = filename_queue.get(timeout=timeout)
+            if filenames is None:
+                task_done(filename_queue)
+                return
+
+            chunk_file_dict = file_dict
+            if isinstance(filenames, tuple):
+                filenames, chunk_file_dict = filenames
+
+            if isinstance(filenames, str):
+                run_local_bears_on_file(message_queue,
+                                        timeout,
+                                        chunk_file_dict,
+                                        local_bear_list,
+                                        local_result_dict,
+                                        control_queue,
+                                        filenames)
+            else:
+                run_local_bears_on_files(message_queue,
+                                         timeout,
+                                         chunk_file_dict,
+                                         local_bear_list,
+                                         local_result_dict,
+                                         control_queue,
+                                         filenames)
             task_done(filename_queue)
     except queue.Empty:
         return
 
 
+def _run_and_store_global_bear(message_queue,
+                               timeout,
+                               bear,
+                               dependency_results,
+                               global_result_dict,
+                               control_queue,
+                               global_finished_queue):
+    bearname = bear.__class__.__name__
+    start_time = time.perf_counter()
+    result = run_global_bear(message_queue, timeout, bear, dependency_results)
+    if result:
+        global_result_dict[bearname] = result
+        control_queue.put((CONTROL_ELEMENT.GLOBAL, bearname))
+    else:
+        global_result_dict[bearname] = None
+    if global_finished_queue is not None:
+        global_finished_queue.put((bearname, time.perf_counter() - start_time))
+
+
+def run_scheduled_global_bear(message_queue,
+                              timeout,
+                              global_bear_queue,
+                              global_bear_list,
+                              global_result_dict,
+                              control_queue,
+                              global_finished_queue,
+                              wait=True):
+    """
+    Runs the next global bear a ``GlobalBearScheduler`` put to the global
+    bear queue. The bears it depends on are finished already.
+
+    :param wait:         Whether to wait for the next bear or to return
+                         right away if no bear is ready to run.
+    :return:             False if the end of the queue was reached, True
+                         otherwise.
+    :raises queue.Empty: If no bear is ready to run and wait is False or the
+                         timeout passed.
+
+    See ``run_global_bears`` for the other parameters.
+    """
+    bear_id = (global_bear_queue.get(timeout=timeout) if wait
+               else global_bear_queue.get(block=False))
+    if bear_id is None:
+        task_done(global_bear_queue)
+        return False
+
+    bear = global_bear_list[bear_id]
+    # Dependencies that could not be instantiated are never finished.
+    dependency_results = (
+        get_global_dependency_results(global_result_dict, bear) or None)
+    _run_and_store_global_bear(message_queue,
+                               timeout,
+                               bear,
+                               dependency_results,
+                               global_result_dict,
+                               control_queue,
+                               global_finished_queue)
+    task_done(global_bear_queue)
+    return True
+
+
 def run_global_bears(message_queue,
                      timeout,
                      global_bear_queue,
                      global_bear_list,
                      global_result_dict,
-                     control_queue):
+                     control_queue,
+                     global_finished_queue=None):
     """
     Run all global bears.
 
@@ -446,21 +689,42 @@ def run_global_bears(message_queue,
                                what kind of event happened) and either a bear
                                name(for global results) or a file name to
                                indicate the result will be put to the queue.
+    :param global_finished_queue:
+                               queue (write) to put a tuple of the name of
+                               every finished bear and the seconds it ran to,
+                               e.g. for a ``GlobalBearScheduler``.
     """
+    postponed_bears = set()
     try:
+        if global_finished_queue is not None:
+            while run_scheduled_global_bear(message_queue,
+                                            timeout,
+                                            global_bear_queue,
+                                            global_bear_list,
+                                            global_result_dict,
+                                            control_queue,
+                                            global_finished_queue):
+                pass
+            return
+
         while True:
             bear, dep_results = (
                 get_next_global_bear(timeout,
                                      global_bear_queue,
                                      global_bear_list,
-                                     global_result_dict))
-            bearname = bear.__class__.__name__
-            result = run_global_bear(message_queue, timeout, bear, dep_results)
-            if result:
-                global_result_dict[bearname] = result
-                control_queue.put((CONTROL_ELEMENT.GLOBAL, bearname))
-            else:
-                global_result_dict[bearname] = None
+                                     global_result_dict,
+                                     postponed_bears))
+            if bear is None:
+                task_done(global_bear_queue)
+                return
+
+            _run_and_store_global_bear(message_queue,
+                                       timeout,
+                                       bear,
+                                       dep_results,
+                                       global_result_dict,
+                                       control_queue,
+                                       None)
             task_done(global_bear_queue)
     except queue.Empty:
         return
@@ -475,15 +739,18 @@ def run(file_name_queue,
         global_result_dict,
         message_queue,
         control_queue,
-        timeout=0):
+        timeout=0,
+        global_finished_queue=None):
     """
     This is the method that is actually runs by processes.
 
     If parameters type is 'queue (read)' this means it has to implement the
     get(timeout=TIMEOUT) method and it shall raise queue.Empty if the queue
-    is empty up until the end of the timeout. If the queue has the
-    (optional!) task_done() attribute, the run method will call it after
-    processing each item.
+    is empty up until the end of the timeout. A ``None`` element marks the
+    end of the queue as well, so the queue can be read without any timeout
+    and one ``None`` has to be put for every process reading it. If the
+    queue has the (optional!) task_done() attribute, the run method will call
+    it after processing each item.
 
     If parameters type is 'queue (write)' it shall implement the
     put(object, timeout=TIMEOUT) method.
@@ -495,7 +762,16 @@ def run(file_name_queue,
                                bears. Each invocation of the run method needs
                                one such queue which it checks with all the
                                local bears. The queue could be empty.
-                               (Repeat until queue empty.)
+                               (Repeat until queue empty.) Instead of single
+                               file names, chunks (lists) of file names can be
+                               put, a control element is put for each chunk
+                               then, its index being a list of what would be
+                               put for each single file. Files in chunks can
+                               be given as a tuple of the file name and the
+                               indices of the local bears to run on it. A
+                               chunk can be put as a tuple of it and a file
+                               dictionary holding its files, so files can be
+                               sent while the processes are running already.
     :param local_bear_list:    List of local bear instances.
     :param global_bear_list:   List of global bear instances.
     :param global_bear_queue:  queue (read, write) of indexes of global bear
@@ -504,7 +780,10 @@ def run(file_name_queue,
                                file.readlines().
     :param local_result_dict:  A Manager.dict that will be used to store local
                                results. A list of all local results.
-                               will be stored with the filename as key.
+                               will be stored with the filename as key. Pass
+                               None to send the local results along with the
+                               control elements over the control_queue
+                               instead, which avoids any shared state.
     :param global_result_dict: A Manager.dict that will be used to store global
                                results. The list of results of one global bear
                                will be stored with the bear name as key.
@@ -515,16 +794,53 @@ def run(file_name_queue,
                                (to indicate what kind of event happened) and
                                either a bear name (for global results) or a
                                file name to indicate the result will be put to
-                               the queue. If the run method finished all its
+                               the queue. If no local_result_dict is given,
+                               (CONTROL_ELEMENT.LOCAL, (filename, results))
+                               will be put instead. If the run method finished
+                               all its
                                local bears it will put
                                (CONTROL_ELEMENT.LOCAL_FINISHED, None) to the
                                queue, if it finished all global ones,
                                (CONTROL_ELEMENT.GLOBAL_FINISHED, None) will
-                               be put there.
+                               be put there. Local bears that fail to run are
+                               announced before the results of their file
+                               with (CONTROL_ELEMENT.LOCAL_FAILED, [(filename,
+                               bear names)]).
     :param timeout:            The queue blocks at most timeout seconds for a
                                free slot to execute the put operation on. After
                                the timeout it returns queue Full exception.
+                               None blocks until the operation is possible.
+    :param global_finished_queue:
+                               queue (write) to announce every finished
+                               global bear to as a tuple of its name and the
+                               seconds it ran, so that the bears depending on
+                               it can be put to the global bear queue. The
+                               global bears are then run in between the local
+                               ones as soon as they are put there. If it is
+                               not given, the global bears are run after the
+                               local ones and bears whose dependencies did
+                               not finish yet are put back to the queue.
     """
+    global_bears_left = True
+
+    def run_ready_global_bear():
+        # Global bears do not need any local results, so the processes take
+        # one whenever it is ready instead of waiting for all files.
+        nonlocal global_bears_left
+        try:
+            if global_bears_left:
+                global_bears_left = run_scheduled_global_bear(
+                    message_queue,
+                    timeout,
+                    global_bear_queue,
+                    global_bear_list,
+                    global_result_dict,
+                    control_queue,
+                    global_finished_queue,
+                    wait=False)
+        except queue.Empty:
+            pass
+
     try:
         run_local_bears(file_name_queue,
                         message_queue,
@@ -532,15 +848,59 @@ def run(file_name_queue,
                         file_dict,
                         local_bear_list,
                         local_result_dict,
-                        control_queue)
+                        control_queue,
+                        None if global_finished_queue is None
+                        else run_ready_global_bear)
         control_queue.put((CONTROL_ELEMENT.LOCAL_FINISHED, None))
 
-        run_global_bears(message_queue,
-                         timeout,
-                         global_bear_queue,
-                         global_bear_list,
-                         global_result_dict,
-                         control_queue)
+        if global_bears_left:
+            run_global_bears(message_queue,
+                             timeout,
+                             global_bear_queue,
+                             global_bear_list,
+                             global_result_dict,
+                             control_queue,
+                             global_finished_queue)
         control_queue.put((CONTROL_ELEMENT.GLOBAL_FINISHED, None))
     except (OSError, KeyboardInterrupt):  # pragma: no cover
         pass
+
+
+def run_tasks(task_queue, section_queues, message_queue):
+    """
+    This is the method that is run by the processes of a ``BearPool``. It
+    runs the bears of one section after the other.
+
+    :param task_queue:     queue (read) of tasks. A task is a tuple of the
+                           index of the section queues to use and the pickled
+                           arguments for the ``run`` method except for the
+                           queues. ``None`` marks the end of the tasks.
+    :param section_queues: A list of tuples of the file name queue, the global
+                           bear queue, the control queue and the global
+                           finished queue of each section.
+    :param message_queue:  queue (write) for debug/warning/error messages
+                           (type LogMessage)
+    """
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                return
+
+            section_index, run_args = task
+            run_args = pickle.loads(run_args)
+            # Queues are not pickled along with the bears.
+            for bear in chain(run_args["local_bear_list"],
+                              run_args["global_bear_list"]):
+                bear.message_queue = message_queue
+
+            (file_name_queue, global_bear_queue, control_queue,
+             global_finished_queue) = section_queues[section_index]
+            run(file_name_queue=file_name_queue,
+                global_bear_queue=global_bear_queue,
+                message_queue=message_queue,
+                control_queue=control_queue,
+                global_finished_queue=global_finished_queue,
+                **run_args)
+    except (OSError, KeyboardInterrupt):  # pragma: no cover
+        pass
@@ -1,3 +1,7 @@
 from coalib.misc.Enum import enum
 
-CONTROL_ELEMENT = enum("LOCAL", "GLOBAL", "LOCAL_FINISHED", "GLOBAL_FINISHED")
+CONTROL_ELEMENT = enum("LOCAL",
+                       "GLOBAL",
+                       "LOCAL_FINISHED",
+                       "GLOBAL_FINISHED",
+                       "LOCAL_FAILED")
@@ -0,0 +1,149 @@
+import threading
+
+
+def get_global_bear_dependencies(global_bear_list):
+    """
+    Finds the bears each global bear depends on.
+
+    >>> from coalib.bears.GlobalBear import GlobalBear
+    >>> from coalib.settings.Section import Section
+    >>> class FirstBear(GlobalBear):
+    ...     pass
+    >>> class SecondBear(GlobalBear):
+    ...     BEAR_DEPS = {FirstBear}
+    >>> get_global_bear_dependencies([SecondBear({}, Section(""), None),
+    ...                               FirstBear({}, Section(""), None)])
+    [{1}, set()]
+
+    :param global_bear_list: The list of global bear instances.
+    :return:                 A list holding a set of the indices of the bears
+                             in the list every bear depends on. Dependencies
+                             that are not in the list are left out.
+    """
+    indices = {bear.__class__.__name__: index
+               for index, bear in enumerate(global_bear_list)}
+    return [{indices[dependency.__name__]
+             for dependency in getattr(bear, "BEAR_DEPS", None) or ()
+             if dependency.__name__ in indices}
+            for bear in global_bear_list]
+
+
+class GlobalBearScheduler(threading.Thread):
+    """
+    This is the Thread object that dispatches the global bears of a section
+    to the processes. A bear is put to the global bear queue as soon as all
+    bears it depends on are finished, so the processes never have to wait
+    for the results of other bears and independent bears run concurrently.
+    The processes announce every finished bear with its name and the time it
+    took through the finished queue.
+
+    The end of the global bear queue is marked once all bears are put there.
+    The thread keeps running until all bears are finished and logs the
+    longest chain of bears that depend on each other then. Use the ``stop``
+    method to make it stop earlier.
+    """
+
+    def __init__(self,
+                 global_bear_list,
+                 global_bear_queue,
+                 finished_queue,
+                 readers,
+                 log_printer,
+                 section_name=""):
+        """
+        :param global_bear_list:  The list of global bear instances.
+        :param global_bear_queue: The queue (write) to put the indices of
+                                  the bears to run to.
+        :param finished_queue:    The queue (read) the processes put a tuple
+                                  of the name of every finished bear and the
+                                  time it ran in seconds to.
+        :param readers:           The number of processes reading the global
+                                  bear queue, a ``None`` element is put for
+                                  each of them to mark its end.
+        :param log_printer:       The log printer to log the critical path to.
+        :param section_name:      The name of the section of the bears.
+        """
+        threading.Thread.__init__(self)
+        self.global_bear_list = global_bear_list
+        self.global_bear_queue = global_bear_queue
+        self.finished_queue = finished_queue
+        self.readers = readers
+        self.log_printer = log_printer
+        self.section_name = section_name
+
+    def stop(self):
+        """
+        Makes the thread stop even if not all bears are finished. The end of
+        the global bear queue is marked if that did not happen yet.
+        """
+        self.finished_queue.put(None)
+
+    def _mark_end(self):
+        for i in range(self.readers):
+            self.global_bear_queue.put(None)
+
+    def _dispatch(self, index):
+        self.global_bear_queue.put(index)
+        self._undispatched -= 1
+        if not self._undispatched:
+            self._mark_end()
+
+    def run(self):
+        dependencies = get_global_bear_dependencies(self.global_bear_list)
+        indices = {bear.__class__.__name__: index
+                   for index, bear in enumerate(self.global_bear_list)}
+        dependents = [[] for bear in self.global_bear_list]
+        for index, bear_dependencies in enumerate(dependencies):
+            for dependency in bear_dependencies:
+                dependents[dependency].append(index)
+
+        self._undispatched = len(self.global_bear_list)
+        if not self._undispatched:
+            self._mark_end()
+            return
+
+        waiting = [set(bear_dependencies)
+                   for bear_dependencies in dependencies]
+        for index, bear_dependencies in enumerate(dependencies):
+            if not bear_dependencies:
+                self._dispatch(index)
+
+        # The time of the longest chain of bears ending with each finished
+        # bear and the bear before it in that chain.
+        chain_times = {}
+        chain_predecessors = {}
+        while len(chain_times) < len(self.global_bear_list):
+            finished = self.finished_queue.get()
+            if finished is None:
+                break
+
+            bearname, duration = finished
+            index = indices[bearname]
+            predecessor = max(dependencies[index],
+                              key=chain_times.__getitem__,
+                              default=None)
+            chain_times[index] = duration + chain_times.get(predecessor, 0)
+            chain_predecessors[index] = predecessor
+            for dependent in dependents[index]:
+                waiting[dependent].discard(index)
+                if not waiting[dependent]:
+                    self._dispatch(dependent)
+        else:
+            self._log_critical_path(chain_times, chain_predecessors)
+
+        if self._undispatched:
+            # Not all bears could run, the processes are released anyway.
+            self._mark_end()
+
+    def _log_critical_path(self, chain_times, chain_predecessors):
+        index = max(chain_times, key=chain_times.__getitem__)
+        duration = chain_times[index]
+        chain = []
+        while index is not None:
+            chain.append(self.global_bear_list[index].__class__.__name__)
+            index = chain_predecessors[index]
+
+        self.log_printer.debug(
+            "The longest chain of global bears depending on each other in "
+            "section {} took {:.2f} seconds: {}.".format(
+                self.section_name, duration, " -> ".join(reversed(chain))))
@@ -0,0 +1,123 @@
+import io
+from collections.abc import ItemsView, Mapping, ValuesView
+
+
+class LazyFileDict(dict):
+    """
+    A file dictionary that holds the raw contents of files and decodes them
+    into lines only when they are accessed, so files no one looks at are
+    never decoded.
+
+    >>> file_dict = LazyFileDict({"a.py": b"first line\\r\\nsecond line",
+    ...                           "b.py": b""})
+
+    It is a normal dictionary otherwise:
+
+    >>> file_dict["a.py"]
+    ('first line\\n', 'second line')
+    >>> sorted(file_dict)
+    ['a.py', 'b.py']
+    >>> isinstance(file_dict, dict)
+    True
+
+    Files can be set to sequences of lines as well. Their raw contents are
+    available without decoding them:
+
+    >>> file_dict["b.py"] = ["line\\n"]
+    >>> file_dict.get_content("b.py")
+    b'line\\n'
+    """
+
+    @staticmethod
+    def decode(content):
+        """
+        Decodes the raw contents of a file into lines the same way reading the
+        file in text mode does, i.e. all line endings are converted to
+        ``\\n``.
+
+        >>> LazyFileDict.decode(b"windows\\r\\nmac\\runix\\n\\fno break")
+        ('windows\\n', 'mac\\n', 'unix\\n', '\\x0cno break')
+
+        :param content:             The UTF-8 encoded contents of a file.
+        :return:                    A tuple of the lines of the file.
+        :raises UnicodeDecodeError: If the contents are not valid UTF-8.
+        """
+        return tuple(io.StringIO(content.decode("utf-8"),
+                                 newline=None).readlines())
+
+    def get_content(self, filename):
+        """
+        Retrieves the raw contents of a file without decoding it.
+
+        :param filename:  The name of the file.
+        :return:          The UTF-8 encoded contents of the file.
+        :raises KeyError: If the file is not in the dictionary.
+        """
+        file = super().__getitem__(filename)
+        if isinstance(file, bytes):
+            return file
+
+        return "".join(file).encode("utf-8")
+
+    def __getitem__(self, filename):
+        # Files that were not accessed yet are kept as bytes.
+        file = super().__getitem__(filename)
+        if isinstance(file, bytes):
+            file = self.decode(file)
+            super().__setitem__(filename, file)
+
+        return file
+
+    # All other ways to get files out of the dictionary go through
+    # ``__getitem__``. Overriding ``__iter__`` makes ``dict(file_dict)`` use
+    # it as well.
+    def __iter__(self):
+        return super().__iter__()
+
+    def get(self, filename, default=None):
+        return self[filename] if filename in self else default
+
+    def items(self):
+        return ItemsView(self)
+
+    def values(self):
+        return ValuesView(self)
+
+    def pop(self, filename, *default):
+        if filename not in self:
+            return super().pop(filename, *default)
+
+        file = self[filename]
+        del self[filename]
+        return file
+
+    def popitem(self):
+        filename, file = super().popitem()
+        return filename, (self.decode(file) if isinstance(file, bytes)
+                          else file)
+
+    def setdefault(self, filename, default=None):
+        if filename not in self:
+            self[filename] = default
+
+        return self[filename]
+
+    def copy(self):
+        return type(self)(super().items())
+
+    def __eq__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+
+        return dict(self.items()) == dict(other.items())
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, dict(self.items()))
+
+    def __reduce__(self):
+        # The raw contents are pickled as they are.
+        return type(self), (list(super().items()),)
@@ -1,24 +1,29 @@
-import queue
 import threading
 
 
 class LogPrinterThread(threading.Thread):
     """
     This is the Thread object that outputs all log messages it gets from
-    its message_queue. Setting obj.running = False will stop within the next
-    0.1 seconds.
+    its message_queue. It stops as soon as it gets ``None`` from the queue,
+    use the ``stop`` method to put it there after all other messages.
     """
 
     def __init__(self, message_queue, log_printer):
         threading.Thread.__init__(self)
-        self.running = True
         self.message_queue = message_queue
         self.log_printer = log_printer
 
+    def stop(self):
+        """
+        Makes the thread stop after it has printed all messages that are in
+        the message queue right now.
+        """
+        self.message_queue.put(None)
+
     def run(self):
-        while self.running:
-            try:
-                elem = self.message_queue.get(timeout=0.1)
-                self.log_printer.log_message(elem)
-            except queue.Empty:
-                pass
+        while True:
+            elem = self.message_queue.get()
+            if elem is None:
+                break
+
+            self.log_printer.log_message(elem)
@@ -1,17 +1,32 @@
+import math
 import multiprocessing
+import multiprocessing.connection
 import os
+import pickle
 import platform
-import queue
 import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from itertools import chain
 
 from coalib.collecting import Dependencies
 from coalib.collecting.Collectors import collect_files
+from coalib.collecting.GitIndex import get_changed_git_files, get_git_root
+from coalib.misc.CachingUtilities import (
+    get_bear_settings_hash, get_bear_version, hash_id)
 from coala_utils.string_processing.StringConverter import StringConverter
+from coalib.output.printers.LogPrinter import LogPrinter
 from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
+from coalib.processes.BearPool import BearPool
 from coalib.processes.BearRunning import run
 from coalib.processes.CONTROL_ELEMENT import CONTROL_ELEMENT
+from coalib.processes.GlobalBearScheduler import GlobalBearScheduler
+from coalib.processes.LazyFileDict import LazyFileDict
 from coalib.processes.LogPrinterThread import LogPrinterThread
+from coalib.processes.SharedFileDict import SharedFileDict
+from coalib.results.IgnoreRanges import IgnoreRanges
 from coalib.results.Result import Result
 from coalib.results.result_actions.ApplyPatchAction import ApplyPatchAction
 from coalib.results.result_actions.PrintDebugMessageAction import (
@@ -21,12 +36,30 @@ from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
 from coalib.results.SourceRange import SourceRange
 from coalib.settings.Setting import glob_list
 from coalib.parsing.Globbing import fnmatch
+from pyprint.NullPrinter import NullPrinter
 
 
 ACTIONS = [ApplyPatchAction,
            PrintDebugMessageAction,
            ShowPatchAction]
 
+RESULT_TRANSPORTS = ("queue", "manager")
+
+FILE_COLLECTIONS = ("filesystem", "git")
+
+# When chunking files automatically, every process gets about this many
+# chunks so the load is still balanced if some chunks take longer.
+CHUNKS_PER_JOB = 4
+# Chunks never get bigger than this when chunking automatically so results
+# still arrive continuously.
+MAX_AUTO_CHUNK_SIZE = 64
+# Reading files is mostly waiting for the disk or network, so it is done in
+# this many threads.
+FILE_LOADING_THREADS = 8
+# Files containing a null byte in this many first bytes are considered
+# binary and left out without reading them completely.
+BINARY_SNIFF_SIZE = 8192
+
 
 def get_cpu_count():
     try:
@@ -36,21 +69,162 @@ def get_cpu_count():
         return 2
 
 
-def fill_queue(queue_fill, any_list):
+def fill_queue(queue_fill, any_list, readers=0):
     """
     Takes element from a list and populates a queue with those elements.
 
     :param queue_fill: The queue to be filled.
     :param any_list:   List containing the elements.
+    :param readers:    Number of processes reading the queue. A ``None``
+                       element is appended for each of them to mark the end
+                       of the queue.
     """
     for elem in any_list:
         queue_fill.put(elem)
 
+    for i in range(readers):
+        queue_fill.put(None)
+
+
+def get_chunk_size(section, log_printer):
+    """
+    Parses the key ``chunk_size`` in the given section.
+
+    :param section:     The section where to parse from.
+    :param log_printer: The log printer to warn to.
+    :return:            The maximum number of files per chunk or None if the
+                        chunks shall be sized automatically.
+    """
+    try:
+        chunk_size = int(section["chunk_size"])
+    except IndexError:
+        return None
+    except ValueError:
+        chunk_size = 0
+
+    if chunk_size < 1:
+        log_printer.warn("The setting 'chunk_size' has to be a positive "
+                         "number. Sizing chunks automatically.")
+        return None
+
+    return chunk_size
+
+
+def chunk_files(files, job_count, chunk_size=None, file_count=None):
+    """
+    Splits the files into chunks that are sent to the processes as a whole.
+    The files may still be loading while they are given, every chunk is
+    yielded as soon as it is complete.
+
+    >>> files = [("a", 1), ("b", 2), ("c", 1)]
+    >>> list(chunk_files(files, 1, chunk_size=2))
+    [['a', 'b'], ['c']]
+
+    If no chunk size is given, the chunks are built so that every process
+    gets about ``CHUNKS_PER_JOB`` chunks of a similar size, e.g. a similar
+    number of bytes. Big files thus get a chunk on their own:
+
+    >>> list(chunk_files([("big", 1000), ("small", 1)], 1))
+    [['big'], ['small']]
+
+    Small files get sent together, but never more than
+    ``MAX_AUTO_CHUNK_SIZE`` at once:
+
+    >>> files = [(str(i), 1) for i in range(200)]
+    >>> [len(chunk) for chunk in chunk_files(files, 1)]
+    [50, 50, 50, 50]
+    >>> files = [(str(i), 1) for i in range(1000)]
+    >>> [len(chunk) for chunk in chunk_files(files, 1)][:3]
+    [64, 64, 64]
+
+    Files with a size of ``None`` are not checked and left out of the
+    chunks:
+
+    >>> list(chunk_files([("a", 1), ("b", None), ("c", 1)], 1, chunk_size=2))
+    [['a', 'c']]
+
+    :param files:      An iterable of tuples of the name and the size of each
+                       file. Its order is kept.
+    :param job_count:  The number of processes the chunks are sent to.
+    :param chunk_size: The maximum number of files per chunk. If None, it is
+                       determined from the job count and the file sizes.
+    :param file_count: The number of files that will be given if ``files``
+                       has no length. The number and the sizes of the files
+                       to check are then estimated from the files given so
+                       far.
+    :return:           An iterator yielding lists of filenames.
+    """
+    if file_count is None:
+        file_count = len(files)
+    chunk_count = max(1, job_count * CHUNKS_PER_JOB)
+    max_files = chunk_size
+    max_size = float("inf")
+
+    given_count = 0
+    checked_count = 0
+    checked_size = 0
+    chunk = []
+    chunk_file_size = 0
+    for filename, size in files:
+        given_count += 1
+        if size is None:
+            continue
+
+        checked_count += 1
+        checked_size += size
+        if chunk_size is None:
+            # The share of one chunk in all files to check, extrapolated
+            # from the files given so far.
+            share = max(file_count, given_count) / given_count / chunk_count
+            max_files = min(MAX_AUTO_CHUNK_SIZE,
+                            max(1, math.ceil(checked_count * share)))
+            max_size = checked_size * share
+
+        if chunk and (len(chunk) >= max_files or
+                      chunk_file_size + size > max_size):
+            yield chunk
+            chunk = []
+            chunk_file_size = 0
+
+        chunk.append(filename)
+        chunk_file_size += size
+
+    if chunk:
+        yield chunk
+
 
 def get_running_processes(processes):
     return sum((1 if process.is_alive() else 0) for process in processes)
 
 
+def watch_processes(processes, control_queue, stop_connection):
+    """
+    Waits until all given processes ended and puts a ``(None, None)``
+    element to the control queue then. Processes that crash cannot announce
+    that they are finished, this lets ``process_queues`` stop waiting for
+    them without polling.
+
+    :param processes:       The processes to watch. Threads are left out.
+    :param control_queue:   The queue to put the element to.
+    :param stop_connection: A ``multiprocessing.Connection``. The function
+                            returns without putting anything as soon as it
+                            can be read from.
+    """
+    sentinels = [process.sentinel
+                 for process in processes
+                 if isinstance(process, multiprocessing.Process) and
+                 process.is_alive()]
+    while sentinels:
+        ready = multiprocessing.connection.wait(sentinels + [stop_connection])
+        if stop_connection in ready:
+            return
+
+        sentinels = [sentinel for sentinel in sentinels
+                     if sentinel not in ready]
+
+    control_queue.put((None, None))
+
+
 def create_process_group(command_array, **kwargs):
     if platform.system() == "Windows":  # pragma: no cover
         proc = subprocess.Popen(
@@ -94,6 +268,30 @@ def get_default_actions(section):
     return actions, invalid_actions
 
 
+def get_result_transport(section, log_printer):
+    """
+    Parses the key ``result_transport`` in the given section.
+
+    With ``queue`` (the default) the bear processes send the local results
+    along with their control elements directly to the main process. With
+    ``manager`` all results are stored in dictionaries shared through a
+    ``multiprocessing.Manager`` server process and read back from there.
+
+    :param section:     The section where to parse from.
+    :param log_printer: The log printer to warn to.
+    :return:            One of ``RESULT_TRANSPORTS``.
+    """
+    result_transport = str(section.get("result_transport",
+                                       RESULT_TRANSPORTS[0])).lower()
+    if result_transport not in RESULT_TRANSPORTS:
+        log_printer.warn("Unknown result transport {!r}. Falling back to "
+                         "{!r}.".format(result_transport,
+                                        RESULT_TRANSPORTS[0]))
+        result_transport = RESULT_TRANSPORTS[0]
+
+    return result_transport
+
+
 def autoapply_actions(results,
                       file_dict,
                       file_diff_dict,
@@ -169,20 +367,18 @@ def check_result_ignore(result, ignore_ranges):
     Determines if the result has to be ignored.
 
     :param result:        The result that needs to be checked.
-    :param ignore_ranges: A list of tuples, each containing a list of lower
-                          cased affected bearnames and a SourceRange to
-                          ignore. If any of the bearname lists is empty, it
-                          is considered an ignore range for all bears.
-                          This may be a list of globbed bear wildcards.
+    :param ignore_ranges: An ``IgnoreRanges`` object or a list of tuples,
+                          each containing a list of lower cased affected
+                          bearnames and a SourceRange to ignore. If any of
+                          the bearname lists is empty, it is considered an
+                          ignore range for all bears. This may be a list of
+                          globbed bear wildcards.
     :return:              True if the result has to be ignored.
     """
-    for bears, range in ignore_ranges:
-        orig = result.origin.lower()
-        if (result.overlaps(range) and
-                (len(bears) == 0 or orig in bears or fnmatch(orig, bears))):
-            return True
+    if not isinstance(ignore_ranges, IgnoreRanges):
+        ignore_ranges = IgnoreRanges(ignore_ranges)
 
-    return False
+    return ignore_ranges.is_ignored(result)
 
 
 def print_result(results,
@@ -208,8 +404,9 @@ def print_result(results,
                            to the output medium.
     :param file_diff_dict: A dictionary that contains filenames as keys and
                            diff objects as values.
-    :param ignore_ranges:  A list of SourceRanges. Results that affect code in
-                           any of those ranges will be ignored.
+    :param ignore_ranges:  The ranges to ignore as accepted by
+                           ``check_result_ignore``. Results that affect code
+                           in any of those ranges will be ignored.
     :return:               Returns False if any results were yielded. Else
                            True.
     """
@@ -238,36 +435,137 @@ def print_result(results,
     return retval or len(results) > 0, patched_results
 
 
-def get_file_dict(filename_list, log_printer):
+def read_file(filename):
+    """
+    Reads the raw contents of a file. The first block of the file is checked
+    for null bytes before the file is read completely, so binary files are
+    left out cheaply. The contents are checked to be valid UTF-8 but not
+    split into lines, that is only done once they are accessed.
+
+    :param filename:            The name of the file.
+    :return:                    The contents of the file as bytes or ``None``
+                                if it is a binary file.
+    :raises UnicodeDecodeError: If the file is not UTF-8 encoded.
+    """
+    with open(filename, "rb") as binary_file:
+        content = binary_file.read(BINARY_SNIFF_SIZE)
+        if b"\0" in content:
+            return None
+
+        content += binary_file.read()
+
+    content.decode("utf-8")
+    return content
+
+
+def load_files(filename_list, thread_count=FILE_LOADING_THREADS):
+    """
+    Reads files in a pool of threads. The files are yielded in the given
+    order as soon as they are read, so they can be processed while the
+    following ones are still loading.
+
+    :param filename_list: List of names of paths to files to get contents of.
+    :param thread_count:  The number of threads reading files at once.
+    :return:              A generator yielding tuples of the name of each file
+                          and either its raw contents, ``None`` for binary
+                          files or the exception raised when reading it.
     """
-    Reads all files into a dictionary.
+    if not filename_list:
+        return
+
+    with ThreadPoolExecutor(min(thread_count,
+                                len(filename_list))) as executor:
+        futures = [(filename, executor.submit(read_file, filename))
+                   for filename in filename_list]
+        for filename, future in futures:
+            try:
+                yield filename, future.result()
+            except (UnicodeDecodeError, OSError) as exception:
+                yield filename, exception
 
+
+def load_file_dict(file_dict, filename_list, log_printer):
+    """
+    Reads files into a dictionary. The name of each file is yielded as soon
+    as it is added, so it can be processed while the following files are
+    still loading.
+
+    :param file_dict:     The ``LazyFileDict`` to add the raw contents of the
+                          files to.
     :param filename_list: List of names of paths to files to get contents of.
     :param log_printer:   The logger which logs errors.
-    :return:              Reads the content of each file into a dictionary
-                          with filenames as keys.
+    :return:              A generator yielding the names of the files that
+                          were added.
     """
-    file_dict = {}
-    for filename in filename_list:
-        try:
-            with open(filename, "r", encoding="utf-8") as _file:
-                file_dict[filename] = tuple(_file.readlines())
-        except UnicodeDecodeError:
+    byte_count = 0
+    start_time = time.perf_counter()
+    for filename, file in load_files(filename_list):
+        if file is None:
+            log_printer.debug("Leaving out the binary file '{}'."
+                              .format(filename))
+        elif isinstance(file, UnicodeDecodeError):
             log_printer.warn("Failed to read file '{}'. It seems to contain "
                              "non-unicode characters. Leaving it "
                              "out.".format(filename))
-        except OSError as exception:  # pragma: no cover
+        elif isinstance(file, OSError):
             log_printer.log_exception("Failed to read file '{}' because of "
                                       "an unknown error. Leaving it "
                                       "out.".format(filename),
-                                      exception,
+                                      file,
                                       log_level=LOG_LEVEL.WARNING)
+        else:
+            file_dict[filename] = file
+            byte_count += len(file)
+            yield filename
 
+    duration = time.perf_counter() - start_time
     log_printer.debug("Files that will be checked:\n" +
                       "\n".join(file_dict.keys()))
+    log_printer.debug("Read {} files with {} bytes in {:.2f} seconds ({:.0f} "
+                      "files per second).".format(
+                          len(file_dict),
+                          byte_count,
+                          duration,
+                          len(file_dict) / duration if duration else 0))
+
+
+def get_file_dict(filename_list, log_printer):
+    """
+    Reads all files into a dictionary. The files are only decoded into lines
+    when they are accessed.
+
+    :param filename_list: List of names of paths to files to get contents of.
+    :param log_printer:   The logger which logs errors.
+    :return:              Reads the content of each file into a
+                          ``LazyFileDict`` with filenames as keys.
+    """
+    file_dict = LazyFileDict()
+    for filename in load_file_dict(file_dict, filename_list, log_printer):
+        pass
+
     return file_dict
 
 
+def create_shared_file_dict(log_printer):
+    """
+    Creates an empty ``SharedFileDict`` to write the files to, so the bear
+    processes don't need a copy of them each.
+
+    :param log_printer: The logger which logs errors.
+    :return:            A ``SharedFileDict`` or None if the files cannot be
+                        shared.
+    """
+    try:
+        return SharedFileDict()
+    except OSError as exception:  # pragma: no cover
+        log_printer.log_exception("Unable to share the files between the "
+                                  "processes. Every process will hold a "
+                                  "copy of them.",
+                                  exception,
+                                  log_level=LOG_LEVEL.DEBUG)
+        return None
+
+
 def filter_raising_callables(it, exception, *args, **kwargs):
     """
     Filters all callable items inside the given iterator that raise the
@@ -322,12 +620,403 @@ def instantiate_bears(section,
     return local_bear_list, global_bear_list
 
 
+def get_bear_keys(local_bear_list, section):
+    """
+    Creates the keys the results of local bears are cached with.
+
+    :param local_bear_list: A list of local bear instances.
+    :param section:         The section the bears run in.
+    :return:                A list containing a tuple of the name, the
+                            settings hash and the version of each bear or
+                            None if the results of the bear cannot be cached.
+    """
+    bear_keys = []
+    for bear in local_bear_list:
+        version = get_bear_version(type(bear))
+        bear_keys.append(
+            None if version is None
+            else (bear.name,
+                  get_bear_settings_hash(type(bear), section),
+                  version))
+
+    return bear_keys
+
+
+def get_cache_entry(cache, filename, content, local_bear_list, bear_keys):
+    """
+    Looks up the results the local bears yielded on a file in previous runs.
+    Bears without cached results on the file have to run on it again, along
+    with the bears they depend on.
+
+    :param cache:           An instance of ``misc.Caching.FileCache``.
+    :param filename:        The name of the file.
+    :param content:         The contents of the file as a string or as UTF-8
+                            encoded bytes.
+    :param local_bear_list: A list of local bear instances.
+    :param bear_keys:       The keys of the bears as returned by
+                            ``get_bear_keys``.
+    :return:                A tuple of the sorted indices of the bears to run
+                            on the file and its cache entry as described in
+                            ``get_cached_results``.
+    """
+    content_hash = hash_id(content)
+    results = [None if bear_key is None
+               else cache.get_results(filename, content_hash, bear_key)
+               for bear_key in bear_keys]
+    run_indices = {index
+                   for index, bear_results in enumerate(results)
+                   if bear_results is None}
+    dependent_indices = list(run_indices)
+    while dependent_indices:
+        bear = local_bear_list[dependent_indices.pop()]
+        for index, dependency in enumerate(local_bear_list):
+            if (type(dependency) in bear.BEAR_DEPS and
+                    index not in run_indices):
+                run_indices.add(index)
+                dependent_indices.append(index)
+
+    return sorted(run_indices), (
+        content_hash,
+        {local_bear_list[index].name: bear_keys[index]
+         for index in run_indices},
+        list(chain.from_iterable(results[index]
+                                 for index in range(len(results))
+                                 if index not in run_indices)))
+
+
+def get_cached_results(cache, file_dict, local_bear_list, section):
+    """
+    Looks up the results the local bears yielded on the files in previous
+    runs. Bears without cached results on a file have to run on it again,
+    along with the bears they depend on.
+
+    :param cache:           An instance of ``misc.Caching.FileCache``.
+    :param file_dict:       A dictionary containing the name of files and
+                            their contents. The files of a ``LazyFileDict``
+                            are hashed without decoding them.
+    :param local_bear_list: A list of local bear instances.
+    :param section:         The section the bears run in.
+    :return:                A tuple of two dictionaries with file names as
+                            keys: the indices of the bears to run on files
+                            some bears have results cached for and the cache
+                            entries of all files to be passed to
+                            ``process_queues``. An entry is a tuple of the
+                            hash of the file, the keys of the bears to run on
+                            it by their name and the cached results of the
+                            other bears.
+    """
+    bear_keys = get_bear_keys(local_bear_list, section)
+    bear_indices = {}
+    cache_entries = {}
+    for filename in file_dict:
+        run_indices, cache_entries[filename] = get_cache_entry(
+            cache,
+            filename,
+            file_dict.get_content(filename)
+            if isinstance(file_dict, LazyFileDict)
+            else "".join(file_dict[filename]),
+            local_bear_list,
+            bear_keys)
+        if 0 < len(run_indices) < len(local_bear_list):
+            bear_indices[filename] = run_indices
+
+    return bear_indices, cache_entries
+
+
+def cache_results(cache, filename, results, cache_entry):
+    """
+    Stores the results the local bears yielded on a file in the cache. The
+    results are assigned to the bears by their origin, nothing is stored if
+    that is not possible.
+
+    :param cache:       An instance of ``misc.Caching.FileCache``.
+    :param filename:    The name of the file.
+    :param results:     The results of the bears that ran on the file.
+    :param cache_entry: The cache entry of the file as returned by
+                        ``get_cached_results``.
+    :return:            All results of the file including the cached ones.
+    """
+    content_hash, bear_keys, cached_results = cache_entry
+    if all(result.origin in bear_keys for result in results):
+        for name, bear_key in bear_keys.items():
+            if bear_key is not None:
+                cache.set_results(filename,
+                                  content_hash,
+                                  bear_key,
+                                  [result
+                                   for result in results
+                                   if result.origin == name])
+
+    return results + cached_results
+
+
+def get_job_count(section, log_printer):
+    """
+    Retrieves the number of processes to run the bears of a section in.
+
+    :param section:     The section to get the ``jobs`` setting from.
+    :param log_printer: The log printer to warn to.
+    :return:            The number of processes, the CPU count if the setting
+                        is not given or invalid.
+    """
+    try:
+        return int(section['jobs'])
+    except ValueError:
+        log_printer.warn("Unable to convert setting 'jobs' into a number. "
+                         "Falling back to CPU count.")
+        return get_cpu_count()
+    except IndexError:
+        return get_cpu_count()
+
+
+def get_max_file_size(section, log_printer):
+    """
+    Parses the key ``max_file_size`` in the given section.
+
+    :param section:     The section where to parse from.
+    :param log_printer: The log printer to warn to.
+    :return:            The maximum size of files to check in bytes or None if
+                        the size is not limited.
+    """
+    try:
+        max_file_size = int(section["max_file_size"])
+    except IndexError:
+        return None
+    except ValueError:
+        max_file_size = -1
+
+    if max_file_size < 0:
+        log_printer.warn("The setting 'max_file_size' has to be a positive "
+                         "number of bytes. Not limiting the size of files.")
+        return None
+
+    return max_file_size
+
+
+def filter_files(filename_list,
+                 log_printer,
+                 max_file_size=None,
+                 ignored_extensions=()):
+    """
+    Leaves out files that shall not be checked before they are read. Only
+    the names and the sizes of the files are looked at.
+
+    :param filename_list:      List of names of paths to files.
+    :param log_printer:        The log printer to log left out files to.
+    :param max_file_size:      The maximum size of files in bytes or None to
+                               keep files of any size.
+    :param ignored_extensions: Extensions of files to leave out, with or
+                               without the leading dot.
+    :return:                   A list of the files to check.
+    """
+    ignored_extensions = {"." + extension.lstrip(".").lower()
+                          for extension in ignored_extensions}
+    files = []
+    for filename in filename_list:
+        if os.path.splitext(filename)[1].lower() in ignored_extensions:
+            log_printer.debug("Leaving out the file '{}' because of its "
+                              "extension.".format(filename))
+            continue
+
+        if max_file_size is not None:
+            try:
+                size = os.path.getsize(filename)
+            except OSError:
+                # The error is reported when the file is read.
+                size = 0
+            if size > max_file_size:
+                log_printer.debug("Leaving out the file '{}' because it is "
+                                  "bigger than {} bytes.".format(
+                                      filename, max_file_size))
+                continue
+
+        files.append(filename)
+
+    return files
+
+
+def get_file_collection(section, log_printer):
+    """
+    Parses the key ``file_collection`` in the given section.
+
+    With ``filesystem`` (the default) the ``files`` globs are evaluated by
+    walking the directories. With ``git`` they are matched against the files
+    git lists in the repositories they are in, i.e. the tracked ones and the
+    untracked ones that are not ignored. That is much faster for big
+    repositories and leaves out everything git ignores.
+
+    :param section:     The section where to parse from.
+    :param log_printer: The log printer to warn to.
+    :return:            One of ``FILE_COLLECTIONS``.
+    """
+    file_collection = str(section.get("file_collection",
+                                      FILE_COLLECTIONS[0])).lower()
+    if file_collection not in FILE_COLLECTIONS:
+        log_printer.warn("Unknown file collection {!r}. Falling back to "
+                         "{!r}.".format(file_collection,
+                                        FILE_COLLECTIONS[0]))
+        file_collection = FILE_COLLECTIONS[0]
+
+    return file_collection
+
+
+def collect_section_files(section, log_printer):
+    """
+    Collects the files matched by the ``files`` setting of a section. Files
+    bigger than the ``max_file_size`` setting or with one of the extensions
+    in the ``ignore_extensions`` setting are left out.
+
+    :param section:     The section to collect the files of.
+    :param log_printer: The log printer to warn to.
+    :return:            A list of the paths of all files of the section.
+    """
+    return filter_files(
+        collect_files(
+            glob_list(section.get('files', "")),
+            log_printer,
+            ignored_file_paths=glob_list(section.get('ignore', "")),
+            limit_file_paths=glob_list(section.get('limit_files', "")),
+            from_git=get_file_collection(section, log_printer) == "git"),
+        log_printer,
+        max_file_size=get_max_file_size(section, log_printer),
+        ignored_extensions=list(section.get('ignore_extensions', "")))
+
+
+def get_changed_files(section, filename_list, log_printer):
+    """
+    Determines the files local bears are run on if the ``changed_since``
+    setting of a section is given: only the files changed in git since that
+    revision are checked then.
+
+    :param section:       The section to get the ``changed_since`` setting
+                          from.
+    :param filename_list: The files of the section.
+    :param log_printer:   The log printer to warn to.
+    :return:              A set of the changed files among the given ones or
+                          None if all files are to be checked.
+    """
+    ref = str(section.get("changed_since", "")).strip()
+    if not ref:
+        return None
+
+    changed_files = set()
+    directory_roots = {}
+    changed_root_files = {}
+    for filename in filename_list:
+        directory = os.path.dirname(filename)
+        if directory not in directory_roots:
+            directory_roots[directory] = get_git_root(directory)
+        root = directory_roots[directory]
+        if root not in changed_root_files:
+            changed_root_files[root] = (get_changed_git_files(root, ref)
+                                        if root else None)
+            if changed_root_files[root] is None:
+                log_printer.warn("Unable to determine the files changed "
+                                 "since {!r} in {!r}. Checking all of its "
+                                 "files.".format(ref, root or directory))
+        if (changed_root_files[root] is None or
+                filename in changed_root_files[root]):
+            changed_files.add(filename)
+
+    log_printer.debug("{} of {} files changed since {!r}.".format(
+        len(changed_files), len(filename_list), ref))
+    return changed_files
+
+
+def dispatch_files(filename_list,
+                   file_dict,
+                   shared_file_dict,
+                   filename_queue,
+                   job_count,
+                   section,
+                   local_bear_list,
+                   cache,
+                   cache_entries,
+                   log_printer):
+    """
+    Loads the files of a section and puts the ones the local bears have to
+    run on to the file name queue. The files are put in chunks as soon as
+    they are loaded, so the bears already check them while the following
+    files are still loading. Every chunk is put along with a file dictionary
+    holding its files: a view of the shared buffer or, if the files are not
+    shared, a ``LazyFileDict``.
+
+    :param filename_list:    The files of the section.
+    :param file_dict:        The ``LazyFileDict`` to load the files into.
+    :param shared_file_dict: The ``SharedFileDict`` to write the files to or
+                             None if the files are not shared. All files are
+                             published once they are loaded.
+    :param filename_queue:   The queue to put the chunks to. A ``None`` is put
+                             for each process after the last chunk.
+    :param job_count:        The number of processes reading the queue.
+    :param section:          The section the bears run in.
+    :param local_bear_list:  The local bear instances of the section.
+    :param cache:            An instance of ``misc.Caching.FileCache`` to take
+                             the results of unchanged files from or None.
+    :param cache_entries:    The dictionary to store the cache entries of the
+                             files in, see ``get_cached_results``.
+    :param log_printer:      The log printer to warn to.
+    """
+    changed_files = get_changed_files(section, filename_list, log_printer)
+    if cache:
+        bear_keys = get_bear_keys(local_bear_list, section)
+        log_printer.debug("Results of unchanged files are taken from the "
+                          "cache, bears' log messages from previous runs may "
+                          "not appear. You may use the `--flush-cache` flag "
+                          "to see them.")
+    bear_indices = {}
+
+    def get_file_sizes():
+        # Files the local bears do not run on get a size of None.
+        for filename in load_file_dict(file_dict, filename_list, log_printer):
+            content = file_dict.get_content(filename)
+            if shared_file_dict is not None:
+                shared_file_dict.add(filename, content)
+
+            if changed_files is not None and filename not in changed_files:
+                yield filename, None
+                continue
+
+            if cache:
+                run_indices, cache_entries[filename] = get_cache_entry(
+                    cache, filename, content, local_bear_list, bear_keys)
+                if not run_indices:
+                    yield filename, None
+                    continue
+                if len(run_indices) < len(local_bear_list):
+                    bear_indices[filename] = run_indices
+
+            yield filename, len(content)
+
+    try:
+        for chunk in chunk_files(get_file_sizes(),
+                                 job_count,
+                                 get_chunk_size(section, log_printer),
+                                 len(filename_list)):
+            filename_queue.put((
+                [(filename, bear_indices[filename])
+                 if filename in bear_indices else filename
+                 for filename in chunk],
+                shared_file_dict.restricted_to(chunk)
+                if shared_file_dict is not None
+                else LazyFileDict((filename, file_dict.get_content(filename))
+                                  for filename in chunk)))
+    finally:
+        # The processes wait for the end of the queue, it is marked even if
+        # loading the files failed so they do not wait forever.
+        if shared_file_dict is not None:
+            shared_file_dict.publish()
+        fill_queue(filename_queue, [], job_count)
+
+
 def instantiate_processes(section,
                           local_bear_list,
                           global_bear_list,
                           job_count,
                           cache,
-                          log_printer):
+                          log_printer,
+                          bear_pool=None,
+                          filename_list=None):
     """
     Instantiate the number of processes that will run bears which will be
     responsible for running bears in a multiprocessing environment.
@@ -339,73 +1028,158 @@ def instantiate_processes(section,
     :param cache:            An instance of ``misc.Caching.FileCache`` to use as
                              a file cache buffer.
     :param log_printer:      The log printer to warn to.
+    :param bear_pool:        A started ``BearPool`` to run the bears in instead
+                             of new processes. If the bears cannot be sent to
+                             its processes, new processes are created still,
+                             using the queues of the pool.
+    :param filename_list:    The files of the section if they are collected
+                             already.
     :return:                 A tuple containing a list of processes,
                              and the arguments passed to each process which are
-                             the same for each object.
+                             the same for each object. The ``local_result_dict``
+                             is always the one the main process reads the
+                             local results from and the ``file_dict`` the
+                             ``LazyFileDict`` the main process loads the files
+                             to. The ``shared_file_dict`` holding the files for
+                             the processes is added. If the bears run in the
+                             processes of the pool, those are returned and
+                             ``bear_pool`` is set, the processes are not to be
+                             started or joined then. The
+                             ``global_bear_scheduler`` that fills the global
+                             bear queue is added too, it has to be started
+                             once the files are dispatched. If the
+                             ``filename_list`` in them is not None, its files
+                             still have to be dispatched with
+                             ``dispatch_files`` once the processes are started.
     """
-    filename_list = collect_files(
-        glob_list(section.get('files', "")),
-        log_printer,
-        ignored_file_paths=glob_list(section.get('ignore', "")),
-        limit_file_paths=glob_list(section.get('limit_files', "")))
-
-    # This stores all matched files irrespective of whether coala is run
-    # only on changed files or not. Global bears require all the files
-    complete_filename_list = filename_list
-
-    # Start tracking all the files
-    if cache:
-        cache.track_files(set(complete_filename_list))
-        changed_files = cache.get_uncached_files(
-            set(filename_list)) if cache else filename_list
-
-        # If caching is enabled then the local bears should process only the
-        # changed files.
-        log_printer.debug("coala is run only on changed files, bears' log "
-                          "messages from previous runs may not appear. You may "
-                          "use the `--flush-cache` flag to see them.")
-        filename_list = changed_files
+    if filename_list is None:
+        filename_list = collect_section_files(section, log_printer)
+
+    if bear_pool is None:
+        global_bear_queue = multiprocessing.Queue()
+        filename_queue = multiprocessing.Queue()
+        message_queue = multiprocessing.Queue()
+        control_queue = multiprocessing.Queue()
+        global_finished_queue = multiprocessing.Queue()
+    else:
+        section_index, (filename_queue, global_bear_queue, control_queue,
+                        global_finished_queue) = (
+            bear_pool.next_section_queues())
+        message_queue = bear_pool.message_queue
+        job_count = min(job_count, len(bear_pool.processes))
+
+    managers = []
+
+    def create_shared_dict():
+        # The server process of a manager is only started if a dictionary
+        # has to be shared, a pool keeps one running for all sections.
+        if bear_pool is not None:
+            return bear_pool.create_dict()
+        if not managers:
+            managers.append(multiprocessing.Manager())
+        return managers[0].dict()
+
+    # Global bears look up the results of the global bears they depend on
+    # while running, so those have to be shared between the processes.
+    # Local results are only ever read by the main process: with the queue
+    # transport they are sent directly along with the control elements.
+    if get_result_transport(section, log_printer) == "manager":
+        local_result_dict = create_shared_dict()
+        global_result_dict = create_shared_dict()
+        process_local_result_dict = local_result_dict
+    else:
+        local_result_dict = {}
+        global_result_dict = (create_shared_dict()
+                              if global_bear_list else {})
+        process_local_result_dict = None
 
     # Note: the complete file dict is given as the file dict to bears and
     # the whole project is accessible to every bear. However, local bears are
-    # run only for the changed files if caching is enabled.
-    complete_file_dict = get_file_dict(complete_filename_list, log_printer)
-    file_dict = {filename: complete_file_dict[filename]
-                 for filename in filename_list
-                 if filename in complete_file_dict}
-
-    manager = multiprocessing.Manager()
-    global_bear_queue = multiprocessing.Queue()
-    filename_queue = multiprocessing.Queue()
-    local_result_dict = manager.dict()
-    global_result_dict = manager.dict()
-    message_queue = multiprocessing.Queue()
-    control_queue = multiprocessing.Queue()
+    # run only on the files they have no results cached for and, with the
+    # ``changed_since`` setting, only on the files changed in git.
+    file_dict = LazyFileDict()
+    # The bears in the processes read the files from one shared buffer. The
+    # files are written to it while the processes already run, the global
+    # bears only use it once all files are there.
+    shared_file_dict = create_shared_file_dict(log_printer)
+    process_file_dict = (file_dict if shared_file_dict is None
+                         else shared_file_dict.view())
+
+    local_bear_list[:], global_bear_list[:] = instantiate_bears(
+        section,
+        local_bear_list,
+        global_bear_list,
+        process_file_dict,
+        message_queue)
 
     bear_runner_args = {"file_name_queue": filename_queue,
                         "local_bear_list": local_bear_list,
                         "global_bear_list": global_bear_list,
                         "global_bear_queue": global_bear_queue,
-                        "file_dict": file_dict,
-                        "local_result_dict": local_result_dict,
+                        "file_dict": process_file_dict,
+                        "local_result_dict": process_local_result_dict,
                         "global_result_dict": global_result_dict,
                         "message_queue": message_queue,
                         "control_queue": control_queue,
-                        "timeout": 0.1}
-
-    local_bear_list[:], global_bear_list[:] = instantiate_bears(
-        section,
-        local_bear_list,
-        global_bear_list,
-        complete_file_dict,
-        message_queue)
-
-    fill_queue(filename_queue, file_dict.keys())
-    fill_queue(global_bear_queue, range(len(global_bear_list)))
-
-    return ([multiprocessing.Process(target=run, kwargs=bear_runner_args)
-             for i in range(job_count)],
-            bear_runner_args)
+                        "global_finished_queue": global_finished_queue,
+                        "timeout": None}
+
+    cache_entries = {}
+    if shared_file_dict is None:  # pragma: no cover
+        # The processes get a copy of the files along with the bears, so
+        # they have to be loaded before.
+        dispatch_files(filename_list,
+                       file_dict,
+                       shared_file_dict,
+                       filename_queue,
+                       job_count,
+                       section,
+                       local_bear_list,
+                       cache,
+                       cache_entries,
+                       log_printer)
+        filename_list = None
+
+    # Global bears are put to their queue only once the bears they depend on
+    # are finished.
+    global_bear_scheduler = GlobalBearScheduler(global_bear_list,
+                                                global_bear_queue,
+                                                global_finished_queue,
+                                                job_count,
+                                                log_printer,
+                                                section.name)
+
+    if bear_pool is not None:
+        try:
+            # The processes of the pool already have the queues.
+            bear_pool.submit(section_index,
+                             job_count,
+                             {key: value
+                              for key, value in bear_runner_args.items()
+                              if not key.endswith("queue")})
+            processes = bear_pool.processes[:job_count]
+        except (pickle.PicklingError, TypeError, AttributeError) as exception:
+            log_printer.debug("The bears of the section {} cannot be sent to "
+                              "the running processes, starting new ones: {}"
+                              .format(section.name, exception))
+            bear_pool = None
+
+    if bear_pool is None:
+        processes = [multiprocessing.Process(target=run,
+                                             kwargs=bear_runner_args)
+                     for i in range(job_count)]
+
+    # The main process collects the local results in its own dictionary if
+    # they are not shared and keeps using its own copy of the files.
+    bear_runner_args = dict(bear_runner_args,
+                            local_result_dict=local_result_dict,
+                            file_dict=file_dict,
+                            shared_file_dict=shared_file_dict,
+                            filename_list=filename_list,
+                            bear_pool=bear_pool,
+                            cache_entries=cache_entries,
+                            global_bear_scheduler=global_bear_scheduler)
+    return processes, bear_runner_args
 
 
 def get_ignore_scope(line, keyword):
@@ -470,6 +1244,33 @@ def yield_ignore_ranges(file_dict):
                                            len(file[-1])))
 
 
+def get_ignore_ranges(file_dict):
+    """
+    Creates the ranges to ignore for the given files. The ignore comments of
+    a file are only searched once a result affects it, so files without
+    results do not need to be read again.
+
+    :param file_dict: The file dictionary.
+    :return:          An ``IgnoreRanges`` object.
+    """
+    # Maps the absolute paths results refer to to the keys of the file
+    # dictionary, which may be relative.
+    filenames = {}
+
+    def get_file_ranges(filename):
+        if filename not in file_dict:
+            if not filenames:
+                filenames.update((os.path.abspath(name), name)
+                                 for name in file_dict)
+            filename = filenames.get(filename)
+            if filename is None:
+                return ()
+
+        return yield_ignore_ranges({filename: file_dict[filename]})
+
+    return IgnoreRanges(get_file_ranges=get_file_ranges)
+
+
 def get_file_list(results):
     """
     Get the set of files that are affected in the given results.
@@ -482,6 +1283,29 @@ def get_file_list(results):
     return {code.file for result in results for code in result.affected_code}
 
 
+def receive_results(index, result_dict):
+    """
+    Stores results that were sent along with a control element in the given
+    result dictionary.
+
+    :param index:       The index from the control element. Either the key of
+                        results that are already stored in ``result_dict``
+                        or a tuple of such a key and the results. For chunks
+                        a list of those.
+    :param result_dict: The dictionary to store the results in.
+    :return:            A list of the keys of the results in ``result_dict``.
+    """
+    keys = []
+    for key in (index if isinstance(index, list) else [index]):
+        if isinstance(key, tuple):
+            key, results = key
+            result_dict[key] = results
+
+        keys.append(key)
+
+    return keys
+
+
 def process_queues(processes,
                    control_queue,
                    local_result_dict,
@@ -490,7 +1314,8 @@ def process_queues(processes,
                    print_results,
                    section,
                    cache,
-                   log_printer):
+                   log_printer,
+                   cache_entries=None):
     """
     Iterate the control queue and send the results received to the print_result
     method so that they can be presented to the user.
@@ -503,7 +1328,8 @@ def process_queues(processes,
     :param local_result_dict:  Dictionary containing results respective to
                                local bears. It is modified by the processes
                                i.e. results are added to it by multiple
-                               processes.
+                               processes. Results that are sent along with
+                               the control elements are added to it here.
     :param global_result_dict: Dictionary containing results respective to
                                global bears. It is modified by the processes
                                i.e. results are added to it by multiple
@@ -514,9 +1340,22 @@ def process_queues(processes,
                                output medium.
     :param cache:              An instance of ``misc.Caching.FileCache`` to use
                                as a file cache buffer.
+    :param cache_entries:      The cache entries of the files as returned by
+                               ``get_cached_results``. The local results of
+                               those files are cached and completed with the
+                               cached ones. Files no bears run on are not
+                               announced through the control queue.
     :return:                   Return True if all bears execute successfully and
                                Results were delivered to the user. Else False.
     """
+    cache_entries = {} if cache_entries is None else cache_entries
+    # The files all local bears have results cached for are handled first.
+    cached_files = [(filename, [])
+                    for filename, (content_hash, bear_keys, results)
+                    in cache_entries.items()
+                    if not bear_keys]
+    control_elements = ([(CONTROL_ELEMENT.LOCAL, cached_files)]
+                        if cached_files else [])
     file_diff_dict = {}
     retval = False
     # Number of processes working on local/global bears. They are count down
@@ -525,59 +1364,77 @@ def process_queues(processes,
     local_processes = len(processes)
     global_processes = len(processes)
     global_result_buffer = []
-    result_files = set()
-    ignore_ranges = list(yield_ignore_ranges(file_dict))
-
-    # One process is the logger thread
-    while local_processes > 1:
-        try:
-            control_elem, index = control_queue.get(timeout=0.1)
-
-            if control_elem == CONTROL_ELEMENT.LOCAL_FINISHED:
+    ignore_ranges = get_ignore_ranges(file_dict)
+    processes_ended = False
+    # The processes announce every event through the control queue, the
+    # watcher announces when they all ended, e.g. because they crashed.
+    stop_watcher, stop_connection = multiprocessing.Pipe()
+    watcher = threading.Thread(target=watch_processes,
+                               args=(processes, control_queue,
+                                     stop_connection),
+                               daemon=True)
+    watcher.start()
+    try:
+        # One process is the logger thread
+        while local_processes > 1:
+            control_elem, index = (control_elements.pop()
+                                   if control_elements
+                                   else control_queue.get())
+
+            if control_elem is None:
+                processes_ended = True
+                break
+            elif control_elem == CONTROL_ELEMENT.LOCAL_FINISHED:
                 local_processes -= 1
             elif control_elem == CONTROL_ELEMENT.GLOBAL_FINISHED:
                 global_processes -= 1
+            elif control_elem == CONTROL_ELEMENT.LOCAL_FAILED:
+                # Results of failed bears must not be cached.
+                for filename, bear_names in index:
+                    if filename in cache_entries:
+                        for bear_name in bear_names:
+                            cache_entries[filename][1][bear_name] = None
             elif control_elem == CONTROL_ELEMENT.LOCAL:
                 assert local_processes != 0
-                result_files.update(get_file_list(local_result_dict[index]))
-                retval, res = print_result(local_result_dict[index],
-                                           file_dict,
-                                           retval,
-                                           print_results,
-                                           section,
-                                           log_printer,
-                                           file_diff_dict,
-                                           ignore_ranges)
-                local_result_dict[index] = res
+                for index in receive_results(index, local_result_dict):
+                    if index in cache_entries:
+                        local_result_dict[index] = cache_results(
+                            cache,
+                            index,
+                            local_result_dict[index],
+                            cache_entries.pop(index))
+                    retval, res = print_result(local_result_dict[index],
+                                               file_dict,
+                                               retval,
+                                               print_results,
+                                               section,
+                                               log_printer,
+                                               file_diff_dict,
+                                               ignore_ranges)
+                    local_result_dict[index] = res
             else:
                 assert control_elem == CONTROL_ELEMENT.GLOBAL
                 global_result_buffer.append(index)
-        except queue.Empty:
-            if get_running_processes(processes) < 2:  # pragma: no cover
-                # Recover silently, those branches are only
-                # nondeterministically covered.
-                break
 
-    # Flush global result buffer
-    for elem in global_result_buffer:
-        result_files.update(get_file_list(global_result_dict[elem]))
-        retval, res = print_result(global_result_dict[elem],
-                                   file_dict,
-                                   retval,
-                                   print_results,
-                                   section,
-                                   log_printer,
-                                   file_diff_dict,
-                                   ignore_ranges)
-        global_result_dict[elem] = res
-
-    # One process is the logger thread
-    while global_processes > 1:
-        try:
-            control_elem, index = control_queue.get(timeout=0.1)
-
-            if control_elem == CONTROL_ELEMENT.GLOBAL:
-                result_files.update(get_file_list(global_result_dict[index]))
+        # Flush global result buffer
+        for elem in global_result_buffer:
+            retval, res = print_result(global_result_dict[elem],
+                                       file_dict,
+                                       retval,
+                                       print_results,
+                                       section,
+                                       log_printer,
+                                       file_diff_dict,
+                                       ignore_ranges)
+            global_result_dict[elem] = res
+
+        # One process is the logger thread
+        while global_processes > 1 and not processes_ended:
+            control_elem, index = control_queue.get()
+
+            if control_elem is None:
+                break
+            elif control_elem == CONTROL_ELEMENT.GLOBAL:
                 retval, res = print_result(global_result_dict[index],
                                            file_dict,
                                            retval,
@@ -590,14 +1447,12 @@ def process_queues(processes,
             else:
                 assert control_elem == CONTROL_ELEMENT.GLOBAL_FINISHED
                 global_processes -= 1
-        except queue.Empty:
-            if get_running_processes(processes) < 2:  # pragma: no cover
-                # Recover silently, those branches are only
-                # nondeterministically covered.
-                break
+    finally:
+        stop_watcher.send(None)
+        watcher.join()
+        stop_watcher.close()
+        stop_connection.close()
 
-    if cache:
-        cache.untrack_files(result_files)
     return retval
 
 
@@ -628,65 +1483,106 @@ def simplify_section_result(section_result):
             results_for_section)
 
 
-def execute_section(section,
-                    global_bear_list,
-                    local_bear_list,
-                    print_results,
-                    cache,
-                    log_printer):
+def start_section(section,
+                  global_bear_list,
+                  local_bear_list,
+                  cache,
+                  log_printer,
+                  bear_pool=None,
+                  filename_list=None):
     """
-    Executes the section with the given bears.
+    Loads the files of the section and starts running its bears.
 
-    The execute_section method does the following things:
-
-    1. Prepare a Process
-       -  Load files
-       -  Create queues
-    2. Spawn up one or more Processes
-    3. Output results from the Processes
-    4. Join all processes
-
-    :param section:          The section to execute.
+    :param section:          The section to start.
     :param global_bear_list: List of global bears belonging to the section.
                              Dependencies are already resolved.
     :param local_bear_list:  List of local bears belonging to the section.
                              Dependencies are already resolved.
-    :param print_results:    Prints all given results appropriate to the
-                             output medium.
     :param cache:            An instance of ``misc.Caching.FileCache`` to use as
                              a file cache buffer.
     :param log_printer:      The log_printer to warn to.
-    :return:                 Tuple containing a bool (True if results were
-                             yielded, False otherwise), a Manager.dict
-                             containing all local results(filenames are key)
-                             and a Manager.dict containing all global bear
-                             results (bear names are key) as well as the
-                             file dictionary.
+    :param bear_pool:        A started ``BearPool`` to run the bears in. New
+                             processes are spawned for the section if it is
+                             not given.
+    :param filename_list:    The files of the section if they are collected
+                             already.
+    :return:                 A tuple of the processes running the bears, the
+                             last one being the logger thread, and the
+                             arguments passed to them as returned by
+                             ``instantiate_processes``. Pass it to
+                             ``finish_section``.
     """
-    try:
-        running_processes = int(section['jobs'])
-    except ValueError:
-        log_printer.warn("Unable to convert setting 'jobs' into a number. "
-                         "Falling back to CPU count.")
-        running_processes = get_cpu_count()
-    except IndexError:
-        running_processes = get_cpu_count()
-
     processes, arg_dict = instantiate_processes(section,
                                                 local_bear_list,
                                                 global_bear_list,
-                                                running_processes,
+                                                get_job_count(section,
+                                                              log_printer),
                                                 cache,
-                                                log_printer)
+                                                log_printer,
+                                                bear_pool,
+                                                filename_list)
 
-    logger_thread = LogPrinterThread(arg_dict["message_queue"],
-                                     log_printer)
-    # Start and join the logger thread along with the processes to run bears
-    processes.append(logger_thread)
+    if arg_dict["bear_pool"] is None:
+        for runner in processes:
+            runner.start()
+
+    # The logger thread of a pool keeps running for the next sections.
+    if bear_pool is None:
+        arg_dict["logger_thread"] = LogPrinterThread(arg_dict["message_queue"],
+                                                     log_printer)
+        arg_dict["logger_thread"].start()
+        logger_thread = arg_dict["logger_thread"]
+    else:
+        arg_dict["logger_thread"] = None
+        logger_thread = bear_pool.logger_thread
 
-    for runner in processes:
-        runner.start()
+    started_section = processes + [logger_thread], arg_dict
+    # The processes check the first files while the others are loading.
+    try:
+        if arg_dict["filename_list"] is not None:
+            dispatch_files(arg_dict["filename_list"],
+                           arg_dict["file_dict"],
+                           arg_dict["shared_file_dict"],
+                           arg_dict["file_name_queue"],
+                           len(processes),
+                           section,
+                           arg_dict["local_bear_list"],
+                           cache,
+                           arg_dict["cache_entries"],
+                           log_printer)
+    except BaseException:
+        # The processes still wait for the global bears, the scheduler
+        # releases them.
+        arg_dict["global_bear_scheduler"].start()
+        join_section(started_section)
+        raise
+
+    # Global bears get all files, so they are only run once those are
+    # loaded.
+    arg_dict["global_bear_scheduler"].start()
+
+    return started_section
 
+
+def finish_section(started_section,
+                   print_results,
+                   section,
+                   cache,
+                   log_printer):
+    """
+    Outputs the results of a started section and waits for it to end.
+
+    :param started_section: The return value of ``start_section``.
+    :param print_results:   Prints all given results appropriate to the
+                            output medium.
+    :param section:         The section that was started.
+    :param cache:           An instance of ``misc.Caching.FileCache`` to use as
+                            a file cache buffer.
+    :param log_printer:     The log_printer to warn to.
+    :return:                The section result as returned by
+                            ``execute_section``.
+    """
+    processes, arg_dict = started_section
     try:
         return (process_queues(processes,
                                arg_dict["control_queue"],
@@ -696,12 +1592,178 @@ def execute_section(section,
                                print_results,
                                section,
                                cache,
-                               log_printer),
+                               log_printer,
+                               arg_dict["cache_entries"]),
                 arg_dict["local_result_dict"],
                 arg_dict["global_result_dict"],
                 arg_dict["file_dict"])
     finally:
-        logger_thread.running = False
+        join_section(started_section)
 
-        for runner in processes:
+
+def join_section(started_section):
+    """
+    Waits for the processes of a started section to end and releases the
+    files shared with them.
+
+    :param started_section: The return value of ``start_section``.
+    """
+    processes, arg_dict = started_section
+    # The scheduler only runs longer if a process crashed.
+    scheduler = arg_dict["global_bear_scheduler"]
+    if scheduler.is_alive():
+        scheduler.stop()
+    scheduler.join()
+
+    # The processes exit as soon as their queues are drained. Their
+    # messages are all in the message queue after joining them, so the
+    # logger thread can be stopped after printing those.
+    if arg_dict["bear_pool"] is None:
+        for runner in processes[:-1]:
             runner.join()
+
+    if arg_dict["logger_thread"] is not None:
+        arg_dict["logger_thread"].stop()
+        arg_dict["logger_thread"].join()
+
+    if isinstance(arg_dict["shared_file_dict"], SharedFileDict):
+        arg_dict["shared_file_dict"].close()
+
+
+def execute_section(section,
+                    global_bear_list,
+                    local_bear_list,
+                    print_results,
+                    cache,
+                    log_printer,
+                    bear_pool=None):
+    """
+    Executes the section with the given bears.
+
+    The execute_section method does the following things:
+
+    1. Prepare a Process
+       -  Create queues
+    2. Spawn up one or more Processes or send the bears to the ones of the
+       given pool
+    3. Load files and send them to the Processes while loading
+    4. Output results from the Processes
+    5. Join all processes
+
+    :param section:          The section to execute.
+    :param global_bear_list: List of global bears belonging to the section.
+                             Dependencies are already resolved.
+    :param local_bear_list:  List of local bears belonging to the section.
+                             Dependencies are already resolved.
+    :param print_results:    Prints all given results appropriate to the
+                             output medium.
+    :param cache:            An instance of ``misc.Caching.FileCache`` to use as
+                             a file cache buffer.
+    :param log_printer:      The log_printer to warn to.
+    :param bear_pool:        A started ``BearPool`` to run the bears in. New
+                             processes are spawned for the section if it is
+                             not given.
+    :return:                 Tuple containing a bool (True if results were
+                             yielded, False otherwise), a dict containing all
+                             local results(filenames are key) and a dict
+                             containing all global bear results (bear names
+                             are key) as well as the file dictionary. The
+                             result dicts are Manager.dicts if the
+                             ``result_transport`` setting is ``manager``.
+    """
+    return finish_section(start_section(section,
+                                        global_bear_list,
+                                        local_bear_list,
+                                        cache,
+                                        log_printer,
+                                        bear_pool),
+                          print_results,
+                          section,
+                          cache,
+                          log_printer)
+
+
+def execute_sections(sections,
+                     global_bears,
+                     local_bears,
+                     print_results,
+                     print_section_beginning,
+                     cache,
+                     log_printer):
+    """
+    Executes the given sections with one pool of processes for all of them.
+
+    A section is started while the sections before it are still running if
+    they do not share any files with it. Otherwise it waits for them as
+    their results may change its files.
+
+    :param sections:                An ordered dictionary of the sections to
+                                    execute with their names as keys.
+    :param global_bears:            A dictionary containing the global bears
+                                    of each section with the section names as
+                                    keys.
+    :param local_bears:             A dictionary containing the local bears of
+                                    each section with the section names as
+                                    keys.
+    :param print_results:           Prints all given results appropriate to
+                                    the output medium.
+    :param print_section_beginning: A callback that is called with each
+                                    section before its results are printed.
+    :param cache:                   An instance of ``misc.Caching.FileCache``
+                                    to use as a file cache buffer.
+    :param log_printer:             The log_printer to warn to.
+    :return:                        A generator yielding a tuple of the name
+                                    of each section and its result as
+                                    returned by ``execute_section`` in the
+                                    given order. The result dicts are always
+                                    normal dictionaries.
+    """
+    if not sections:
+        return
+
+    # Invalid settings are warned about when the sections are started.
+    bear_pool = BearPool(max(get_job_count(section, LogPrinter(NullPrinter()))
+                             for section in sections.values()),
+                         len(sections),
+                         log_printer)
+    bear_pool.start()
+    started_sections = deque()
+
+    def finish_first_section():
+        section_name, filename_set, started_section = (
+            started_sections.popleft())
+        section = sections[section_name]
+        print_section_beginning(section)
+        section_result = finish_section(started_section,
+                                        print_results,
+                                        section,
+                                        cache,
+                                        log_printer)
+        # Shared dictionaries live in the manager of the pool, which is shut
+        # down with it.
+        return section_name, (section_result[0],
+                              dict(section_result[1]),
+                              dict(section_result[2]),
+                              section_result[3])
+
+    try:
+        for section_name, section in sections.items():
+            filename_list = collect_section_files(section, log_printer)
+            while any(not filename_set.isdisjoint(filename_list)
+                      for _, filename_set, _ in started_sections):
+                yield finish_first_section()
+
+            started_sections.append((section_name,
+                                     set(filename_list),
+                                     start_section(section,
+                                                   global_bears[section_name],
+                                                   local_bears[section_name],
+                                                   cache,
+                                                   log_printer,
+                                                   bear_pool,
+                                                   filename_list)))
+
+        while started_sections:
+            yield finish_first_section()
+    finally:
+        bear_pool.close()
@@ -0,0 +1,234 @@
+import mmap
+import os
+import pickle
+import tempfile
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from coalib.processes.LazyFileDict import LazyFileDict
+
+# Decoded files are kept until their raw contents take up this many bytes in
+# one dictionary. Bears going over all files repeatedly, like global bears,
+# decode every file only once unless the files are that big.
+DECODED_FILES_SIZE = 64 * 1024 * 1024
+
+
+class SharedFileDict(Mapping):
+    """
+    A read only file dictionary that keeps the contents of all files in one
+    memory mapped buffer. Processes using it share that buffer instead of
+    holding a copy of every file each, no matter if they are forked or
+    spawned: pickling the dictionary only transfers the location of the
+    buffer and an index into it.
+
+    >>> file_dict = SharedFileDict({"a.py": ("first line\\n", "second line"),
+    ...                             "b.py": b""})
+
+    The files can be given as their lines or their raw contents, which are
+    written to the buffer as they are. It can be used just like a normal file
+    dictionary, the files are only decoded when accessed:
+
+    >>> file_dict["a.py"]
+    ('first line\\n', 'second line')
+    >>> file_dict["b.py"]
+    ()
+    >>> sorted(file_dict)
+    ['a.py', 'b.py']
+
+    A view containing only some of the files shares the buffer:
+
+    >>> view = file_dict.restricted_to(["a.py", "unknown.py"])
+    >>> list(view)
+    ['a.py']
+
+    More files can be added while processes already use views of the files
+    added before. A view of all files, including the ones added later, can
+    be used once they are published:
+
+    >>> complete_view = file_dict.view()
+    >>> file_dict.add("c.py", b"third file\\n")
+    >>> file_dict.publish()
+    >>> sorted(complete_view)
+    ['a.py', 'b.py', 'c.py']
+
+    Close it to release the buffer when no process needs it anymore:
+
+    >>> file_dict.close()
+    """
+
+    def __init__(self, file_dict=()):
+        """
+        Writes the contents of the given files into a new buffer.
+
+        :param file_dict: A dictionary containing the name of files and their
+                          contents as sequences of lines or as UTF-8 encoded
+                          bytes.
+        :raises OSError:  If the buffer cannot be created.
+        """
+        descriptor, path = tempfile.mkstemp(prefix="coala_")
+        self.__setstate__({"path": path, "index": {}})
+        self._writer = os.fdopen(descriptor, "wb")
+        self._size = 0
+        self._finalizer = weakref.finalize(self,
+                                           SharedFileDict._remove_buffer,
+                                           self._writer,
+                                           self._path)
+
+        for filename, file in dict(file_dict).items():
+            self.add(filename, file)
+
+    @staticmethod
+    def _get_index_path(path):
+        return path + ".index"
+
+    @staticmethod
+    def _remove_buffer(writer, path):
+        writer.close()
+        for file_path in (path, SharedFileDict._get_index_path(path)):
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
+    def __getstate__(self):
+        if self._writer is not None:
+            self._writer.flush()
+
+        return {"path": self._path, "index": self._index}
+
+    def __setstate__(self, state):
+        self._path = state["path"]
+        # Views of all files read the index when they are used first.
+        self._index = state["index"]
+        self._buffer = None
+        self._writer = None
+        self._finalizer = None
+        # The decoded files and the sizes of their raw contents, the least
+        # recently used first.
+        self._decoded_files = OrderedDict()
+        self._decoded_size = 0
+
+    def add(self, filename, file):
+        """
+        Appends a file to the buffer. Only this dictionary and the views
+        created afterwards contain it, except for views of all files which
+        contain it once it is published.
+
+        :param filename: The name of the file.
+        :param file:     The contents of the file as a sequence of lines or
+                         as UTF-8 encoded bytes.
+        """
+        content = (file if isinstance(file, bytes)
+                   else "".join(file).encode("utf-8"))
+        self._writer.write(content)
+        self._index[filename] = (self._size, len(content))
+        self._size += len(content)
+        self._forget_decoded(filename)
+
+    def publish(self):
+        """
+        Makes all files added so far available to the views created by
+        ``view``.
+        """
+        self._writer.flush()
+        with open(self._get_index_path(self._path), "wb") as index_file:
+            pickle.dump(self._index, index_file)
+
+    def view(self):
+        """
+        Creates a view of all files of this dictionary, including the ones
+        that are added later. It can be used once the files are published.
+
+        :return: A new SharedFileDict using the same buffer.
+        """
+        view = SharedFileDict.__new__(SharedFileDict)
+        view.__setstate__({"path": self._path, "index": None})
+        return view
+
+    def restricted_to(self, filenames):
+        """
+        Creates a view of this dictionary that only contains the given files.
+
+        :param filenames: The names of the files to keep. Files that are not
+                          in this dictionary are left out.
+        :return:          A new SharedFileDict using the same buffer.
+        """
+        # The view may be sent to other processes right away.
+        if self._writer is not None:
+            self._writer.flush()
+
+        index = self._get_index()
+        view = SharedFileDict.__new__(SharedFileDict)
+        view.__setstate__({"path": self._path,
+                           "index": {filename: index[filename]
+                                     for filename in filenames
+                                     if filename in index}})
+        return view
+
+    def close(self):
+        """
+        Releases the buffer of this dictionary. If the dictionary created the
+        buffer, it is removed and views of it cannot be used anymore.
+        """
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def _get_index(self):
+        if self._index is None:
+            with open(self._get_index_path(self._path), "rb") as index_file:
+                self._index = pickle.load(index_file)
+
+        return self._index
+
+    def _get_buffer(self, size):
+        if self._writer is not None:
+            self._writer.flush()
+
+        # The buffer may have grown since it was mapped.
+        if self._buffer is not None and len(self._buffer) < size:
+            self._buffer.close()
+            self._buffer = None
+
+        if self._buffer is None:
+            with open(self._path, "rb") as buffer_file:
+                if os.fstat(buffer_file.fileno()).st_size == 0:
+                    return b""
+
+                self._buffer = mmap.mmap(buffer_file.fileno(),
+                                         0,
+                                         access=mmap.ACCESS_READ)
+
+        return self._buffer
+
+    def _forget_decoded(self, filename):
+        if filename in self._decoded_files:
+            file, length = self._decoded_files.pop(filename)
+            self._decoded_size -= length
+
+    def __getitem__(self, filename):
+        if filename in self._decoded_files:
+            self._decoded_files.move_to_end(filename)
+            return self._decoded_files[filename][0]
+
+        offset, length = self._get_index()[filename]
+        file = LazyFileDict.decode(
+            self._get_buffer(offset + length)[offset:offset+length])
+
+        self._decoded_files[filename] = file, length
+        self._decoded_size += length
+        while self._decoded_size > DECODED_FILES_SIZE:
+            self._forget_decoded(next(iter(self._decoded_files)))
+        return file
+
+    def __contains__(self, filename):
+        return filename in self._get_index()
+
+    def __iter__(self):
+        return iter(self._get_index())
+
+    def __len__(self):
+        return len(self._get_index())
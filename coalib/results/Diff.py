@@ -1,11 +1,193 @@
 import copy
 import difflib
+from bisect import bisect_left, insort
+from collections import Counter
 
 from coalib.results.LineDiff import LineDiff, ConflictError
 from coalib.results.SourceRange import SourceRange
 from coala_utils.decorators import enforce_signature, generate_eq
 
 
+# Parts of files without unique lines are compared with the Myers algorithm
+# as long as they differ in at most this many lines, difflib is used for the
+# rest.
+MAX_MYERS_CHANGES = 1000
+
+
+def _group_edits(edits):
+    """
+    Joins single inserted and deleted lines that are next to each other to
+    opcodes like ``difflib.SequenceMatcher.get_opcodes`` yields.
+
+    :param edits: Tuples of the indices in a and b before each edit and
+                  whether a line was deleted (or inserted) there, in order.
+    """
+    start = end = None
+    for a_index, b_index, deleted in edits:
+        if (a_index, b_index) != end:
+            if start is not None:
+                yield _get_opcode(start, end)
+            start = (a_index, b_index)
+        end = (a_index + 1, b_index) if deleted else (a_index, b_index + 1)
+
+    if start is not None:
+        yield _get_opcode(start, end)
+
+
+def _get_opcode(start, end):
+    tag = ("replace" if start[0] != end[0] and start[1] != end[1] else
+           "delete" if start[0] != end[0] else
+           "insert")
+    return (tag, start[0], end[0], start[1], end[1])
+
+
+def _get_myers_opcodes(a, b, alo, ahi, blo, bhi, max_changes):
+    """
+    Finds the smallest number of lines to delete from and insert to the
+    window of a to get the window of b with the Myers algorithm.
+
+    :return: A list of opcodes of the changes or None if more than
+             ``max_changes`` lines need to change.
+    """
+    n = ahi - alo
+    m = bhi - blo
+    # Maps every diagonal k to the furthest index in a reached on it.
+    furthest = {1: 0}
+    trace = []
+    for changes in range(min(n + m, max_changes) + 1):
+        trace.append(furthest.copy())
+        for k in range(-changes, changes + 1, 2):
+            if k == -changes or (k != changes and
+                                 furthest[k-1] < furthest[k+1]):
+                x = furthest[k+1]
+            else:
+                x = furthest[k-1] + 1
+            y = x - k
+            while x < n and y < m and a[alo+x] == b[blo+y]:
+                x += 1
+                y += 1
+            furthest[k] = x
+
+            if x >= n and y >= m:
+                return list(_group_edits(reversed(list(
+                    _backtrack_myers(trace, x, y, alo, blo)))))
+
+    return None
+
+
+def _backtrack_myers(trace, x, y, alo, blo):
+    for changes in range(len(trace) - 1, 0, -1):
+        furthest = trace[changes]
+        k = x - y
+        if k == -changes or (k != changes and
+                             furthest[k-1] < furthest[k+1]):
+            previous_x = furthest[k+1]
+            previous_y = previous_x - k - 1
+        else:
+            previous_x = furthest[k-1]
+            previous_y = previous_x - k + 1
+
+        # Lines that are the same in both, then the change.
+        x -= min(x - previous_x, y - previous_y)
+        y = x - k
+        yield (alo + previous_x, blo + previous_y, x != previous_x)
+        x, y = previous_x, previous_y
+
+
+def _get_unique_matches(a, b, alo, ahi, blo, bhi):
+    """
+    Finds the longest sequence of lines that occur exactly once in both
+    windows and in the same order in both.
+
+    :return: A list of tuples of the indices of those lines in a and b.
+    """
+    a_counts = Counter(a[alo:ahi])
+    b_counts = Counter(b[blo:bhi])
+    b_indices = {b[index]: index for index in range(blo, bhi)
+                 if b_counts[b[index]] == 1}
+    matches = [(index, b_indices[a[index]]) for index in range(alo, ahi)
+               if a_counts[a[index]] == 1 and a[index] in b_indices]
+
+    # Patience sorting: the longest increasing run of the indices in b.
+    tails = []
+    tail_matches = []
+    predecessors = {}
+    for match in matches:
+        position = bisect_left(tails, match[1])
+        predecessors[match] = tail_matches[position-1] if position else None
+        if position == len(tails):
+            tails.append(match[1])
+            tail_matches.append(match)
+        else:
+            tails[position] = match[1]
+            tail_matches[position] = match
+
+    result = []
+    match = tail_matches[-1] if tail_matches else None
+    while match is not None:
+        result.append(match)
+        match = predecessors[match]
+    return result[::-1]
+
+
+def _get_opcodes(file_array_1, file_array_2):
+    """
+    Compares two arrays of lines like ``difflib.SequenceMatcher.get_opcodes``
+    but only yields the changes, not the equal parts.
+
+    Lines that are the same at the start and end of the arrays are skipped
+    and the rest is split up at lines that occur only once in both arrays
+    (patience diff). Only what is left between those is compared with the
+    Myers algorithm or ``difflib``, so big files with few changes are
+    compared quickly.
+    """
+    # Comparing integers is faster than comparing the lines.
+    line_ids = {}
+    a = [line_ids.setdefault(line, len(line_ids)) for line in file_array_1]
+    b = [line_ids.setdefault(line, len(line_ids)) for line in file_array_2]
+
+    windows = [(0, len(a), 0, len(b))]
+    while windows:
+        alo, ahi, blo, bhi = windows.pop()
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and a[ahi-1] == b[bhi-1]:
+            ahi -= 1
+            bhi -= 1
+
+        if alo == ahi and blo == bhi:
+            continue
+        if alo == ahi:
+            yield "insert", alo, ahi, blo, bhi
+            continue
+        if blo == bhi:
+            yield "delete", alo, ahi, blo, bhi
+            continue
+
+        matches = _get_unique_matches(a, b, alo, ahi, blo, bhi)
+        if not matches:
+            opcodes = _get_myers_opcodes(a, b, alo, ahi, blo, bhi,
+                                         MAX_MYERS_CHANGES)
+            if opcodes is not None:
+                yield from opcodes
+                continue
+
+            matcher = difflib.SequenceMatcher(None, a[alo:ahi], b[blo:bhi])
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag != "equal":
+                    yield tag, alo+i1, alo+i2, blo+j1, blo+j2
+            continue
+
+        # The windows between the matches, pushed so the first is handled
+        # first.
+        ends = matches + [(ahi, bhi)]
+        starts = [(alo-1, blo-1)] + matches
+        for (a_start, b_start), (a_end, b_end) in reversed(
+                list(zip(starts, ends))):
+            windows.append((a_start+1, a_end, b_start+1, b_end))
+
+
 @generate_eq("_file", "modified", "rename", "delete")
 class Diff:
     """
@@ -22,10 +204,21 @@ class Diff:
         :param delete:    True if file is set to be deleted.
         """
         self._changes = {}
+        # The numbers of the changed lines, sorted.
+        self._changed_lines = []
+        # The modified file, built when it is first needed after a change.
+        self._modified = None
         self._file = file_list
         self.rename = rename
         self.delete = delete
 
+    def __getstate__(self):
+        # The modified file can be built again, it is not sent to other
+        # processes.
+        state = self.__dict__.copy()
+        state["_modified"] = None
+        return state
+
     @classmethod
     def from_string_arrays(cls, file_array_1, file_array_2, rename=False):
         """
@@ -40,30 +233,26 @@ class Diff:
         """
         result = cls(file_array_1, rename=rename)
 
-        matcher = difflib.SequenceMatcher(None, file_array_1, file_array_2)
-        # We use this because its faster (generator) and doesn't yield as much
-        # useless information as get_opcodes.
-        for change_group in matcher.get_grouped_opcodes(1):
-            for (tag,
-                 a_index_1,
-                 a_index_2,
-                 b_index_1,
-                 b_index_2) in change_group:
-                if tag == "delete":
-                    for index in range(a_index_1+1, a_index_2+1):
-                        result.delete_line(index)
-                elif tag == "insert":
-                    # We add after line, they add before, so dont add 1 here
-                    result.add_lines(a_index_1,
-                                     file_array_2[b_index_1:b_index_2])
-                elif tag == "replace":
-                    result.change_line(a_index_1+1,
-                                       file_array_1[a_index_1],
-                                       file_array_2[b_index_1])
-                    result.add_lines(a_index_1+1,
-                                     file_array_2[b_index_1+1:b_index_2])
-                    for index in range(a_index_1+2, a_index_2+1):
-                        result.delete_line(index)
+        for (tag,
+             a_index_1,
+             a_index_2,
+             b_index_1,
+             b_index_2) in _get_opcodes(file_array_1, file_array_2):
+            if tag == "delete":
+                for index in range(a_index_1+1, a_index_2+1):
+                    result.delete_line(index)
+            elif tag == "insert":
+                # We add after line, they add before, so dont add 1 here
+                result.add_lines(a_index_1,
+                                 file_array_2[b_index_1:b_index_2])
+            elif tag == "replace":
+                result.change_line(a_index_1+1,
+                                   file_array_1[a_index_1],
+                                   file_array_2[b_index_1])
+                result.add_lines(a_index_1+1,
+                                 file_array_2[b_index_1+1:b_index_2])
+                for index in range(a_index_1+2, a_index_2+1):
+                    result.delete_line(index)
 
         return result
 
@@ -97,7 +286,16 @@ class Diff:
         if line_nr < min_line:
             raise ValueError("The given line number is not allowed.")
 
-        return self._changes.get(line_nr, LineDiff())
+        # Copies of diffs share their LineDiff objects, so they are only
+        # changed as a copy.
+        linediff = self._changes.get(line_nr)
+        return LineDiff() if linediff is None else copy.copy(linediff)
+
+    def _set_change(self, line_nr, linediff):
+        if line_nr not in self._changes:
+            insort(self._changed_lines, line_nr)
+        self._changes[line_nr] = linediff
+        self._modified = None
 
     def stats(self):
         """
@@ -162,32 +360,38 @@ class Diff:
     def modified(self):
         """
         Calculates the modified file, after applying the Diff to the original.
-        """
-        result = []
+        It is only calculated again after the diff changed.
 
+        The same list is returned until then, so callers that want to change
+        it have to copy it first.
+        """
         if self.delete:
-            return result
+            return []
 
-        current_line = 0
+        if self._modified is None:
+            result = []
+            current_line = 0
 
-        # Note that line_nr counts from _1_ although 0 is possible when
-        # inserting lines before everything
-        for line_nr in sorted(self._changes):
-            result.extend(self._file[current_line:max(line_nr-1, 0)])
-            linediff = self._changes[line_nr]
-            if not linediff.delete and not linediff.change and line_nr > 0:
-                result.append(self._file[line_nr-1])
-            elif linediff.change:
-                result.append(linediff.change[1])
+            # Note that line_nr counts from _1_ although 0 is possible when
+            # inserting lines before everything
+            for line_nr in self._changed_lines:
+                result.extend(self._file[current_line:max(line_nr-1, 0)])
+                linediff = self._changes[line_nr]
+                if (not linediff.delete and not linediff.change and
+                        line_nr > 0):
+                    result.append(self._file[line_nr-1])
+                elif linediff.change:
+                    result.append(linediff.change[1])
 
-            if linediff.add_after:
-                result.extend(linediff.add_after)
+                if linediff.add_after:
+                    result.extend(linediff.add_after)
 
-            current_line = line_nr
+                current_line = line_nr
 
-        result.extend(self._file[current_line:])
+            result.extend(self._file[current_line:])
+            self._modified = result
 
-        return result
+        return self._modified
 
     @property
     def unified_diff(self):
@@ -262,14 +466,14 @@ class Diff:
 
         last_line = -1
         this_diff = Diff(self._file, rename=self.rename, delete=self.delete)
-        for line in sorted(self._changes.keys()):
+        for line in self._changed_lines:
             if line > last_line + distance + 1 and len(this_diff._changes) > 0:
                 yield this_diff
                 this_diff = Diff(self._file, rename=self.rename,
                                  delete=self.delete)
 
             last_line = line
-            this_diff._changes[line] = self._changes[line]
+            this_diff._set_change(line, self._changes[line])
 
         # If the diff contains no line changes, the loop above will not be run
         # else, this_diff will never be empty and thus this has to be yielded
@@ -296,17 +500,49 @@ class Diff:
         if len(self._changes) == 0:
             return SourceRange.from_values(filename)
 
-        start = min(self._changes.keys())
-        end = max(self._changes.keys())
+        start = self._changed_lines[0]
+        end = self._changed_lines[-1]
         return SourceRange.from_values(filename,
                                        start_line=max(1, start),
                                        end_line=max(1, end))
 
+    def __copy__(self):
+        """
+        Copies the diff. The copy shares the original file and the changes of
+        the lines with this diff, a line is only copied when it is changed
+        again. So copying takes time in the number of changed lines only.
+
+        >>> diff = Diff(['1'])
+        >>> diff_copy = copy.copy(diff)
+        >>> diff_copy.delete_line(1)
+        >>> diff.modified, diff_copy.modified
+        (['1'], [])
+        """
+        result = type(self)(self._file, rename=self.rename, delete=self.delete)
+        result._changes = self._changes.copy()
+        result._changed_lines = self._changed_lines[:]
+        result._modified = self._modified
+        return result
+
     def __add__(self, other):
         """
         Adds another diff to this one. Will throw an exception if this is not
         possible. (This will *not* be done in place.)
         """
+        result = copy.copy(self)
+        result += other
+        return result
+
+    def __iadd__(self, other):
+        """
+        Adds another diff to this one in place. Will throw an exception if
+        this is not possible, this diff is left as it was then.
+
+        >>> diff = Diff(['1', '2'])
+        >>> diff += Diff.from_string_arrays(['1', '2'], ['1'])
+        >>> diff.modified
+        ['1']
+        """
         if not isinstance(other, Diff):
             raise TypeError("Only diffs can be added to a diff.")
 
@@ -314,20 +550,27 @@ class Diff:
                                                          other.rename):
             raise ConflictError("Diffs contain conflicting renamings.")
 
-        result = copy.deepcopy(self)
-        result.rename = self.rename or other.rename
-        result.delete = self.delete or other.delete
-
+        # The changes are merged into a diff holding only the lines that are
+        # changed in both diffs so nothing changes if they conflict.
+        merged = Diff(self._file)
+        merged._changes = {line_nr: self._changes[line_nr]
+                           for line_nr in other._changes
+                           if line_nr in self._changes}
+        merged._changed_lines = sorted(merged._changes)
         for line_nr in other._changes:
             change = other._changes[line_nr]
             if change.delete is True:
-                result.delete_line(line_nr)
+                merged.delete_line(line_nr)
             if change.add_after is not False:
-                result.add_lines(line_nr, change.add_after)
+                merged.add_lines(line_nr, change.add_after)
             if change.change is not False:
-                result.change_line(line_nr, change.change[0], change.change[1])
+                merged.change_line(line_nr, change.change[0], change.change[1])
 
-        return result
+        self.rename = self.rename or other.rename
+        self.delete = self.delete or other.delete
+        for line_nr in merged._changed_lines:
+            self._set_change(line_nr, merged._changes[line_nr])
+        return self
 
     def __bool__(self):
         """
@@ -352,7 +595,7 @@ class Diff:
         """
         linediff = self._get_change(line_nr)
         linediff.delete = True
-        self._changes[line_nr] = linediff
+        self._set_change(line_nr, linediff)
 
     def delete_lines(self, line_nr_start, line_nr_end):
         """
@@ -378,7 +621,7 @@ class Diff:
                                 "there are already lines.")
 
         linediff.add_after = lines
-        self._changes[line_nr_before] = linediff
+        self._set_change(line_nr_before, linediff)
 
     def change_line(self, line_nr, original_line, replacement):
         """
@@ -390,4 +633,4 @@ class Diff:
             raise ConflictError("An already changed line cannot be changed.")
 
         linediff.change = (original_line, replacement)
-        self._changes[line_nr] = linediff
+        self._set_change(line_nr, linediff)
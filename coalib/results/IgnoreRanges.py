@@ -0,0 +1,162 @@
+from bisect import bisect_right
+from itertools import accumulate
+
+from coalib.parsing.Globbing import fnmatch
+
+
+def _get_position_key(position):
+    """
+    Gets a key to sort the positions of one file the same way ``TextPosition``
+    objects are ordered, i.e. a line or column of ``None`` comes first.
+    """
+    return (position.line is not None, position.line or 0,
+            position.column is not None, position.column or 0)
+
+
+class _IgnoreRangeGroup:
+    """
+    The ranges of a file that are ignored for the same bears.
+    """
+
+    def __init__(self, bears):
+        self.bears = bears
+        self.ranges = []
+        self._matching_origins = {}
+        self._starts = None
+        self._max_ends = None
+
+    def add(self, source_range):
+        self.ranges.append(source_range)
+        self._starts = None
+
+    def matches(self, origin):
+        if origin not in self._matching_origins:
+            self._matching_origins[origin] = (len(self.bears) == 0 or
+                                              origin in self.bears or
+                                              fnmatch(origin, self.bears))
+        return self._matching_origins[origin]
+
+    def overlaps(self, start, end):
+        if self._starts is None:
+            keys = sorted((_get_position_key(source_range.start),
+                           _get_position_key(source_range.end))
+                          for source_range in self.ranges)
+            self._starts = [key[0] for key in keys]
+            # The furthest end of all ranges starting before each range.
+            self._max_ends = list(accumulate((key[1] for key in keys), max))
+
+        # Only the ranges starting before the end may overlap, one of them
+        # does if the furthest end of them is not before the start.
+        count = bisect_right(self._starts, end)
+        return count > 0 and self._max_ends[count - 1] >= start
+
+
+class IgnoreRanges:
+    """
+    Holds the source ranges that are ignored for some bears, sorted by file
+    and the bears they are ignored for, so that checking a result does not
+    need to look at every range.
+
+    >>> from coalib.results.Result import Result
+    >>> from coalib.results.SourceRange import SourceRange
+    >>> ignore_ranges = IgnoreRanges([
+    ...     (["pep8bear"], SourceRange.from_values("f", 1, 1, 2, 5)),
+    ...     ([], SourceRange.from_values("f", 8, 1, 8, 10))])
+    >>> ignore_ranges.is_ignored(Result.from_values("PEP8Bear", "msg", "f", 2))
+    True
+    >>> ignore_ranges.is_ignored(Result.from_values("OtherBear", "msg", "f", 2))
+    False
+    >>> ignore_ranges.is_ignored(Result.from_values("OtherBear", "msg",
+    ...                                             "f", 8, 3))
+    True
+
+    Iterating yields the tuples of bears and ranges in the order they were
+    added:
+
+    >>> [bears for bears, source_range in ignore_ranges]
+    [['pep8bear'], []]
+
+    The ranges of a file can also be looked up only once a result affects
+    it:
+
+    >>> lazy_ranges = IgnoreRanges(get_file_ranges=lambda filename: [
+    ...     ([], SourceRange.from_values(filename, 1, 1, 1, 10))])
+    >>> len(lazy_ranges)
+    0
+    >>> lazy_ranges.is_ignored(Result.from_values("Bear", "msg", "f", 1, 2))
+    True
+    >>> len(lazy_ranges)
+    1
+    """
+
+    def __init__(self, ignore_ranges=(), get_file_ranges=None):
+        """
+        :param ignore_ranges:   An iterable of tuples, each containing a list
+                                of lower cased affected bearnames and a
+                                SourceRange to ignore. An empty list of
+                                bearnames ignores the range for all bears.
+                                The bearnames may be globs.
+        :param get_file_ranges: A function that is given the absolute path of
+                                a file and returns such tuples for that file.
+                                It is called once for every file a checked
+                                result affects.
+        """
+        self._ignore_ranges = []
+        # Maps every file to a dictionary of the groups of ranges ignored for
+        # the same bears.
+        self._files = {}
+        self._get_file_ranges = get_file_ranges
+        self._loaded_files = set()
+        for bears, source_range in ignore_ranges:
+            self.add(bears, source_range)
+
+    def __iter__(self):
+        # Ranges of files that were not looked up yet are left out.
+        return iter(self._ignore_ranges)
+
+    def __len__(self):
+        return len(self._ignore_ranges)
+
+    def add(self, bears, source_range):
+        """
+        Adds a range to ignore.
+
+        :param bears:        A list of lower cased bearnames or globs of them
+                             to ignore the range for, all bears if empty.
+        :param source_range: The SourceRange to ignore.
+        """
+        self._ignore_ranges.append((bears, source_range))
+        groups = self._files.setdefault(source_range.start.file, {})
+        key = tuple(bears)
+        if key not in groups:
+            groups[key] = _IgnoreRangeGroup(key)
+        groups[key].add(source_range)
+
+    def is_ignored(self, result):
+        """
+        Determines if a result affects code that is ignored for its origin.
+
+        :param result: The result to check.
+        :return:       True if the result has to be ignored.
+        """
+        origin = result.origin.lower()
+        for source_range in result.affected_code:
+            filename = source_range.start.file
+            if (self._get_file_ranges is not None and
+                    filename not in self._loaded_files):
+                self._loaded_files.add(filename)
+                for bears, file_range in self._get_file_ranges(filename):
+                    self.add(bears, file_range)
+
+            # Ranges can only overlap if they are in the same file.
+            groups = self._files.get(filename)
+            if not groups:
+                continue
+
+            start = _get_position_key(source_range.start)
+            end = _get_position_key(source_range.end)
+            for group in groups.values():
+                if group.matches(origin) and group.overlaps(start, end):
+                    return True
+
+        return False
@@ -177,7 +177,9 @@ class Result:
                           key and all lines a value. Will be modified.
         """
         for filename in self.diffs:
-            file_dict[filename] = self.diffs[filename].modified
+            # The diff keeps the modified lines, they must not change with
+            # the file_dict.
+            file_dict[filename] = list(self.diffs[filename].modified)
 
     def __add__(self, other):
         """
@@ -190,7 +192,8 @@ class Result:
 
         for filename in other.diffs:
             if filename in self.diffs:
-                self.diffs[filename] += other.diffs[filename]
+                self.diffs[filename] = (self.diffs[filename] +
+                                        other.diffs[filename])
             else:
                 self.diffs[filename] = other.diffs[filename]
 
@@ -1,3 +1,4 @@
+import copy
 import shutil
 from os.path import isfile
 from os import remove
@@ -42,9 +43,11 @@ class ApplyPatchAction(ResultAction):
                 pre_patch_filename = (diff.rename
                                       if diff.rename is not False
                                       else filename)
+                # Merged in place, the diffs of all results applied before
+                # are not copied again.
                 file_diff_dict[filename] += result.diffs[filename]
             else:
-                file_diff_dict[filename] = result.diffs[filename]
+                file_diff_dict[filename] = copy.copy(result.diffs[filename])
 
                 # Backup original file, only if there was no previous patch
                 # from this run though!
@@ -294,7 +294,7 @@ def get_filtered_bears(languages, log_printer):
     sections, _ = load_configuration(arg_list=None,
                                      log_printer=log_printer)
     local_bears, global_bears = collect_all_bears_from_sections(
-        sections, log_printer)
+        sections, log_printer, languages)
     if languages:
         local_bears = filter_section_bears_by_languages(
             local_bears, languages)
@@ -349,9 +349,12 @@ def gather_configuration(acquire_settings,
     # `arg_list = arg_list or default_list`
     arg_list = sys.argv[1:] if arg_list is None else arg_list
     sections, targets = load_configuration(arg_list, log_printer, arg_parser)
+    # The collected bears are reused within this run only.
+    bear_cache = {}
     local_bears, global_bears = fill_settings(sections,
                                               acquire_settings,
-                                              log_printer)
+                                              log_printer,
+                                              bear_cache=bear_cache)
     save_sections(sections)
     warn_nonexistent_targets(targets, sections, log_printer)
 
@@ -7,7 +7,7 @@ from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
 from coalib.settings.Setting import Setting
 
 
-def fill_settings(sections, acquire_settings, log_printer):
+def fill_settings(sections, acquire_settings, log_printer, bear_cache=None):
     """
     Retrieves all bears and requests missing settings via the given
     acquire_settings method.
@@ -21,10 +21,14 @@ def fill_settings(sections, acquire_settings, log_printer):
                              description in [0] and the names of the bears
                              who need this setting in all following indexes.
     :param log_printer:      The log printer to use for logging.
+    :param bear_cache:       The dictionary to remember the collected bears
+                             in, see ``collect_bears``. If None, the bears are
+                             only reused for sections with the same bears.
     :return:                 A tuple containing (local_bears, global_bears),
                              each of them being a dictionary with the section
                              name as key and as value the bears as a list.
     """
+    bear_cache = {} if bear_cache is None else bear_cache
     local_bears = {}
     global_bears = {}
 
@@ -35,7 +39,8 @@ def fill_settings(sections, acquire_settings, log_printer):
             bear_dirs,
             bears,
             [BEAR_KIND.LOCAL, BEAR_KIND.GLOBAL],
-            log_printer)
+            log_printer,
+            bear_cache=bear_cache)
         section_local_bears = Dependencies.resolve(section_local_bears)
         section_global_bears = Dependencies.resolve(section_global_bears)
         all_bears = copy.deepcopy(section_local_bears)
@@ -0,0 +1,112 @@
+import os
+import subprocess
+import sys
+import unittest
+
+
+# Modules that take long to import and are not needed before coala runs.
+HEAVY_MODULES = ("pip", "pkg_resources", "pygments", "bears")
+
+# Modules collecting and running bears, which are not needed before the
+# arguments are parsed, e.g. to show the version.
+ANALYSIS_MODULES = ("coalib.collecting.Collectors",
+                    "coalib.collecting.Importers",
+                    "coalib.output.ConsoleInteraction",
+                    "coalib.processes.Processing",
+                    "coalib.settings.ConfigurationGathering")
+
+# The time in microseconds importing an entry point may take. Importing
+# coalib.coala took about 330 ms when everything was imported upfront and
+# takes about 50 ms without the analysis modules, the budget leaves room for
+# slow machines.
+IMPORT_TIME_BUDGET = 200000
+
+
+def get_imported_modules(module):
+    """
+    Imports a module in a new interpreter and lists the modules loaded
+    afterwards.
+
+    :param module: The name of the module to import.
+    :return:       A set with the names of all modules that are loaded after
+                   importing the module.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output(
+        [sys.executable,
+         "-c",
+         "import sys, " + module + "; print('\\n'.join(sys.modules))"],
+        cwd=root,
+        universal_newlines=True)
+    return set(output.splitlines())
+
+
+def get_import_time(module):
+    """
+    Measures how long importing a module takes in a new interpreter with
+    ``-X importtime``.
+
+    :param module: The name of the module to import.
+    :return:       The time in microseconds importing the module and all
+                   modules it imports took.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        cwd=root,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True)
+    # The lines look like "import time: self [us] | cumulative | name".
+    for line in process.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+
+    raise ValueError("The import time of {} was not reported.".format(module))
+
+
+class ImportTimeTest(unittest.TestCase):
+
+    def check_entry_point(self, module, unwanted_modules):
+        imported_modules = get_imported_modules(module)
+        self.assertIn(module, imported_modules)
+
+        for unwanted_module in unwanted_modules:
+            self.assertFalse(
+                any(name == unwanted_module or
+                    name.startswith(unwanted_module + ".")
+                    for name in imported_modules),
+                "{} imports {}.".format(module, unwanted_module))
+
+    @unittest.skipIf(sys.version_info < (3, 7),
+                     "-X importtime is available since Python 3.7.")
+    def test_import_time(self):
+        for module in ("coalib.coala", "coalib.coala_json",
+                       "coalib.coala_ci", "coalib.coala_format"):
+            # The best of a few runs, the first one may need to read the
+            # modules from disk.
+            import_time = min(get_import_time(module) for _ in range(3))
+            self.assertLess(import_time, IMPORT_TIME_BUDGET,
+                            "Importing {} took {} ms.".format(
+                                module, import_time // 1000))
+
+    def test_coala_main(self):
+        self.check_entry_point("coalib.coala_main", HEAVY_MODULES)
+
+    def test_coala(self):
+        self.check_entry_point("coalib.coala",
+                               HEAVY_MODULES + ANALYSIS_MODULES)
+
+    def test_coala_json(self):
+        self.check_entry_point("coalib.coala_json",
+                               HEAVY_MODULES + ANALYSIS_MODULES)
+
+    def test_coala_ci(self):
+        self.check_entry_point("coalib.coala_ci",
+                               HEAVY_MODULES + ANALYSIS_MODULES)
+
+    def test_coala_format(self):
+        self.check_entry_point("coalib.coala_format",
+                               HEAVY_MODULES + ANALYSIS_MODULES)
@@ -1,4 +1,5 @@
 import multiprocessing
+import pickle
 import unittest
 from os.path import abspath
 
@@ -121,6 +122,13 @@ class BearTest(unittest.TestCase):
         uut = TestBear(self.settings, None)
         uut.execute()  # No exceptions
 
+    def test_pickle(self):
+        uut = pickle.loads(pickle.dumps(self.uut))
+        self.assertIsNone(uut.message_queue)
+        self.assertEqual(uut.section.name, "test_settings")
+        # The original bear keeps its queue
+        self.assertIs(self.uut.message_queue, self.queue)
+
     def test_dependencies(self):
         self.assertEqual(Bear.BEAR_DEPS, set())
         self.assertEqual(Bear.missing_dependencies([]), set())
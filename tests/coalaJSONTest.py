@@ -85,7 +85,7 @@ class coalaJSONTest(unittest.TestCase):
             self.assertTrue(bear["metadata"]["optional_params"])
             self.assertFalse(bear["metadata"]["non_optional_params"])
 
-    @unittest.mock.patch('coalib.parsing.DefaultArgParser.get_all_bears_names')
+    @unittest.mock.patch('coalib.collecting.Collectors.get_all_bears_names')
     @unittest.mock.patch('coalib.collecting.Collectors.icollect_bears')
     def test_version_conflict_in_collecting_bears(self, import_fn, _):
         with bear_test_module():
@@ -58,7 +58,7 @@ class coalaTest(unittest.TestCase):
             self.assertEqual(retval, 0)
             self.assertEqual(len(output.splitlines()), 2)
 
-    @unittest.mock.patch('coalib.parsing.DefaultArgParser.get_all_bears_names')
+    @unittest.mock.patch('coalib.collecting.Collectors.get_all_bears_names')
     @unittest.mock.patch('coalib.collecting.Collectors.icollect_bears')
     def test_version_conflict_in_collecting_bears(self, import_fn, _):
         with bear_test_module():
@@ -1,17 +1,23 @@
 import os
 import pkg_resources
+import tempfile
 import unittest
+from unittest.mock import patch
 
 from pyprint.ConsolePrinter import ConsolePrinter
 
 from coalib.collecting.Collectors import (
-    collect_all_bears_from_sections, collect_bears, collect_dirs, collect_files,
-    collect_registered_bears_dirs, filter_section_bears_by_languages,
-    get_all_bears_names)
+    collect_all_bears_from_sections, collect_bear_infos, collect_bears,
+    collect_dirs, collect_files, collect_registered_bears_dirs,
+    filter_section_bears_by_languages, get_all_bears_names, icollect_bears)
+from coalib.bears.BEAR_KIND import BEAR_KIND
+from coalib.collecting.BearIndex import BearIndex
 from coalib.misc.ContextManagers import retrieve_stdout
+from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
 from coalib.output.printers.LogPrinter import LogPrinter
 from coalib.settings.Section import Section
 from tests.TestUtilities import bear_test_module
+from tests.collecting.GitIndexTest import make_index
 
 
 class CollectFilesTest(unittest.TestCase):
@@ -57,6 +63,58 @@ class CollectFilesTest(unittest.TestCase):
                              "py_files",
                              "file2.py"))])
 
+    def test_file_collection_order(self):
+        py_files = os.path.join(self.collectors_test_dir, "others", "py_files")
+        file1 = os.path.normcase(os.path.join(py_files, "file1.py"))
+        file2 = os.path.normcase(os.path.join(py_files, "file2.py"))
+        log_printer = LogPrinter(ConsolePrinter(), log_level=LOG_LEVEL.DEBUG)
+        with retrieve_stdout() as sio:
+            self.assertEqual(collect_files([os.path.join(py_files, "*2.py"),
+                                            os.path.join(py_files, "*.py")],
+                                           log_printer,
+                                           thread_count=2),
+                             [file2, file1])
+            self.assertRegex(sio.getvalue(),
+                             "Collected 2 files matching '.*\\*\\.py' in "
+                             "[0-9.]+ seconds.")
+
+    def test_file_collection_from_git(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, ".git"))
+            with open(os.path.join(root, ".git", "index"), "wb") as index:
+                index.write(make_index([("deleted.py", 0o100644),
+                                        ("ignored.py", 0o100644),
+                                        ("tracked.py", 0o100644),
+                                        ("tracked.txt", 0o100644)]))
+            for name in ("ignored.py", "tracked.py", "tracked.txt",
+                         "untracked.py"):
+                with open(os.path.join(root, name), "w"):
+                    pass
+
+            with patch("coalib.collecting.GitIndex._run_git",
+                       return_value=["untracked.py"]):
+                self.assertEqual(
+                    collect_files([os.path.join(root, "*.py")],
+                                  self.log_printer,
+                                  ignored_file_paths=[
+                                      os.path.join(root, "ignored.py")],
+                                  from_git=True),
+                    [os.path.join(root, "tracked.py"),
+                     os.path.join(root, "untracked.py")])
+
+    def test_file_collection_from_git_outside_repository(self):
+        with tempfile.TemporaryDirectory() as root, \
+                retrieve_stdout() as sio:
+            filename = os.path.join(root, "file.py")
+            with open(filename, "w"):
+                pass
+            self.assertEqual(collect_files([os.path.join(root, "*.py")],
+                                           self.log_printer,
+                                           from_git=True),
+                             [filename])
+            self.assertIn("Collecting them from the file system instead.",
+                          sio.getvalue())
+
     def test_ignored(self):
         self.assertEqual(collect_files([os.path.join(self.collectors_test_dir,
                                                      "others",
@@ -271,6 +329,118 @@ class CollectBearsTest(unittest.TestCase):
         self.assertEqual(len(local_bears['test_section']), 2)
         self.assertEqual(len(global_bears['test_section']), 2)
 
+    def test_all_bears_from_sections_by_languages(self):
+        test_section = Section("test_section")
+        test_section.bear_dirs = lambda: os.path.join(self.collectors_test_dir,
+                                                      "bears_local_global",
+                                                      "**")
+        local_bears, global_bears = collect_all_bears_from_sections(
+            {'test_section': test_section},
+            self.log_printer,
+            languages=['Python'])
+
+        # Only the file with a bear for all languages is imported.
+        self.assertEqual([bear.name for bear in local_bears['test_section']],
+                         ['Test1LocalBear'])
+        self.assertEqual([bear.name for bear in global_bears['test_section']],
+                         ['Test1GlobalBear'])
+
+    def test_bear_infos(self):
+        bear_dirs = [os.path.join(self.collectors_test_dir,
+                                  "bears_local_global",
+                                  "**")]
+        bear_index = BearIndex(self.log_printer, "collectors_test_index")
+        bear_infos = collect_bear_infos(bear_dirs,
+                                        self.log_printer,
+                                        bear_index)
+        self.assertEqual(
+            sorted((os.path.basename(bear_file), bear_info.name,
+                    bear_info.kind, sorted(bear_info.languages))
+                   for bear_file, infos in bear_infos
+                   for bear_info in infos),
+            [('bears1.py', 'Test1GlobalBear', BEAR_KIND.GLOBAL, ['All']),
+             ('bears1.py', 'Test1LocalBear', BEAR_KIND.LOCAL, []),
+             ('bears2.py', 'Test2GlobalBear', BEAR_KIND.GLOBAL, ['C']),
+             ('bears2.py', 'Test2LocalBear', BEAR_KIND.LOCAL, ['C', 'Java'])])
+
+        # Indexed files are not imported again.
+        with patch('coalib.collecting.Collectors._import_bear_file') as import_:
+            self.assertEqual(collect_bear_infos(bear_dirs,
+                                                self.log_printer,
+                                                bear_index),
+                             bear_infos)
+            self.assertFalse(import_.called)
+
+    def test_bear_cache(self):
+        sections = {name: Section(name) for name in ("a", "b", "c")}
+        for section in sections.values():
+            section.bear_dirs = lambda: [os.path.join(
+                self.collectors_test_dir, "bears_local_global", "**")]
+
+        bear_cache = {}
+        with patch('coalib.collecting.Collectors.icollect_bears',
+                   wraps=icollect_bears) as icollect:
+            local_bears, global_bears = collect_all_bears_from_sections(
+                sections, self.log_printer)
+            self.assertEqual(icollect.call_count, 1)
+
+            collect_all_bears_from_sections(sections, self.log_printer,
+                                            bear_cache=bear_cache)
+            collect_all_bears_from_sections(sections, self.log_printer,
+                                            bear_cache=bear_cache)
+            self.assertEqual(icollect.call_count, 2)
+        self.assertEqual(len(bear_cache), 1)
+
+        for name in sections:
+            self.assertEqual(len(local_bears[name]), 2)
+            self.assertEqual(len(global_bears[name]), 2)
+        # The sections get lists of their own.
+        self.assertIsNot(local_bears["a"], local_bears["b"])
+
+        with retrieve_stdout() as stdout, \
+                patch('coalib.collecting.Collectors.icollect_bears',
+                      wraps=icollect_bears) as icollect:
+            for _ in range(2):
+                self.assertEqual(collect_bears(["invalid_paths"],
+                                               ["invalid_name"],
+                                               ["kind"],
+                                               self.log_printer,
+                                               bear_cache=bear_cache), ([],))
+            self.assertEqual(icollect.call_count, 1)
+            # Unused globs are still reported for every collection.
+            self.assertEqual(stdout.getvalue().count("invalid_name"), 2)
+
+            # Without a cache, nothing is remembered.
+            collect_bears(["invalid_paths"], ["invalid_name"], ["kind"],
+                          self.log_printer)
+            collect_bears(["invalid_paths"], ["invalid_name"], ["kind"],
+                          self.log_printer)
+            self.assertEqual(icollect.call_count, 3)
+        self.assertEqual(len(bear_cache), 2)
+
+    def test_bear_cache_statistics(self):
+        bear_dirs = [os.path.join(self.collectors_test_dir,
+                                  "bears_local_global",
+                                  "**")]
+        bear_cache = {}
+        with patch.object(LogPrinter, 'debug') as debug:
+            for _ in range(3):
+                collect_bears(bear_dirs, ["*"], ["kind"], self.log_printer,
+                              bear_cache=bear_cache)
+            collect_bears(bear_dirs, ["Test*"], ["kind"], self.log_printer,
+                          bear_cache=bear_cache)
+        self.assertEqual(
+            [call[0][0] for call in debug.call_args_list],
+            ["Collected bears 1 times and reused them 0 times in this run.",
+             "Collected bears 1 times and reused them 1 times in this run.",
+             "Collected bears 1 times and reused them 2 times in this run.",
+             "Collected bears 2 times and reused them 2 times in this run."])
+
+        # Without a cache, there is nothing to report.
+        with patch.object(LogPrinter, 'debug') as debug:
+            collect_bears(bear_dirs, ["*"], ["kind"], self.log_printer)
+        self.assertFalse(debug.called)
+
 
 class CollectorsTests(unittest.TestCase):
 
@@ -0,0 +1,164 @@
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from coalib.collecting.GitIndex import (
+    get_changed_git_files, get_git_files, get_git_root, read_git_index)
+
+
+def make_index(entries, version=2):
+    """
+    Creates the contents of a git index file.
+
+    :param entries: A list of tuples of paths and modes.
+    :param version: The version of the index format.
+    """
+    data = struct.pack(">4sLL", b"DIRC", version, len(entries))
+    previous_path = b""
+    for path, mode in entries:
+        path = path.encode()
+        entry = struct.pack(">10L20sH", 0, 0, 0, 0, 0, 0, mode, 0, 0, 0,
+                            b"\0" * 20, min(len(path), 0xfff))
+        if version == 4:
+            common = len(os.path.commonprefix([previous_path, path]))
+            # Only single byte offsets are used in the tests.
+            entry += bytes([len(previous_path) - common]) + path[common:]
+            entry += b"\0"
+        else:
+            entry += path
+            entry += b"\0" * (8 - len(entry) % 8)
+        data += entry
+        previous_path = path
+    return data + b"\0" * 20
+
+
+class GitIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, ".git"))
+        self.index_path = os.path.join(self.root, ".git", "index")
+        self.entries = [("a/b/file.py", 0o100644),
+                        ("a/link", 0o120000),
+                        ("a/submodule", 0o160000),
+                        ("a_file_with_a_long_name.txt", 0o100755)]
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write_index(self, data):
+        with open(self.index_path, "wb") as index_file:
+            index_file.write(data)
+
+    def test_read_git_index(self):
+        expected = ["a/b/file.py", "a/link", "a_file_with_a_long_name.txt"]
+        for version in (2, 3, 4):
+            self.write_index(make_index(self.entries, version))
+            self.assertEqual(read_git_index(self.index_path), expected)
+
+    def test_read_invalid_git_index(self):
+        self.write_index(b"DIRC")
+        self.assertRaises(ValueError, read_git_index, self.index_path)
+
+        self.write_index(make_index(self.entries, version=5))
+        self.assertRaises(ValueError, read_git_index, self.index_path)
+
+        self.write_index(make_index(self.entries)[:80])
+        self.assertRaises(ValueError, read_git_index, self.index_path)
+
+        self.assertRaises(OSError,
+                          read_git_index,
+                          os.path.join(self.root, "missing"))
+
+    def test_get_git_root(self):
+        self.assertEqual(get_git_root(os.path.join(self.root, "a", "b")),
+                         self.root)
+        self.assertEqual(get_git_root(self.root), self.root)
+        self.assertIsNone(get_git_root(os.path.dirname(self.root)))
+
+    @patch("coalib.collecting.GitIndex._run_git")
+    def test_get_git_files(self, run_git):
+        run_git.return_value = ["untracked.txt"]
+        self.write_index(make_index(self.entries))
+        self.assertEqual(get_git_files(self.root),
+                         [os.path.join(self.root, "a", "b", "file.py"),
+                          os.path.join(self.root, "a", "link"),
+                          os.path.join(self.root,
+                                       "a_file_with_a_long_name.txt"),
+                          os.path.join(self.root, "untracked.txt")])
+        run_git.assert_called_once_with(
+            self.root, "ls-files", "--others", "--exclude-standard", "-z")
+
+        # The untracked files cannot be listed.
+        run_git.return_value = None
+        self.assertIsNone(get_git_files(self.root))
+
+        # Neither the index nor git can be used.
+        self.write_index(b"invalid")
+        self.assertIsNone(get_git_files(self.root))
+
+
+@unittest.skipIf(shutil.which("git") is None, "git is not installed.")
+class GitCommandTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        subprocess.check_call(["git", "init", "-q", self.root])
+        self.tracked = os.path.join(self.root, "tracked.py")
+        self.untracked = os.path.join(self.root, "untracked.py")
+        with open(self.tracked, "w") as tracked_file:
+            tracked_file.write("1\n")
+        with open(os.path.join(self.root, ".gitignore"), "w") as gitignore:
+            gitignore.write("*.pyc\n")
+        subprocess.check_call(["git", "add", "."], cwd=self.root)
+        subprocess.check_call(["git",
+                               "-c", "user.name=coala",
+                               "-c", "user.email=coala@example.com",
+                               "commit", "-q", "-m", "Initial"],
+                              cwd=self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_get_changed_git_files(self):
+        self.assertEqual(get_changed_git_files(self.root, "HEAD"), set())
+
+        with open(self.untracked, "w"):
+            pass
+        with open(os.path.join(self.root, "ignored.pyc"), "w"):
+            pass
+        self.assertEqual(get_changed_git_files(self.root, "HEAD"),
+                         {self.untracked})
+
+        with open(self.tracked, "w") as tracked_file:
+            tracked_file.write("2\n")
+        self.assertEqual(get_changed_git_files(self.root, "HEAD"),
+                         {self.tracked, self.untracked})
+
+        self.assertIsNone(get_changed_git_files(self.root, "unknown_ref"))
+
+    def test_get_git_files(self):
+        with open(self.untracked, "w"):
+            pass
+        with open(os.path.join(self.root, "ignored.pyc"), "w"):
+            pass
+        self.assertEqual(sorted(get_git_files(self.root)),
+                         [os.path.join(self.root, ".gitignore"),
+                          self.tracked,
+                          self.untracked])
+
+    def test_get_git_files_without_index(self):
+        with open(self.untracked, "w"):
+            pass
+        with open(os.path.join(self.root, "ignored.pyc"), "w"):
+            pass
+        os.remove(os.path.join(self.root, ".git", "index"))
+        # Without the index all files are untracked.
+        self.assertEqual(sorted(get_git_files(self.root)),
+                         [os.path.join(self.root, ".gitignore"),
+                          self.tracked,
+                          self.untracked])
@@ -1,8 +1,12 @@
 import os
+import shutil
+import sys
+import tempfile
 import unittest
 from collections import OrderedDict
 
-from coalib.collecting.Importers import import_objects
+from coalib.collecting.Importers import (
+    _bear_directory_finder, _import_module, import_objects)
 
 
 class ImportObjectsTest(unittest.TestCase):
@@ -95,3 +99,95 @@ class ImportObjectsTest(unittest.TestCase):
                            attributes="method",
                            local=True,
                            verbose=False)
+
+
+class ImportModuleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.old_path = list(sys.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        if self.directory in _bear_directory_finder.directories:
+            _bear_directory_finder.directories.remove(self.directory)
+        for name in ("coala_importers_test", "coala_importers_sibling",
+                     "coala_importers_package",
+                     "coala_importers_package.module"):
+            sys.modules.pop(name, None)
+
+    def write_module(self, name, content):
+        path = os.path.join(self.directory, name + ".py")
+        with open(path, "w") as module_file:
+            module_file.write(content)
+        return path
+
+    def test_cache(self):
+        path = self.write_module("coala_importers_test", "value = 1\n")
+        module = _import_module(path)
+        self.assertEqual(module.value, 1)
+        self.assertIs(_import_module(path), module)
+        self.assertIs(sys.modules["coala_importers_test"], module)
+        self.assertEqual(sys.path, self.old_path)
+
+        self.write_module("coala_importers_test", "value = 2\n")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(_import_module(path).value, 2)
+
+    def test_sibling_import(self):
+        self.write_module("coala_importers_test", "value = 1\n")
+        path = self.write_module(
+            "coala_importers_sibling",
+            "from coala_importers_test import value\n")
+        self.assertEqual(_import_module(path).value, 1)
+        # The module imported by name is the same that is imported by path.
+        self.assertIs(
+            _import_module(os.path.join(self.directory,
+                                        "coala_importers_test.py")),
+            sys.modules["coala_importers_test"])
+        self.assertEqual(sys.path, self.old_path)
+
+    def test_sibling_package_import(self):
+        os.mkdir(os.path.join(self.directory, "coala_importers_package"))
+        self.write_module(os.path.join("coala_importers_package",
+                                       "__init__"),
+                          "")
+        self.write_module(os.path.join("coala_importers_package", "module"),
+                          "value = 1\n")
+        path = self.write_module(
+            "coala_importers_sibling",
+            "from coala_importers_package.module import value\n")
+        self.assertEqual(_import_module(path).value, 1)
+        self.assertEqual(sys.path, self.old_path)
+
+    def test_sibling_shadowing(self):
+        self.write_module("colorsys", "value = 1\n")
+        path = self.write_module("coala_importers_sibling",
+                                 "import colorsys\n")
+        sys.modules.pop("colorsys", None)
+        # Modules next to bears do not shadow other modules.
+        self.assertFalse(hasattr(_import_module(path).colorsys, "value"))
+
+    def test_lazy_sibling_import(self):
+        self.write_module("coala_importers_test", "value = 1\n")
+        path = self.write_module(
+            "coala_importers_sibling",
+            "def run():\n"
+            "    from coala_importers_test import value\n"
+            "    return value\n")
+        # Bears may import the modules next to them only when they run.
+        self.assertEqual(_import_module(path).run(), 1)
+
+    def test_name_conflict(self):
+        path = self.write_module("json", "value = 1\n")
+        module = _import_module(path)
+        self.assertEqual(module.value, 1)
+        self.assertIsNot(sys.modules["json"], module)
+        self.assertIs(sys.modules[module.__name__], module)
+        del sys.modules[module.__name__]
+
+    def test_failing_module(self):
+        path = self.write_module("coala_importers_test", "raise ValueError\n")
+        self.assertRaises(ValueError, _import_module, path)
+        self.assertNotIn("coala_importers_test", sys.modules)
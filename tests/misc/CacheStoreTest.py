@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from coalib.misc.CacheStore import CacheStore
+
+
+class CacheStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache_store")
+        self.uut = CacheStore(self.path)
+        self.bear_key = ("TestBear", "settings hash", "version")
+
+    def tearDown(self):
+        self.uut.close()
+        self.directory.cleanup()
+
+    def test_wal(self):
+        self.assertEqual(
+            self.uut.connection.execute("PRAGMA journal_mode").fetchone(),
+            ("wal",))
+
+    def test_results(self):
+        other_key = ("OtherBear", "settings hash", "version")
+        self.uut.set_results("project", "a.c", "hash", {self.bear_key: b"1",
+                                                        other_key: b"2"})
+        self.assertEqual(
+            self.uut.get_results("project", "a.c", "hash", self.bear_key),
+            b"1")
+        self.assertIsNone(
+            self.uut.get_results("other project", "a.c", "hash",
+                                 self.bear_key))
+
+        # Storing results for other contents drops the old ones
+        self.uut.set_results("project", "a.c", "new hash",
+                             {self.bear_key: b"3"})
+        self.assertIsNone(
+            self.uut.get_results("project", "a.c", "hash", other_key))
+        self.assertEqual(
+            self.uut.get_results("project", "a.c", "new hash",
+                                 self.bear_key),
+            b"3")
+
+    def test_remove_project(self):
+        self.uut.set_time("project", 5)
+        self.uut.set_results("project", "a.c", "hash", {self.bear_key: b""})
+        self.uut.remove_project("project")
+
+        self.assertIsNone(self.uut.get_time("project"))
+        self.assertIsNone(
+            self.uut.get_results("project", "a.c", "hash", self.bear_key))
+
+    def test_old_tables(self):
+        self.uut.connection.execute(
+            "CREATE TABLE files (project TEXT, filename TEXT, time INTEGER)")
+        self.uut.connection.execute(
+            "CREATE TABLE settings (project TEXT, settings_hash TEXT)")
+        self.uut.commit()
+        self.uut.close()
+        self.uut = CacheStore(self.path)
+        self.assertEqual(self.uut.connection.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE name IN ('files', 'settings')").fetchall(), [])
+
+    def test_concurrent_connections(self):
+        other = CacheStore(self.path)
+        self.uut.set_time("project", 5)
+        self.assertIsNone(other.get_time("project"))
+
+        self.uut.commit()
+        self.assertEqual(other.get_time("project"), 5)
+
+        self.uut.set_time("project", 6)
+        self.uut.rollback()
+        self.assertEqual(other.get_time("project"), 5)
+        other.close()
@@ -1,12 +1,14 @@
 import unittest
 import re
 import os
+import sqlite3
 from unittest.mock import patch
 
 from pyprint.NullPrinter import NullPrinter
 
 from coalib.misc.Caching import FileCache
-from coalib.misc.CachingUtilities import pickle_load, pickle_dump
+from coalib.misc.CachingUtilities import (
+    get_data_path, hash_id, open_cache_store, pickle_dump)
 from coalib.output.printers.LogPrinter import LogPrinter
 from coalib import coala
 from coalib.misc.ContextManagers import prepare_file
@@ -17,81 +19,108 @@ from tests.TestUtilities import execute_coala, bear_test_module
 class CachingTest(unittest.TestCase):
 
     def setUp(self):
-        current_dir = os.path.split(__file__)[0]
-        self.caching_test_dir = os.path.join(
-            current_dir,
-            "caching_testfiles")
         self.log_printer = LogPrinter(NullPrinter())
         self.cache = FileCache(self.log_printer, "coala_test", flush_cache=True)
 
-    def test_file_tracking(self):
-        self.cache.track_files({"test.c", "file.py"})
-        self.assertEqual(self.cache.data, {"test.c": -1, "file.py": -1})
-
-        self.cache.untrack_files({"test.c"})
-        self.assertFalse("test.c" in self.cache.data)
-        self.assertTrue("file.py" in self.cache.data)
-
-        self.cache.untrack_files({"test.c", "file.py"})
-        self.assertFalse("test.c" in self.cache.data)
-        self.assertFalse("file.py" in self.cache.data)
+    def test_persistence(self):
+        bear_key = ("TestBear", "settings hash", "version")
+        with FileCache(self.log_printer, "test3", flush_cache=True) as cache:
+            cache.set_results("file.c", "hash", bear_key, [])
 
-    def test_write(self):
-        self.cache.track_files({"test2.c"})
-        self.assertEqual(self.cache.data["test2.c"], -1)
+        with FileCache(self.log_printer, "test3", flush_cache=False) as cache:
+            self.assertEqual(cache.get_results("file.c", "hash", bear_key),
+                             [])
+
+    def test_results(self):
+        bear_key = ("TestBear", "settings hash", "version")
+        self.assertIsNone(self.cache.get_results("a.c", "hash", bear_key))
+
+        self.cache.set_results("a.c", "hash", bear_key, ["result"])
+        self.cache.set_results("b.c", "hash", bear_key, [])
+        self.assertEqual(self.cache.get_results("a.c", "hash", bear_key),
+                         ["result"])
+        self.assertIsNone(self.cache.get_results(
+            "a.c", "hash", ("TestBear", "settings hash", "new version")))
+
+        # Results for old contents are dropped
+        other_key = ("OtherBear", "settings hash", "version")
+        self.cache.set_results("a.c", "new hash", other_key, [])
+        self.assertIsNone(self.cache.get_results("a.c", "hash", bear_key))
+        self.assertEqual(self.cache.get_results("a.c", "new hash", other_key),
+                         [])
 
         self.cache.write()
-        self.assertNotEqual(self.cache.data["test2.c"], -1)
+        cache = FileCache(self.log_printer, "coala_test", flush_cache=False)
+        self.assertEqual(cache.get_results("b.c", "hash", bear_key), [])
 
-    @patch('coalib.misc.Caching.os')
-    def test_get_uncached_files(self, mock_os):
-        file_path = os.path.join(self.caching_test_dir, "test.c")
-        cache = FileCache(self.log_printer, "coala_test3", flush_cache=True)
-
-        # Since this is a new FileCache object, the return must be the full set
-        cache.current_time = 0
-        mock_os.path.getmtime.return_value = 0
-        self.assertEqual(cache.get_uncached_files({file_path}), {file_path})
-
-        cache.track_files({file_path})
-        self.assertEqual(cache.get_uncached_files({file_path}), {file_path})
+        self.assertEqual(cache.get_results("a.c", "new hash", other_key), [])
 
+        # Results of other bears on the same contents are kept
+        cache.set_results("a.c", "new hash", bear_key, ["result"])
+        self.assertEqual(cache.get_results("a.c", "new hash", other_key), [])
         cache.write()
-        self.assertEqual(cache.get_uncached_files({file_path}), set())
-
-        # Simulate changing the file and then getting uncached files
-        # Since the file has been edited since the last run it's returned
-        cache.current_time = 1
-        mock_os.path.getmtime.return_value = 1
-        cache.track_files({file_path})
-        self.assertEqual(cache.get_uncached_files({file_path}), {file_path})
-        cache.write()
-
-        # Not changing the file should NOT return it the next time
-        cache.current_time = 2
-        self.assertEqual(cache.get_uncached_files({file_path}), set())
-
-    def test_persistence(self):
-        with FileCache(self.log_printer, "test3", flush_cache=True) as cache:
-            cache.track_files({"file.c"})
-        self.assertTrue("file.c" in cache.data)
-
-        with FileCache(self.log_printer, "test3", flush_cache=False) as cache:
-            self.assertTrue("file.c" in cache.data)
+        cache = FileCache(self.log_printer, "coala_test", flush_cache=False)
+        self.assertEqual(cache.get_results("a.c", "new hash", bear_key),
+                         ["result"])
+
+        cache.flush_cache()
+        self.assertIsNone(cache.get_results("a.c", "new hash", other_key))
+
+    def test_write_locked(self):
+        bear_key = ("TestBear", "settings hash", "version")
+        self.cache.set_results("file.c", "hash", bear_key, [])
+        with patch.object(self.cache.store, "commit") as commit:
+            commit.side_effect = sqlite3.OperationalError("database is locked")
+            self.cache.write()
+
+        cache = FileCache(self.log_printer, "coala_test", flush_cache=False)
+        self.assertIsNone(cache.get_results("file.c", "hash", bear_key))
+        # The changes are written the next time
+        self.cache.write()
+        cache = FileCache(self.log_printer, "coala_test", flush_cache=False)
+        self.assertEqual(cache.get_results("file.c", "hash", bear_key), [])
 
     def test_time_travel(self):
+        bear_key = ("TestBear", "settings hash", "version")
         cache = FileCache(self.log_printer, "coala_test2", flush_cache=True)
-        cache.track_files({"file.c"})
+        cache.set_results("file.c", "hash", bear_key, [])
         cache.write()
-        self.assertTrue("file.c" in cache.data)
 
-        cache_data = pickle_load(self.log_printer, "coala_test2", {})
+        store = open_cache_store(self.log_printer)
         # Back to the future :)
-        cache_data["time"] = 2000000000
-        pickle_dump(self.log_printer, "coala_test2", cache_data)
+        store.set_time(hash_id("coala_test2"), 2000000000)
+        store.commit()
+        store.close()
 
         cache = FileCache(self.log_printer, "coala_test2", flush_cache=False)
-        self.assertFalse("file.c" in cache.data)
+        self.assertIsNone(cache.get_results("file.c", "hash", bear_key))
+
+    def test_pickle_cache(self):
+        bear_key = ("TestBear", "settings hash", "version")
+        with FileCache(self.log_printer, "coala_test5",
+                       flush_cache=True) as cache:
+            cache.set_results("file.c", "hash", bear_key, [])
+
+        # Older coala versions pickled the last run time and the time each
+        # file was analyzed at.
+        pickle_dump(self.log_printer,
+                    "coala_test5",
+                    {"time": 0, "files": {"file.c": 0}})
+
+        with patch.object(LogPrinter, "info") as info:
+            cache = FileCache(self.log_printer, "coala_test5",
+                              flush_cache=False)
+            info.assert_called_once_with(
+                "The file cache written by an older coala version was "
+                "reset.")
+        self.assertFalse(os.path.isfile(get_data_path(self.log_printer,
+                                                      "coala_test5")))
+        # The results in the store are kept
+        self.assertEqual(cache.get_results("file.c", "hash", bear_key), [])
+
+        with patch.object(LogPrinter, "info") as info:
+            FileCache(self.log_printer, "coala_test5", flush_cache=False)
+            self.assertFalse(info.called)
 
     def test_caching_results(self):
         """
@@ -130,3 +159,19 @@ class CachingTest(unittest.TestCase):
                 "-f", re.escape(filename),
                 "-b", "LineCountTestBear")
             self.assertIn("This file has", output)
+
+            # Results of files with unchanged contents are replayed without
+            # running the bear again.
+            for i in range(2):
+                os.utime(filename)
+                with simulate_console_inputs("0"):
+                    retval, output = execute_coala(
+                        coala.main,
+                        "coala",
+                        "-c", os.devnull,
+                        "-f", re.escape(filename),
+                        "-b", "LineCountTestBear",
+                        "-L", "DEBUG")
+                self.assertIn("This file has", output)
+
+            self.assertNotIn("Running bear LineCountTestBear", output)
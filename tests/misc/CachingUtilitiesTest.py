@@ -1,13 +1,32 @@
 import os
+import shutil
+import sys
+import tempfile
 import unittest
 
 from pyprint.NullPrinter import NullPrinter
 
+from coalib.bears.LocalBear import LocalBear
 from coalib.misc.CachingUtilities import (
-    get_settings_hash, settings_changed, update_settings_db,
-    get_data_path, pickle_load, pickle_dump, delete_files)
+    get_bear_settings_hash, get_bear_version, get_data_path, pickle_load,
+    pickle_dump, delete_files, open_cache_store)
 from coalib.output.printers.LogPrinter import LogPrinter
 from coalib.settings.Section import Section
+from coalib.settings.Setting import Setting
+
+
+class SettingsTestBear(LocalBear):
+
+    def run(self, filename, file, max_line_length: int=80):
+        return []
+
+
+class DependentTestBear(LocalBear):
+
+    BEAR_DEPS = {SettingsTestBear}
+
+    def run(self, filename, file, use_spaces: bool):
+        return []
 
 
 class CachingUtilitiesTest(unittest.TestCase):
@@ -50,23 +69,100 @@ class CachingUtilitiesTest(unittest.TestCase):
 
         self.assertFalse(pickle_dump(self.log_printer, "test", {"answer": 42}))
 
+    def test_open_cache_store(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                unittest.mock.patch(
+                    "coalib.misc.CachingUtilities.get_data_path",
+                    lambda log_printer, identifier: os.path.join(
+                        directory, identifier)):
+            pickle_dump(self.log_printer,
+                        "settings_hash_db",
+                        {"project": "settings hash"})
+            store = open_cache_store(self.log_printer)
+            store.set_time("project", 5)
+            store.commit()
+            store.close()
+            self.assertFalse(os.path.isfile(
+                os.path.join(directory, "settings_hash_db")))
+
+            with open(os.path.join(directory, "cache_store"), "wb") as file:
+                file.write(bytes([1] * 100))
+            store = open_cache_store(self.log_printer)
+            self.assertIsNone(store.get_time("project"))
+            store.close()
+
+    @unittest.mock.patch("os.makedirs")
+    def test_open_cache_store_in_memory(self, makedirs):
+        makedirs.side_effect = PermissionError
+        store = open_cache_store(self.log_printer)
+        self.assertEqual(store.path, ":memory:")
+        store.close()
+
 
 class SettingsTest(unittest.TestCase):
 
     def setUp(self):
         self.log_printer = LogPrinter(NullPrinter())
 
-    def test_settings_change(self):
-        sections = {}
-        settings_hash = get_settings_hash(sections)
-        update_settings_db(self.log_printer, settings_hash)
-        self.assertFalse(settings_changed(self.log_printer, settings_hash))
-
-        sections = {"a": Section("a")}
-        settings_hash = get_settings_hash(sections)
-        self.assertTrue(settings_changed(self.log_printer, settings_hash))
-
-    def test_targets_change(self):
-        sections = {"a": Section("a"), "b": Section("b")}
-        self.assertNotEqual(get_settings_hash(sections),
-                            get_settings_hash(sections, targets=["a"]))
+    def test_bear_settings_hash(self):
+        section = Section("a")
+        settings_hash = get_bear_settings_hash(SettingsTestBear, section)
+        dependent_hash = get_bear_settings_hash(DependentTestBear, section)
+        self.assertNotEqual(settings_hash, dependent_hash)
+
+        # Other settings do not matter
+        section.append(Setting("files", "*.py"))
+        self.assertEqual(get_bear_settings_hash(SettingsTestBear, section),
+                         settings_hash)
+
+        # Settings of dependencies do
+        section.append(Setting("max_line_length", "120"))
+        self.assertNotEqual(get_bear_settings_hash(SettingsTestBear, section),
+                            settings_hash)
+        self.assertNotEqual(get_bear_settings_hash(DependentTestBear, section),
+                            dependent_hash)
+
+        # So does the origin of settings
+        settings_hash = get_bear_settings_hash(SettingsTestBear, section)
+        section.append(Setting("max_line_length", "120", "/.coafile"))
+        self.assertNotEqual(get_bear_settings_hash(SettingsTestBear, section),
+                            settings_hash)
+
+    def test_bear_version(self):
+        version = get_bear_version(SettingsTestBear)
+        self.assertIsInstance(version, str)
+        self.assertEqual(get_bear_version(SettingsTestBear), version)
+        self.assertNotEqual(get_bear_version(DependentTestBear), version)
+        dynamic_bear = type("DynamicBear", (LocalBear,),
+                            {"__module__": "not_a_module"})
+        self.assertIsNone(get_bear_version(dynamic_bear))
+
+    def test_bear_version_helper_module(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        helper = os.path.join(directory, "VersionTestHelper.py")
+        with open(helper, "w") as file:
+            file.write("def check(file):\n    return []\n")
+        with open(os.path.join(directory, "VersionTestBear.py"), "w") as file:
+            file.write("from coalib.bears.LocalBear import LocalBear\n"
+                       "from VersionTestHelper import check\n\n\n"
+                       "class VersionTestBear(LocalBear):\n\n"
+                       "    def run(self, filename, file):\n"
+                       "        return check(file)\n")
+
+        sys.path.insert(0, directory)
+        self.addCleanup(sys.path.remove, directory)
+        for name in ("VersionTestHelper", "VersionTestBear"):
+            self.addCleanup(sys.modules.pop, name, None)
+        from VersionTestBear import VersionTestBear
+
+        version = get_bear_version(VersionTestBear)
+        self.assertIsInstance(version, str)
+
+        # Changing a module the bear uses changes its version.
+        with open(helper, "w") as file:
+            file.write("def check(file):\n    return [file]\n")
+        stat = os.stat(helper)
+        os.utime(helper, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        get_bear_version.cache_clear()
+        self.assertNotEqual(get_bear_version(VersionTestBear), version)
@@ -17,10 +17,12 @@ GlobTestDir
 import os
 import re
 import unittest
+from unittest.mock import patch
 
+from coalib.parsing import Globbing
 from coalib.parsing.Globbing import (
-    _iter_alternatives, _iter_choices, _position_is_bracketed, fnmatch, glob,
-    glob_escape)
+    GlobSet, _iter_alternatives, _iter_choices, _position_is_bracketed,
+    fnmatch, glob, glob_escape, iglob, iglob_entries, translate)
 
 
 class TestFiles:
@@ -210,6 +212,55 @@ class FnmatchTest(unittest.TestCase):
         non_matches = []
         self._test_fnmatch(pattern, matches, non_matches)
 
+    def test_literal_prefix_suffix(self):
+        pattern = ["setup.py", os.path.join("vendor", "**"), "*.c"]
+        matches = ["setup.py",
+                   os.path.join("vendor", ""),
+                   os.path.join("vendor", "lib", "a.py"),
+                   "a.c",
+                   ".c"]
+        non_matches = ["setup.pyc",
+                       os.path.join("src", "setup.py"),
+                       "vendor",
+                       os.path.join("src", "a.c"),
+                       "a.cpp"]
+        self._test_fnmatch(pattern, matches, non_matches)
+
+
+class GlobSetTest(unittest.TestCase):
+
+    def test_same_as_regexes(self):
+        globs = ["*.py",
+                 "**.c",
+                 os.path.join("src", "**"),
+                 os.path.join("(a|b)", "*.txt"),
+                 "File?.x",
+                 "[!F]ile",
+                 "exact"]
+        names = ["a.py",
+                 os.path.join("dir", "a.py"),
+                 os.path.join("dir", "a.c"),
+                 os.path.join("src", "a", "b"),
+                 os.path.join("a", "b.txt"),
+                 os.path.join("c", "b.txt"),
+                 "File1.x",
+                 "Eile",
+                 "File",
+                 "exact",
+                 "exactly"]
+        glob_set = GlobSet(globs)
+        for name in names:
+            self.assertEqual(glob_set.match(name),
+                             any(re.match(translate(pattern),
+                                          os.path.normcase(name))
+                                 for glob in globs
+                                 for pattern in _iter_alternatives(glob)),
+                             name)
+
+    def test_no_globs(self):
+        self.assertFalse(GlobSet([]).match("anything"))
+        self.assertTrue(GlobSet("*").match("anything"))
+
 
 class GlobTest(unittest.TestCase):
 
@@ -357,3 +408,33 @@ class GlobTest(unittest.TestCase):
         file_list = sorted([os.path.normcase(f) for f in file_list])
         self.assertEqual(results, file_list)
         os.curdir = old_curdir
+
+    def test_entries(self):
+        pattern = os.path.join(TestFiles.glob_test_dir, "**")
+        entries = dict(iglob_entries(pattern))
+        self.assertIsNone(entries[TestFiles.glob_test_dir + os.sep])
+        self.assertTrue(entries[TestFiles.dir1].is_dir())
+        self.assertTrue(entries[TestFiles.file11].is_file())
+
+        self.assertEqual(list(iglob_entries(TestFiles.file1)),
+                         [(TestFiles.file1, None)])
+
+    def test_ignored_dirs_not_walked(self):
+        walked_dirs = []
+
+        def scandir(path):
+            walked_dirs.append(os.path.normcase(path))
+            return os.scandir(path)
+
+        pattern = os.path.join(TestFiles.glob_test_dir, "**", "*.py")
+        ignored = os.path.join(TestFiles.glob_test_dir, "Sub*1", "**")
+        with patch.object(Globbing, "scandir", scandir):
+            results = list(iglob(pattern, [ignored]))
+
+        self.assertNotIn(os.path.normcase(TestFiles.file11), results)
+        self.assertNotIn(os.path.normcase(TestFiles.dir1), walked_dirs)
+        self.assertIn(os.path.normcase(TestFiles.dir2), walked_dirs)
+
+        # Without ignore globs ending with ``**``, everything is walked.
+        self.assertIn(os.path.normcase(TestFiles.file11),
+                      iglob(pattern, ["*.pyc"]))
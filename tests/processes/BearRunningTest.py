@@ -176,6 +176,43 @@ class BearRunningUnitTest(unittest.TestCase):
         except queue.Empty:
             pass
 
+    def test_end_of_queues(self):
+        self.local_bear_list.append(SimpleBear(self.settings,
+                                               self.message_queue))
+        self.global_bear_list.append(SimpleGlobalBear({},
+                                                      self.settings,
+                                                      self.message_queue))
+        self.global_bear_list.append(DependentGlobalBear({},
+                                                         self.settings,
+                                                         self.message_queue))
+        self.file_dict["t"] = []
+        self.file_dict["u"] = []
+        self.file_name_queue.put("t")
+        self.file_name_queue.put(None)
+        self.file_name_queue.put("u")
+        # The dependent bear is put back behind the end of the queue but
+        # has to be run anyway.
+        self.global_bear_queue.put(1)
+        self.global_bear_queue.put(0)
+        self.global_bear_queue.put(None)
+
+        run(self.file_name_queue,
+            self.local_bear_list,
+            self.global_bear_list,
+            self.global_bear_queue,
+            self.file_dict,
+            self.local_result_dict,
+            self.global_result_dict,
+            self.message_queue,
+            self.control_queue,
+            timeout=None)
+
+        self.assertEqual(self.file_name_queue.get(timeout=0), "u")
+        self.assertTrue(self.global_bear_queue.empty())
+        self.assertEqual(list(self.local_result_dict.keys()), ["t"])
+        self.assertEqual(sorted(self.global_result_dict.keys()),
+                         ["DependentGlobalBear", "SimpleGlobalBear"])
+
     def test_evil_bear(self):
         self.local_bear_list.append(EvilBear(self.settings,
                                              self.message_queue))
@@ -288,7 +325,13 @@ d
                                                      "something went wrong",
                                                      'arbitrary')]
                                  ]
-        for expected in local_result_expected:
+        failed_bears_expected = [[(self.file1, ["LocalTestBear", "str"])],
+                                 [(self.file2, ["str"])]]
+        for expected, failed_bears in zip(local_result_expected,
+                                          failed_bears_expected):
+            control_elem, index = self.control_queue.get()
+            self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL_FAILED)
+            self.assertEqual(index, failed_bears)
             control_elem, index = self.control_queue.get()
             self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL)
             real = self.local_result_dict[index]
@@ -322,3 +365,140 @@ d
                          len(local_result_expected))
         self.assertRaises(queue.Empty, self.message_queue.get, timeout=0)
         self.assertRaises(queue.Empty, self.control_queue.get, timeout=0)
+
+    def test_run_chunks(self):
+        expected_results = [Result.from_values("LocalTestBear",
+                                               "something went wrong",
+                                               'arbitrary')]
+        file_name_queue = queue.Queue()
+        file_name_queue.put([self.file1, self.file2])
+        file_name_queue.put(["invalid file"])
+
+        run(file_name_queue,
+            self.local_bear_list,
+            [],
+            queue.Queue(),
+            self.file_dict,
+            self.local_result_dict,
+            self.global_result_dict,
+            self.message_queue,
+            self.control_queue)
+
+        control_elem, index = self.control_queue.get(timeout=0)
+        self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL_FAILED)
+        self.assertEqual(index, [(self.file1, ["LocalTestBear", "str"]),
+                                 (self.file2, ["str"])])
+        control_elem, index = self.control_queue.get(timeout=0)
+        self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL)
+        self.assertEqual(index, [self.file1, self.file2])
+        self.assertEqual(self.local_result_dict[self.file2], expected_results)
+        # Nothing is put for chunks without valid files
+        control_elem, index = self.control_queue.get(timeout=0)
+        self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL_FINISHED)
+        control_elem, index = self.control_queue.get(timeout=0)
+        self.assertEqual(control_elem, CONTROL_ELEMENT.GLOBAL_FINISHED)
+
+        # Only some bears can be run on a file
+        file_name_queue.put([(self.file1, [1]), self.file2])
+        run(file_name_queue,
+            self.local_bear_list,
+            [],
+            queue.Queue(),
+            self.file_dict,
+            None,
+            self.global_result_dict,
+            self.message_queue,
+            self.control_queue)
+
+        control_elem, index = self.control_queue.get(timeout=0)
+        self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL_FAILED)
+        self.assertEqual(index, [(self.file1, ["str"]),
+                                 (self.file2, ["str"])])
+        control_elem, index = self.control_queue.get(timeout=0)
+        self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL)
+        self.assertEqual(index, [(self.file1, []),
+                                 (self.file2, expected_results)])
+        for finished in (CONTROL_ELEMENT.LOCAL_FINISHED,
+                         CONTROL_ELEMENT.GLOBAL_FINISHED):
+            self.assertEqual(self.control_queue.get(timeout=0),
+                             (finished, None))
+
+        # Chunks can bring the files they contain
+        file_name_queue.put(([self.file2], {self.file2: ("line\n",)}))
+        run(file_name_queue,
+            self.local_bear_list,
+            [],
+            queue.Queue(),
+            {},
+            None,
+            self.global_result_dict,
+            self.message_queue,
+            self.control_queue)
+
+        control_elem, index = self.control_queue.get(timeout=0)
+        self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL_FAILED)
+        control_elem, index = self.control_queue.get(timeout=0)
+        self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL)
+        self.assertEqual(index, [(self.file2, expected_results)])
+
+    def test_run_without_local_result_dict(self):
+        run(self.file_name_queue,
+            self.local_bear_list,
+            self.global_bear_list,
+            self.global_bear_queue,
+            self.file_dict,
+            None,
+            self.global_result_dict,
+            self.message_queue,
+            self.control_queue)
+
+        local_result_expected = [
+            (self.file1, []),
+            (self.file2, [Result.from_values("LocalTestBear",
+                                             "something went wrong",
+                                             'arbitrary')])]
+        for expected in local_result_expected:
+            control_elem, index = self.control_queue.get(timeout=0)
+            self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL_FAILED)
+            control_elem, index = self.control_queue.get(timeout=0)
+            self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL)
+            self.assertEqual(index, expected)
+
+        control_elem, index = self.control_queue.get(timeout=0)
+        self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL_FINISHED)
+
+    def test_run_scheduled_global_bears(self):
+        # Bears put by the scheduler run before the files are checked.
+        global_bear_queue = queue.Queue()
+        global_bear_queue.put(0)
+        global_bear_queue.put(None)
+        global_finished_queue = queue.Queue()
+        file_name_queue = queue.Queue()
+        file_name_queue.put([self.file1, self.file2])
+
+        run(file_name_queue,
+            self.local_bear_list,
+            self.global_bear_list,
+            global_bear_queue,
+            self.file_dict,
+            self.local_result_dict,
+            self.global_result_dict,
+            self.message_queue,
+            self.control_queue,
+            global_finished_queue=global_finished_queue)
+
+        self.assertEqual(
+            [self.control_queue.get(timeout=0)[0] for i in range(5)],
+            [CONTROL_ELEMENT.GLOBAL,
+             CONTROL_ELEMENT.LOCAL_FAILED,
+             CONTROL_ELEMENT.LOCAL,
+             CONTROL_ELEMENT.LOCAL_FINISHED,
+             CONTROL_ELEMENT.GLOBAL_FINISHED])
+        self.assertRaises(queue.Empty, self.control_queue.get, timeout=0)
+        self.assertEqual(len(self.global_result_dict["GlobalTestBear"]), 2)
+
+        bearname, duration = global_finished_queue.get(timeout=0)
+        self.assertEqual(bearname, "GlobalTestBear")
+        self.assertGreaterEqual(duration, 0)
+        self.assertTrue(global_finished_queue.empty())
+        self.assertTrue(global_bear_queue.empty())
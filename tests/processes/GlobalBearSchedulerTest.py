@@ -0,0 +1,97 @@
+import queue
+import unittest
+
+from coalib.bears.GlobalBear import GlobalBear
+from coalib.output.printers.ListLogPrinter import ListLogPrinter
+from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
+from coalib.processes.GlobalBearScheduler import (
+    GlobalBearScheduler, get_global_bear_dependencies)
+from coalib.settings.Section import Section
+
+
+class FirstBear(GlobalBear):
+    pass
+
+
+class SecondBear(GlobalBear):
+    BEAR_DEPS = {FirstBear}
+
+
+class ThirdBear(GlobalBear):
+    BEAR_DEPS = {FirstBear, SecondBear}
+
+
+class IndependentBear(GlobalBear):
+    pass
+
+
+class GlobalBearSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        section = Section("name")
+        self.global_bear_list = [bear({}, section, None)
+                                 for bear in (FirstBear,
+                                              SecondBear,
+                                              ThirdBear,
+                                              IndependentBear)]
+        self.global_bear_queue = queue.Queue()
+        self.finished_queue = queue.Queue()
+        self.log_printer = ListLogPrinter(log_level=LOG_LEVEL.DEBUG)
+        self.uut = GlobalBearScheduler(self.global_bear_list,
+                                       self.global_bear_queue,
+                                       self.finished_queue,
+                                       2,
+                                       self.log_printer,
+                                       "name")
+
+    def get_dispatched(self, count):
+        return [self.global_bear_queue.get(timeout=1) for i in range(count)]
+
+    def finish(self, index, duration):
+        self.finished_queue.put(
+            (self.global_bear_list[index].__class__.__name__, duration))
+
+    def test_dependencies(self):
+        self.assertEqual(get_global_bear_dependencies(self.global_bear_list),
+                         [set(), {0}, {0, 1}, set()])
+        self.assertEqual(
+            get_global_bear_dependencies(self.global_bear_list[1:]),
+            [set(), {0}, set()])
+
+    def test_run(self):
+        self.uut.start()
+        # Bears without dependencies can run right away.
+        self.assertEqual(self.get_dispatched(2), [0, 3])
+        self.finish(3, 5)
+        self.finish(0, 1)
+        self.assertEqual(self.get_dispatched(1), [1])
+        self.assertTrue(self.global_bear_queue.empty())
+        self.finish(1, 2)
+        # The end is marked for both readers once everything is dispatched.
+        self.assertEqual(self.get_dispatched(3), [2, None, None])
+        self.finish(2, 3)
+        self.uut.join(timeout=1)
+        self.assertFalse(self.uut.is_alive())
+
+        self.assertEqual(
+            [log.message for log in self.log_printer.logs],
+            ["The longest chain of global bears depending on each other in "
+             "section name took 6.00 seconds: FirstBear -> SecondBear -> "
+             "ThirdBear."])
+
+    def test_stop(self):
+        self.uut.start()
+        self.assertEqual(self.get_dispatched(2), [0, 3])
+        self.uut.stop()
+        self.uut.join(timeout=1)
+        self.assertFalse(self.uut.is_alive())
+        # The processes are released even though bears are left.
+        self.assertEqual(self.get_dispatched(2), [None, None])
+        self.assertEqual(self.log_printer.logs, [])
+
+    def test_no_bears(self):
+        self.uut.global_bear_list = []
+        self.uut.start()
+        self.uut.join(timeout=1)
+        self.assertEqual(self.get_dispatched(2), [None, None])
+        self.assertTrue(self.global_bear_queue.empty())
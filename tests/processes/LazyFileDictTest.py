@@ -0,0 +1,81 @@
+import pickle
+import unittest
+
+from coalib.processes.LazyFileDict import LazyFileDict
+
+
+class LazyFileDictTest(unittest.TestCase):
+
+    def setUp(self):
+        self.uut = LazyFileDict({"a": b"first line\n\tsecond line\n",
+                                 "b": b"windows\r\nmac\rlast",
+                                 "c": "unicode → line\f\n".encode("utf-8"),
+                                 "empty": b""})
+        self.file_dict = {"a": ("first line\n", "\tsecond line\n"),
+                          "b": ("windows\n", "mac\n", "last"),
+                          "c": ("unicode → line\f\n",),
+                          "empty": ()}
+
+    def test_contents(self):
+        self.assertEqual(len(self.uut), len(self.file_dict))
+        self.assertEqual(list(self.uut), ["a", "b", "c", "empty"])
+        self.assertIn("a", self.uut)
+        self.assertNotIn("d", self.uut)
+        for filename, file in self.file_dict.items():
+            self.assertEqual(self.uut[filename], file)
+            self.assertIsInstance(self.uut[filename], tuple)
+        self.assertEqual(self.uut, self.file_dict)
+
+        with self.assertRaises(KeyError):
+            self.uut["d"]
+
+    def test_lazy_decoding(self):
+        self.assertEqual(self.uut.get_content("b"), b"windows\r\nmac\rlast")
+        self.assertIsInstance(dict.__getitem__(self.uut, "b"), bytes)
+
+        file = self.uut["b"]
+        self.assertIs(self.uut["b"], file)
+        self.assertEqual(self.uut.get_content("b"), b"windows\nmac\nlast")
+
+        uut = LazyFileDict({"invalid": "ä".encode("latin-1")})
+        with self.assertRaises(UnicodeDecodeError):
+            uut["invalid"]
+
+    def test_set_and_delete(self):
+        self.uut["a"] = ["changed\n"]
+        self.uut["d"] = ("new\n",)
+        self.assertEqual(self.uut["a"], ["changed\n"])
+        self.assertEqual(self.uut.get_content("d"), b"new\n")
+
+        del self.uut["a"]
+        self.assertEqual(self.uut.pop("b"), self.file_dict["b"])
+        self.assertIsNone(self.uut.pop("b", None))
+        self.assertEqual(self.uut.setdefault("c", ()), self.file_dict["c"])
+        self.assertEqual(self.uut.popitem(), ("d", ("new\n",)))
+        self.assertEqual(list(self.uut), ["c", "empty"])
+        with self.assertRaises(KeyError):
+            self.uut.get_content("a")
+
+    def test_dict(self):
+        copy = self.uut.copy()
+        self.assertIsInstance(copy, LazyFileDict)
+        self.assertIsInstance(dict.__getitem__(copy, "a"), bytes)
+        self.assertEqual(copy, self.file_dict)
+
+        self.assertIsInstance(self.uut, dict)
+        self.assertEqual(dict(self.uut), self.file_dict)
+        self.assertEqual(dict(self.uut.items()), self.file_dict)
+        self.assertEqual(list(self.uut.values()),
+                         list(self.file_dict.values()))
+        self.assertEqual(self.uut.get("a"), self.file_dict["a"])
+        self.assertIsNone(self.uut.get("d"))
+        self.assertEqual(self.file_dict, self.uut)
+        self.assertNotEqual(self.uut, {})
+        self.assertIn("'a': ('first line\\n',", repr(self.uut))
+
+    def test_pickle(self):
+        self.uut["a"]
+        copy = pickle.loads(pickle.dumps(self.uut))
+        self.assertIsInstance(copy, LazyFileDict)
+        self.assertIsInstance(dict.__getitem__(copy, "b"), bytes)
+        self.assertEqual(copy, self.file_dict)
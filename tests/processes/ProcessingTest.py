@@ -3,19 +3,35 @@ import os
 import platform
 import queue
 import re
+import shutil
 import subprocess
 import sys
+import tempfile
+import threading
+import time
 import unittest
+import unittest.mock
+from collections import OrderedDict
 
 from pyprint.ConsolePrinter import ConsolePrinter
+from pyprint.NullPrinter import NullPrinter
 
+from coalib.bears.GlobalBear import GlobalBear
+from coalib.bears.LocalBear import LocalBear
 from coalib.output.printers.LogPrinter import LogPrinter
+from coalib.processes.BearPool import BearPool
 from coalib.processes.CONTROL_ELEMENT import CONTROL_ELEMENT
+from coalib.processes.LazyFileDict import LazyFileDict
 from coalib.processes.Processing import (
-    ACTIONS, autoapply_actions, check_result_ignore, create_process_group,
-    execute_section, filter_raising_callables, get_default_actions,
-    get_file_dict, print_result, process_queues, simplify_section_result,
+    ACTIONS, RESULT_TRANSPORTS, autoapply_actions, cache_results,
+    check_result_ignore, create_process_group, dispatch_files,
+    execute_section, execute_sections, fill_queue, filter_files,
+    filter_raising_callables, get_cached_results, get_changed_files,
+    get_chunk_size, get_default_actions, get_file_collection, get_file_dict,
+    get_max_file_size, get_result_transport, load_files, get_ignore_ranges,
+    print_result, process_queues, simplify_section_result,
     yield_ignore_ranges)
+from coalib.processes.SharedFileDict import SharedFileDict
 from coalib.results.HiddenResult import HiddenResult
 from coalib.results.Result import RESULT_SEVERITY, Result
 from coalib.results.result_actions.ApplyPatchAction import ApplyPatchAction
@@ -27,6 +43,7 @@ from coalib.settings.ConfigurationGathering import gather_configuration
 from coalib.settings.Section import Section
 from coalib.settings.Setting import Setting
 from coalib.misc.Caching import FileCache
+from coalib.misc.ContextManagers import prepare_file
 
 
 process_group_test_code = """
@@ -46,10 +63,69 @@ class DummyProcess(multiprocessing.Process):
         multiprocessing.Process.__init__(self)
         self.control_queue = control_queue
         self.starts_dead = starts_dead
+        # Never readable, the process does not end on its own.
+        self.connections = multiprocessing.Pipe()
 
     def is_alive(self):
         return not self.control_queue.empty() and not self.starts_dead
 
+    @property
+    def sentinel(self):
+        return self.connections[0]
+
+
+class UnpicklableTestBear(LocalBear):
+
+    def __init__(self, *args, **kwargs):
+        LocalBear.__init__(self, *args, **kwargs)
+        self.lock = threading.Lock()
+
+    def run(self, filename, file):
+        with self.lock:
+            return [Result("UnpicklableTestBear", "test msg")]
+
+
+class CachedTestBear(LocalBear):
+
+    def run(self, filename, file):
+        return [Result(self, "test msg")]
+
+
+class DependentCachedTestBear(LocalBear):
+
+    BEAR_DEPS = {CachedTestBear}
+
+    def run(self, filename, file, dependency_results=None, level: int=1):
+        return []
+
+
+class FirstGlobalTestBear(GlobalBear):
+
+    def run(self):
+        return [Result(self, "first msg")]
+
+
+class DependentGlobalTestBear(GlobalBear):
+
+    BEAR_DEPS = {FirstGlobalTestBear}
+
+    def run(self, dependency_results=None):
+        return [Result(self, "{} dependency results".format(
+            len(dependency_results["FirstGlobalTestBear"])))]
+
+
+class NoResultsTestBear(LocalBear):
+
+    def run(self, filename, file):
+        return []
+
+
+class ManyResultsTestBear(LocalBear):
+
+    def run(self, filename, file):
+        for line in range(1, len(file) + 1):
+            yield Result.from_values(self, "test msg", filename, line)
+
 
 class ProcessingTestLogPrinter(LogPrinter):
 
@@ -127,6 +203,274 @@ class ProcessingTest(unittest.TestCase):
                          "confidence=100, message='test message'\\) at "
                          "0x[0-9a-fA-F]+>".format(hex(global_result.id)))
 
+    def test_run_manager_result_transport(self):
+        self.sections['default'].append(Setting('jobs', "1"))
+        self.sections['default'].append(Setting('result_transport',
+                                                "manager"))
+        results = execute_section(self.sections["default"],
+                                  self.global_bears["default"],
+                                  self.local_bears["default"],
+                                  lambda *args: self.result_queue.put(args[2]),
+                                  None,
+                                  self.log_printer)
+        self.assertTrue(results[0])
+        self.assertEqual(len(self.result_queue.get(timeout=0)), 1)
+        self.assertEqual(len(self.result_queue.get(timeout=0)), 1)
+        self.assertTrue(self.result_queue.empty())
+        self.assertEqual(len(results[1]), 1)
+        self.assertEqual(len(results[2]), 1)
+
+    def test_run_bear_pool(self):
+        self.sections['default'].append(Setting('jobs', "2"))
+        bear_pool = BearPool(1, 2, self.log_printer)
+        bear_pool.start()
+        try:
+            for i in range(2):
+                results = execute_section(
+                    self.sections["default"],
+                    # The bear classes get replaced with instances
+                    list(self.global_bears["default"]),
+                    list(self.local_bears["default"]),
+                    lambda *args: self.result_queue.put(args[2]),
+                    None,
+                    self.log_printer,
+                    bear_pool)
+                self.assertTrue(results[0])
+                self.assertEqual(len(self.result_queue.get(timeout=0)), 1)
+                self.assertEqual(len(self.result_queue.get(timeout=0)), 1)
+                self.assertTrue(self.result_queue.empty())
+                self.assertEqual(len(results[1]), 1)
+                self.assertEqual(len(results[2]), 1)
+        finally:
+            bear_pool.close()
+
+        self.assertFalse(any(process.is_alive()
+                             for process in bear_pool.processes))
+
+    def test_bear_pool_manager(self):
+        bear_pool = BearPool(1, 2, self.log_printer)
+        with unittest.mock.patch("multiprocessing.Manager",
+                                 wraps=multiprocessing.Manager) as manager:
+            first = bear_pool.create_dict()
+            second = bear_pool.create_dict()
+            # Both dictionaries live in the same manager.
+            self.assertEqual(manager.call_count, 1)
+        first["key"] = "value"
+        self.assertNotIn("key", second)
+        bear_pool.start()
+        bear_pool.close()
+        # The manager is stopped along with the pool.
+        self.assertRaises((EOFError, OSError), first.keys)
+
+    def test_run_without_manager(self):
+        self.sections['default'].append(Setting('jobs', "1"))
+        with unittest.mock.patch("multiprocessing.Manager") as manager:
+            results = execute_section(self.sections["default"],
+                                      [],
+                                      self.local_bears["default"],
+                                      lambda *args: None,
+                                      None,
+                                      self.log_printer)
+            # Nothing has to be shared with the default result transport.
+            self.assertFalse(manager.called)
+        self.assertTrue(results[0])
+
+    def test_run_bear_pool_unpicklable_bears(self):
+        self.sections['default'].append(Setting('jobs', "1"))
+        bear_pool = BearPool(1, 1, self.log_printer)
+        bear_pool.start()
+        try:
+            results = execute_section(
+                self.sections["default"],
+                [],
+                [UnpicklableTestBear],
+                lambda *args: self.result_queue.put(args[2]),
+                None,
+                self.log_printer,
+                bear_pool)
+        finally:
+            bear_pool.close()
+
+        # The bears run in a new process instead
+        self.assertTrue(results[0])
+        self.assertEqual(len(self.result_queue.get(timeout=0)), 1)
+        messages = []
+        while not self.log_queue.empty():
+            messages.append(self.log_queue.get().message)
+        self.assertTrue(any(
+            message.startswith("The bears of the section Default cannot be "
+                               "sent to the running processes, starting new "
+                               "ones: ")
+            for message in messages))
+
+    def test_run_dependent_global_bears(self):
+        self.sections['default'].append(Setting('jobs', "2"))
+        results = execute_section(self.sections["default"],
+                                  [DependentGlobalTestBear,
+                                   FirstGlobalTestBear],
+                                  [],
+                                  lambda *args: self.result_queue.put(args[2]),
+                                  None,
+                                  self.log_printer)
+        self.assertTrue(results[0])
+        messages = []
+        while not self.result_queue.empty():
+            messages.extend(result.message
+                            for result in self.result_queue.get())
+        self.assertEqual(sorted(messages),
+                         ["1 dependency results", "first msg"])
+
+        messages = []
+        while not self.log_queue.empty():
+            messages.append(self.log_queue.get().message)
+        self.assertTrue(any(
+            re.match("The longest chain of global bears depending on each "
+                     "other in section Default took .* seconds: "
+                     r"FirstGlobalTestBear -> DependentGlobalTestBear\.$",
+                     message)
+            for message in messages))
+
+    def test_execute_sections(self):
+        self.sections['default'].append(Setting('jobs', "2"))
+        sections = OrderedDict((("default", self.sections["default"]),
+                                ("copy", self.sections["default"])))
+        global_bears = {name: list(self.global_bears["default"])
+                        for name in sections}
+        local_bears = {name: list(self.local_bears["default"])
+                       for name in sections}
+        beginnings = []
+        section_results = list(execute_sections(
+            sections,
+            global_bears,
+            local_bears,
+            lambda *args: self.result_queue.put(args[2]),
+            beginnings.append,
+            None,
+            self.log_printer))
+
+        self.assertEqual([name for name, result in section_results],
+                         ["default", "copy"])
+        self.assertEqual(beginnings, [self.sections["default"]] * 2)
+        for name, results in section_results:
+            self.assertTrue(results[0])
+            self.assertEqual(len(results[1]), 1)
+            self.assertEqual(len(results[2]), 1)
+
+        self.assertEqual(list(execute_sections(OrderedDict(),
+                                               {},
+                                               {},
+                                               None,
+                                               None,
+                                               None,
+                                               self.log_printer)),
+                         [])
+
+    def test_get_result_transport(self):
+        section = Section("")
+        self.assertEqual(get_result_transport(section, self.log_printer),
+                         "queue")
+
+        section.append(Setting("result_transport", "Manager"))
+        self.assertEqual(get_result_transport(section, self.log_printer),
+                         "manager")
+
+        section.append(Setting("result_transport", "carrier pigeon"))
+        self.assertEqual(get_result_transport(section, self.log_printer),
+                         "queue")
+        self.assertEqual(self.log_queue.get().message,
+                         "Unknown result transport 'carrier pigeon'. "
+                         "Falling back to 'queue'.")
+
+    def test_get_file_collection(self):
+        section = Section("")
+        self.assertEqual(get_file_collection(section, self.log_printer),
+                         "filesystem")
+
+        section.append(Setting("file_collection", "Git"))
+        self.assertEqual(get_file_collection(section, self.log_printer),
+                         "git")
+
+        section.append(Setting("file_collection", "svn"))
+        self.assertEqual(get_file_collection(section, self.log_printer),
+                         "filesystem")
+        self.assertEqual(self.log_queue.get().message,
+                         "Unknown file collection 'svn'. Falling back to "
+                         "'filesystem'.")
+
+    def test_get_changed_files(self):
+        section = Section("")
+        outside_file = os.path.join(os.sep, "outside", "a", "repository.c")
+        self.assertIsNone(get_changed_files(section,
+                                            [outside_file],
+                                            self.log_printer))
+
+        section.append(Setting("changed_since", "HEAD"))
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, ".git"))
+            changed_file = os.path.join(root, "changed.c")
+            filenames = [changed_file,
+                         os.path.join(root, "unchanged.c"),
+                         outside_file]
+            with unittest.mock.patch(
+                    "coalib.processes.Processing.get_changed_git_files",
+                    return_value={changed_file}) as get_changed_git_files:
+                self.assertEqual(get_changed_files(section,
+                                                   filenames,
+                                                   self.log_printer),
+                                 {changed_file, outside_file})
+                get_changed_git_files.assert_called_once_with(root, "HEAD")
+        self.assertEqual(self.log_queue.get().message,
+                         "Unable to determine the files changed since "
+                         "'HEAD' in {!r}. Checking all of its files."
+                         .format(os.path.dirname(outside_file)))
+
+    def test_get_chunk_size(self):
+        section = Section("")
+        self.assertIsNone(get_chunk_size(section, self.log_printer))
+
+        section.append(Setting("chunk_size", "16"))
+        self.assertEqual(get_chunk_size(section, self.log_printer), 16)
+
+        for invalid in ("0", "many"):
+            section.append(Setting("chunk_size", invalid))
+            self.assertIsNone(get_chunk_size(section, self.log_printer))
+            self.assertEqual(self.log_queue.get().message,
+                             "The setting 'chunk_size' has to be a positive "
+                             "number. Sizing chunks automatically.")
+
+    def test_get_max_file_size(self):
+        section = Section("")
+        self.assertIsNone(get_max_file_size(section, self.log_printer))
+
+        section.append(Setting("max_file_size", "1000"))
+        self.assertEqual(get_max_file_size(section, self.log_printer), 1000)
+
+        for invalid in ("-1", "big"):
+            section.append(Setting("max_file_size", invalid))
+            self.assertIsNone(get_max_file_size(section, self.log_printer))
+            self.assertEqual(self.log_queue.get().message,
+                             "The setting 'max_file_size' has to be a "
+                             "positive number of bytes. Not limiting the "
+                             "size of files.")
+
+    def test_filter_files(self):
+        size = os.path.getsize(self.testcode_c_path)
+        filenames = [self.testcode_c_path, "non_existent_file", "a.PNG"]
+        self.assertEqual(filter_files(filenames, self.log_printer),
+                         filenames)
+        self.assertEqual(filter_files(filenames,
+                                      self.log_printer,
+                                      ignored_extensions=["png", ".c"]),
+                         ["non_existent_file"])
+        self.assertEqual(filter_files(filenames,
+                                      self.log_printer,
+                                      max_file_size=size - 1),
+                         ["non_existent_file", "a.PNG"])
+        self.assertEqual(filter_files(filenames,
+                                      self.log_printer,
+                                      max_file_size=size),
+                         filenames)
+
     def test_empty_run(self):
         self.sections['default'].append(Setting('jobs', "bogus!"))
         results = execute_section(self.sections["default"],
@@ -214,6 +558,187 @@ class ProcessingTest(unittest.TestCase):
         self.assertEqual(self.queue.get(timeout=0), ([first_global]))
         self.assertEqual(self.queue.get(timeout=0), ([first_global]))
 
+    def test_process_queues_sent_results(self):
+        ctrlq = queue.Queue()
+        result = Result.from_values("ABear", "A result.", file="f", line=1)
+        ignored_result = Result.from_values("ABear", "u", "f", 2, 1)
+
+        ctrlq.put((CONTROL_ELEMENT.LOCAL, ("f", [result, ignored_result])))
+        ctrlq.put((CONTROL_ELEMENT.LOCAL_FINISHED, None))
+        ctrlq.put((CONTROL_ELEMENT.GLOBAL_FINISHED, None))
+
+        local_result_dict = {}
+        process_queues(
+            [DummyProcess(control_queue=ctrlq) for i in range(2)],
+            ctrlq,
+            local_result_dict,
+            {},
+            {"f": ["first line\n",
+                   "second line  # ignore ABear\n",
+                   "third line\n"]},
+            lambda *args: self.queue.put(args[2]),
+            Section(""),
+            None,
+            self.log_printer)
+
+        self.assertEqual(self.queue.get(timeout=0), [result])
+        self.assertEqual(local_result_dict, {"f": [result]})
+
+    def test_process_queues_chunks(self):
+        ctrlq = queue.Queue()
+        first_result = Result.from_values("ABear", "first", file="f", line=1)
+        second_result = Result.from_values("ABear", "second", file="g")
+
+        ctrlq.put((CONTROL_ELEMENT.LOCAL, [("f", [first_result]),
+                                           ("g", [second_result])]))
+        ctrlq.put((CONTROL_ELEMENT.LOCAL, ["h"]))
+        ctrlq.put((CONTROL_ELEMENT.LOCAL_FINISHED, None))
+        ctrlq.put((CONTROL_ELEMENT.GLOBAL_FINISHED, None))
+
+        local_result_dict = {"h": []}
+        process_queues(
+            [DummyProcess(control_queue=ctrlq) for i in range(2)],
+            ctrlq,
+            local_result_dict,
+            {},
+            {"f": ["first line\n"], "g": [], "h": []},
+            lambda *args: self.queue.put(args[2]),
+            Section(""),
+            None,
+            self.log_printer)
+
+        self.assertEqual(self.queue.get(timeout=0), [first_result])
+        self.assertEqual(self.queue.get(timeout=0), [second_result])
+        self.assertEqual(self.queue.get(timeout=0), [])
+        self.assertEqual(sorted(local_result_dict), ["f", "g", "h"])
+
+    def get_cached_results(self, cache, file_dict, bears, section):
+        bear_indices, cache_entries = get_cached_results(cache,
+                                                         file_dict,
+                                                         bears,
+                                                         section)
+        cached_results = {filename: results
+                          for filename, (content_hash, bear_keys, results)
+                          in cache_entries.items()
+                          if not bear_keys}
+        return cached_results, bear_indices, cache_entries
+
+    def test_get_cached_results(self):
+        cache = FileCache(self.log_printer, "coala_test4", flush_cache=True)
+        section = Section("")
+        bears = [CachedTestBear(section, None),
+                 DependentCachedTestBear(section, None)]
+        file_dict = {"a.c": ("a\n",), "b.c": ("b\n",)}
+
+        cached_results, bear_indices, cache_entries = self.get_cached_results(
+            cache, file_dict, bears, section)
+        self.assertEqual(cached_results, {})
+        self.assertEqual(bear_indices, {})
+        self.assertEqual(sorted(cache_entries), ["a.c", "b.c"])
+
+        result = Result(bears[0], "test msg")
+        self.assertEqual(cache_results(cache,
+                                       "a.c",
+                                       [result],
+                                       cache_entries["a.c"]),
+                         [result])
+        # The bear of this result is unknown, nothing is cached
+        cache_results(cache,
+                      "b.c",
+                      [Result("UnknownBear", "test msg")],
+                      cache_entries["b.c"])
+
+        cached_results, bear_indices, cache_entries = self.get_cached_results(
+            cache, file_dict, bears, section)
+        self.assertEqual(cached_results, {"a.c": [result]})
+        self.assertEqual(bear_indices, {})
+        self.assertEqual(cache_entries["b.c"][2], [])
+
+        # Changing the dependent bear requires the dependency to run again
+        section.append(Setting("level", "2"))
+        cached_results, bear_indices, cache_entries = self.get_cached_results(
+            cache, file_dict, bears, section)
+        self.assertEqual(cached_results, {})
+        self.assertEqual(bear_indices, {})
+
+        # The results of other bears are kept
+        cache_results(cache, "a.c", [], cache_entries["a.c"])
+        cached_results, bear_indices, cache_entries = self.get_cached_results(
+            cache, file_dict, bears[1:], section)
+        self.assertEqual(cached_results, {"a.c": []})
+        cached_results, bear_indices, cache_entries = self.get_cached_results(
+            cache, {"a.c": ("changed\n",)}, bears, section)
+        self.assertEqual(cached_results, {})
+
+    def test_get_cached_results_partially(self):
+        cache = FileCache(self.log_printer, "coala_test5", flush_cache=True)
+        section = Section("")
+        bears = [CachedTestBear(section, None),
+                 DependentCachedTestBear(section, None)]
+        file_dict = {"a.c": ("a\n",)}
+        cache_entries = get_cached_results(cache,
+                                           file_dict,
+                                           bears[1:],
+                                           section)[1]
+        cache_results(cache, "a.c", [], cache_entries["a.c"])
+
+        cached_results, bear_indices, cache_entries = self.get_cached_results(
+            cache, file_dict, bears[::-1], section)
+        self.assertEqual(cached_results, {})
+        self.assertEqual(bear_indices, {"a.c": [1]})
+        result = Result(bears[0], "test msg")
+        self.assertEqual(cache_results(cache,
+                                       "a.c",
+                                       [result],
+                                       cache_entries["a.c"]),
+                         [result])
+
+        cached_results, bear_indices, cache_entries = self.get_cached_results(
+            cache, file_dict, bears, section)
+        self.assertEqual(cached_results, {"a.c": [result]})
+
+    def test_process_queues_cache(self):
+        cache = FileCache(self.log_printer, "coala_test6", flush_cache=True)
+        section = Section("")
+        bears = [CachedTestBear(section, None),
+                 DependentCachedTestBear(section, None)]
+        file_dict = {"a.c": ("a\n",), "b.c": ("b\n",), "c.c": ("c\n",)}
+        cache_entries = get_cached_results(cache,
+                                           {"c.c": file_dict["c.c"]},
+                                           bears,
+                                           section)[1]
+        cache_results(cache, "c.c", [], cache_entries["c.c"])
+        cache_entries = get_cached_results(cache, file_dict, bears, section)[1]
+        result = Result(bears[0], "test msg")
+
+        ctrlq = queue.Queue()
+        ctrlq.put((CONTROL_ELEMENT.LOCAL_FAILED,
+                   [("b.c", ["CachedTestBear"])]))
+        ctrlq.put((CONTROL_ELEMENT.LOCAL, [("a.c", [result]), ("b.c", [])]))
+        ctrlq.put((CONTROL_ELEMENT.LOCAL_FINISHED, None))
+        ctrlq.put((CONTROL_ELEMENT.GLOBAL_FINISHED, None))
+
+        local_result_dict = {}
+        process_queues([DummyProcess(ctrlq) for i in range(2)],
+                       ctrlq,
+                       local_result_dict,
+                       {},
+                       file_dict,
+                       lambda *args: self.queue.put(args[2]),
+                       section,
+                       cache,
+                       self.log_printer,
+                       cache_entries)
+        # The cached file is not announced by the processes
+        self.assertEqual(local_result_dict,
+                         {"a.c": [result], "b.c": [], "c.c": []})
+
+        cached_results, bear_indices, cache_entries = self.get_cached_results(
+            cache, file_dict, bears, section)
+        self.assertEqual(cached_results, {"a.c": [result], "c.c": []})
+        # The failed bear has to run again
+        self.assertEqual(bear_indices, {"b.c": [0]})
+
     def test_dead_processes(self):
         ctrlq = queue.Queue()
         # Not enough FINISH elements in the queue, processes start already dead
@@ -265,6 +790,100 @@ class ProcessingTest(unittest.TestCase):
             # python modules subprocess and os
             self.assertEqual(p.pid, pgid)
 
+    def test_fill_queue(self):
+        fill_queue(self.queue, ["a", "b"], 2)
+        self.assertEqual([self.queue.get(timeout=0) for i in range(4)],
+                         ["a", "b", None, None])
+        self.assertTrue(self.queue.empty())
+
+    def test_dispatch_files(self):
+        cache = FileCache(self.log_printer, "coala_test7", flush_cache=True)
+        section = Section("")
+        section.append(Setting("chunk_size", "1"))
+        bears = [CachedTestBear(section, None)]
+        filenames = [self.testcode_c_path, "non_existent_file"]
+        file_dict = LazyFileDict()
+        shared_file_dict = SharedFileDict()
+        view = shared_file_dict.view()
+        cache_entries = {}
+
+        dispatch_files(filenames, file_dict, shared_file_dict, self.queue, 2,
+                       section, bears, cache, cache_entries, self.log_printer)
+        chunk, chunk_file_dict = self.queue.get(timeout=0)
+        self.assertEqual(chunk, [self.testcode_c_path])
+        self.assertEqual(dict(chunk_file_dict), dict(file_dict))
+        self.assertEqual([self.queue.get(timeout=0) for i in range(2)],
+                         [None, None])
+        self.assertTrue(self.queue.empty())
+        # All loaded files are published.
+        self.assertEqual(dict(view), dict(file_dict))
+        self.assertEqual(list(cache_entries), [self.testcode_c_path])
+
+        # Files with cached results are not put to the queue.
+        cache_results(cache, self.testcode_c_path, [],
+                      cache_entries[self.testcode_c_path])
+        dispatch_files(filenames, LazyFileDict(), None, self.queue, 1,
+                       section, bears, cache, {}, self.log_printer)
+        self.assertEqual(self.queue.get(timeout=0), None)
+        self.assertTrue(self.queue.empty())
+        shared_file_dict.close()
+
+    def test_dispatch_files_failing(self):
+        section = Section("")
+        section.append(Setting("chunk_size", "1"))
+        filenames = [self.testcode_c_path, self.testcode_c_path + "2"]
+        shared_file_dict = SharedFileDict()
+        view = shared_file_dict.view()
+
+        def load_file_dict(file_dict, filename_list, log_printer):
+            file_dict[filename_list[0]] = b"line\n"
+            yield filename_list[0]
+            raise OSError
+
+        with unittest.mock.patch(
+                "coalib.processes.Processing.load_file_dict",
+                load_file_dict):
+            self.assertRaises(OSError, dispatch_files, filenames,
+                              LazyFileDict(), shared_file_dict, self.queue,
+                              2, section, [], None, {}, self.log_printer)
+
+        # The processes are released anyway and the files loaded until then
+        # are published.
+        self.assertEqual([self.queue.get(timeout=0) for i in range(2)],
+                         [None, None])
+        self.assertTrue(self.queue.empty())
+        self.assertEqual(list(view), [self.testcode_c_path])
+        shared_file_dict.close()
+
+    def test_run_failing_dispatch(self):
+        self.sections['default'].append(Setting('jobs', "2"))
+        with unittest.mock.patch(
+                "coalib.processes.Processing.load_file_dict",
+                side_effect=OSError):
+            self.assertRaises(OSError,
+                              execute_section,
+                              self.sections["default"],
+                              self.global_bears["default"],
+                              self.local_bears["default"],
+                              lambda *args: self.result_queue.put(args[2]),
+                              None,
+                              self.log_printer)
+        # The processes are not left waiting.
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_process_queues_crashed_processes(self):
+        control_queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=os._exit, args=(1,))
+        process.start()
+        # The process never announces that it is finished.
+        self.assertFalse(process_queues([process, threading.Thread()],
+                                        control_queue, {}, {}, {},
+                                        lambda *args: None,
+                                        Section(""),
+                                        None,
+                                        self.log_printer))
+        process.join()
+
     def test_filter_raising_callables(self):
         class A(Exception):
             pass
@@ -306,6 +925,50 @@ class ProcessingTest(unittest.TestCase):
                          msg="files in file_dict should not be editable")
         self.assertEqual("Files that will be checked:\n" + self.testcode_c_path,
                          self.log_printer.log_queue.get().message)
+        self.assertRegex(self.log_printer.log_queue.get().message,
+                         "Read 1 files with [0-9]+ bytes in [0-9.]+ seconds")
+
+    def test_get_file_dict_binary_file(self):
+        with prepare_file([], None) as (lines, filename):
+            with open(filename, "wb") as binary_file:
+                binary_file.write(b"\x89PNG\r\n\x1a\n\0\0\0\rIHDR")
+            self.assertEqual(get_file_dict([filename], self.log_printer), {})
+            self.assertEqual(self.log_queue.get().message,
+                             "Leaving out the binary file '{}'."
+                             .format(filename))
+
+    def test_get_file_dict_line_endings(self):
+        with prepare_file([], None) as (lines, filename):
+            with open(filename, "wb") as text_file:
+                text_file.write(b"windows\r\nmac\runix\n")
+            file_dict = get_file_dict([filename], self.log_printer)
+            # The raw contents are kept until the file is accessed.
+            self.assertEqual(file_dict.get_content(filename),
+                             b"windows\r\nmac\runix\n")
+            self.assertEqual(file_dict,
+                             {filename: ("windows\n", "mac\n", "unix\n")})
+
+    def test_get_file_dict_non_unicode_file(self):
+        with prepare_file([], None) as (lines, filename):
+            with open(filename, "wb") as text_file:
+                text_file.write("latin-1 ä\n".encode("latin-1"))
+            self.assertEqual(get_file_dict([filename], self.log_printer), {})
+            self.assertEqual(self.log_queue.get().message,
+                             "Failed to read file '{}'. It seems to contain "
+                             "non-unicode characters. Leaving it "
+                             "out.".format(filename))
+
+    def test_load_files(self):
+        filenames = [self.testcode_c_path,
+                     "non_existent_file",
+                     self.testcode_c_path]
+        loaded = list(load_files(filenames, thread_count=2))
+        self.assertEqual([filename for filename, file in loaded], filenames)
+        self.assertEqual(loaded[0][1], loaded[2][1])
+        self.assertIsInstance(loaded[0][1], bytes)
+        self.assertIsInstance(loaded[1][1], OSError)
+
+        self.assertEqual(list(load_files([])), [])
 
     def test_get_file_dict_non_existent_file(self):
         file_dict = get_file_dict(["non_existent_file"], self.log_printer)
@@ -446,6 +1109,29 @@ class ProcessingTest(unittest.TestCase):
         self.assertEqual(source_range.end.line, 1)
         self.assertEqual(source_range.end.column, 14)
 
+    def test_get_ignore_ranges(self):
+        class ReadFileDict(dict):
+            read_files = []
+
+            def __getitem__(self, key):
+                self.read_files.append(key)
+                return dict.__getitem__(self, key)
+
+        file_dict = ReadFileDict({
+            'f': ('# Ignore aBear\n', 'a_string = "Ignored"\n'),
+            'g': ('# Ignore all\n', 'b_string = "Ignored"\n')})
+        ignore_ranges = get_ignore_ranges(file_dict)
+        self.assertEqual(file_dict.read_files, [])
+
+        result = Result.from_values("ABear", "message", "f", 2, 1)
+        self.assertTrue(check_result_ignore(result, ignore_ranges))
+        result = Result.from_values("BBear", "message", "f", 2, 1)
+        self.assertFalse(check_result_ignore(result, ignore_ranges))
+        result = Result.from_values("ABear", "message", "unknown", 2, 1)
+        self.assertFalse(check_result_ignore(result, ignore_ranges))
+        # Every file is only searched once and only if results affect it.
+        self.assertEqual(file_dict.read_files, ['f'])
+
 
 class ProcessingTest_GetDefaultActions(unittest.TestCase):
 
@@ -516,7 +1202,7 @@ class ProcessingTest_AutoapplyActions(unittest.TestCase):
         # Use a result where no default action is supplied for and another one
         # where the action is not applicable.
         old_is_applicable = ApplyPatchAction.is_applicable
-        ApplyPatchAction.is_applicable = lambda *args: False
+        ApplyPatchAction.is_applicable = staticmethod(lambda *args: False)
 
         self.section.append(Setting(
             "default_actions",
@@ -532,7 +1218,7 @@ class ProcessingTest_AutoapplyActions(unittest.TestCase):
                          "'YBear' is not applicable. Action not applied.")
         self.assertTrue(self.log_queue.empty())
 
-        ApplyPatchAction.is_applicable = old_is_applicable
+        ApplyPatchAction.is_applicable = staticmethod(old_is_applicable)
 
     def test_applicable_action(self):
         # Use a result whose action can be successfully applied.
@@ -615,3 +1301,66 @@ class ProcessingTest_PrintResult(unittest.TestCase):
         retval, newres = print_result(results, {}, 0, lambda *args: None,
                                       self.section, self.log_printer, {}, [])
         self.assertNotEqual(newres, [])
+
+
+class ProcessingBenchmarkTest(unittest.TestCase):
+    """
+    Measures how long sections take with different settings. The budgets are
+    loose, they only catch the optimizations getting lost.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.log_printer = LogPrinter(NullPrinter())
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_files(self, count, lines=20):
+        for index in range(count):
+            path = os.path.join(self.directory, "{}.c".format(index))
+            with open(path, "w") as file:
+                file.write("line\n" * lines)
+
+    def time_section(self, local_bears, *settings):
+        section = Section("benchmark")
+        section.append(Setting("files", os.path.join(self.directory, "*.c")))
+        section.append(Setting("jobs", "2"))
+        for key, value in settings:
+            section.append(Setting(key, value))
+
+        start = time.perf_counter()
+        execute_section(section, [], local_bears, lambda *args: None, None,
+                        self.log_printer)
+        return time.perf_counter() - start
+
+    def test_result_transport(self):
+        throughputs = {}
+        for file_count in (50, 200):
+            self.write_files(file_count)
+            for transport in RESULT_TRANSPORTS:
+                throughputs[file_count, transport] = (
+                    file_count / self.time_section(
+                        [ManyResultsTestBear],
+                        ("result_transport", transport)))
+
+        # Results sent directly to the main process do not wait for the
+        # manager's server process.
+        self.assertGreater(throughputs[200, "queue"],
+                           throughputs[200, "manager"] * 0.8)
+        # The fixed costs of a section get spread over more files.
+        self.assertGreater(throughputs[200, "queue"],
+                           throughputs[50, "queue"] * 0.75)
+
+    def test_chunked_dispatch(self):
+        self.write_files(1500, lines=1)
+        # The best of two runs is compared, the first may pay for warming up
+        # the disk cache.
+        per_file = min(self.time_section([NoResultsTestBear],
+                                         ("chunk_size", "1"))
+                       for i in range(2))
+        chunked = min(self.time_section([NoResultsTestBear])
+                      for i in range(2))
+
+        # Sending the files in chunks saves a round trip per file.
+        self.assertLess(chunked, per_file * 1.1)
@@ -0,0 +1,145 @@
+import multiprocessing
+import os
+import pickle
+import unittest
+from unittest.mock import patch
+
+from coalib.processes.LazyFileDict import LazyFileDict
+from coalib.processes.SharedFileDict import SharedFileDict
+
+
+def get_file(file_dict, filename, result_queue):
+    result_queue.put(file_dict[filename])
+
+
+class SharedFileDictTest(unittest.TestCase):
+
+    def setUp(self):
+        self.file_dict = {"a": ("first line\n", "\tsecond line\n"),
+                          "b": ("no trailing newline\n", "last"),
+                          "c": ("unicode → line\fwith a form feed\n",),
+                          "empty": ()}
+        self.uut = SharedFileDict(self.file_dict)
+
+    def tearDown(self):
+        self.uut.close()
+
+    def test_contents(self):
+        self.assertEqual(len(self.uut), len(self.file_dict))
+        self.assertEqual(sorted(self.uut), sorted(self.file_dict))
+        self.assertEqual(dict(self.uut), self.file_dict)
+        self.assertIn("a", self.uut)
+        self.assertNotIn("d", self.uut)
+        for filename, file in self.file_dict.items():
+            self.assertEqual(self.uut[filename], file)
+            self.assertIsInstance(self.uut[filename], tuple)
+
+        with self.assertRaises(KeyError):
+            self.uut["d"]
+
+    def test_empty(self):
+        uut = SharedFileDict({})
+        self.assertEqual(len(uut), 0)
+        uut.close()
+
+        uut = SharedFileDict({"empty": ()})
+        self.assertEqual(uut["empty"], ())
+        uut.close()
+
+    def test_restricted_to(self):
+        view = self.uut.restricted_to(["b", "d"])
+        self.assertEqual(dict(view), {"b": self.file_dict["b"]})
+
+    def test_pickle(self):
+        copy = pickle.loads(pickle.dumps(self.uut))
+        self.assertEqual(dict(copy), self.file_dict)
+        # Closing a copy leaves the buffer intact
+        copy.close()
+        self.assertEqual(self.uut["a"], self.file_dict["a"])
+
+    def test_processes(self):
+        result_queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=get_file,
+                                          args=(self.uut, "b", result_queue))
+        process.start()
+        self.assertEqual(result_queue.get(timeout=10), self.file_dict["b"])
+        process.join()
+
+    def test_close(self):
+        path = self.uut._path
+        self.assertTrue(os.path.isfile(path))
+        self.uut["a"]
+        self.uut.publish()
+        self.uut.close()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(path + ".index"))
+        # Closing twice is fine
+        self.uut.close()
+
+    def test_raw_contents(self):
+        uut = SharedFileDict({"a": b"windows\r\nmac\rlast", "b": ("b\n",)})
+        self.assertEqual(dict(uut), {"a": ("windows\n", "mac\n", "last"),
+                                     "b": ("b\n",)})
+        uut.close()
+
+    def test_add(self):
+        view = self.uut.restricted_to(["a"])
+        complete_view = self.uut.view()
+        self.assertEqual(self.uut["a"], self.file_dict["a"])
+
+        self.uut.add("d", ("added\n",))
+        self.uut.add("e", b"added as bytes")
+        self.assertEqual(self.uut["d"], ("added\n",))
+        self.assertEqual(self.uut["e"], ("added as bytes",))
+        self.assertEqual(list(view), ["a"])
+        self.assertEqual(dict(self.uut.restricted_to(["d"])),
+                         {"d": ("added\n",)})
+
+        self.uut.publish()
+        copy = pickle.loads(pickle.dumps(complete_view))
+        self.assertEqual(sorted(copy), ["a", "b", "c", "d", "e", "empty"])
+        self.assertEqual(copy["e"], ("added as bytes",))
+
+    def test_add_processes(self):
+        complete_view = self.uut.view()
+        result_queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=get_file,
+                                          args=(complete_view,
+                                                "d",
+                                                result_queue))
+        self.uut.add("d", ("added\n",))
+        self.uut.publish()
+        process.start()
+        self.assertEqual(result_queue.get(timeout=10), ("added\n",))
+        process.join()
+
+    def test_view_unpublished(self):
+        with self.assertRaises(OSError):
+            len(self.uut.view())
+
+    def test_decoded_files(self):
+        with patch.object(LazyFileDict, "decode",
+                          wraps=LazyFileDict.decode) as decode:
+            for i in range(3):
+                self.assertEqual(dict(self.uut), self.file_dict)
+            # Every file is decoded only once.
+            self.assertEqual(decode.call_count, len(self.file_dict))
+
+            # Adding a file again replaces the decoded one.
+            self.uut.add("a", ("changed\n",))
+            self.assertEqual(self.uut["a"], ("changed\n",))
+            self.assertEqual(decode.call_count, len(self.file_dict) + 1)
+
+        # The least recently used files are decoded again once the decoded
+        # files get too big.
+        with patch("coalib.processes.SharedFileDict.DECODED_FILES_SIZE",
+                   len("".join(self.file_dict["b"]))), \
+                patch.object(LazyFileDict, "decode",
+                             wraps=LazyFileDict.decode) as decode:
+            view = self.uut.restricted_to(["a", "b"])
+            for i in range(2):
+                self.assertEqual(view["a"], ("changed\n",))
+                self.assertEqual(view["b"], self.file_dict["b"])
+            self.assertEqual(decode.call_count, 4)
+            self.assertEqual(view["b"], self.file_dict["b"])
+            self.assertEqual(decode.call_count, 4)
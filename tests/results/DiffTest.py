@@ -1,4 +1,8 @@
+import copy
+import difflib
 import json
+import pickle
+import time
 import unittest
 from unittest.case import SkipTest
 
@@ -126,6 +130,31 @@ class DiffTest(unittest.TestCase):
         del result_file[2]
         self.assertEqual(self.uut.modified, result_file)
 
+    def test_modified_cache(self):
+        self.uut.change_line(3, "3", "3.changed")
+        modified = self.uut.modified
+        self.assertEqual(modified, ["1", "2", "3.changed", "4"])
+        # The modified file is not built again until the diff changes.
+        self.assertIs(self.uut.modified, modified)
+
+        self.uut.add_lines(1, ["1.1"])
+        self.assertIsNot(self.uut.modified, modified)
+        self.assertEqual(self.uut.modified,
+                         ["1", "1.1", "2", "3.changed", "4"])
+        copied = copy.copy(self.uut)
+        copied.delete_line(4)
+        self.assertEqual(copied.modified, ["1", "1.1", "2", "3.changed"])
+        self.assertEqual(self.uut.modified,
+                         ["1", "1.1", "2", "3.changed", "4"])
+
+        self.uut.delete = True
+        self.assertEqual(self.uut.modified, [])
+        self.uut.delete = False
+
+        unpickled = pickle.loads(pickle.dumps(self.uut))
+        self.assertIsNone(unpickled._modified)
+        self.assertEqual(unpickled, self.uut)
+
     def test_addition(self):
         self.assertRaises(TypeError, self.uut.__add__, 5)
 
@@ -147,6 +176,33 @@ class DiffTest(unittest.TestCase):
         # Make sure it didn't happen in place!
         self.assertNotEqual(self.uut.modified, result_file)
 
+        # Changing the result must not change the summands either.
+        result.add_lines(4, ["5"])
+        self.assertEqual(result.modified, ["1", "2", "2", "5"])
+        self.assertEqual((self.uut + other).modified, result_file)
+
+    def test_inplace_addition(self):
+        self.assertRaises(TypeError, self.uut.__iadd__, 5)
+
+        uut = self.uut
+        other = Diff(self.file)
+        other.change_line(2, "2", "3")
+        other.add_lines(2, ["4"])
+        self.uut.delete_line(1)
+        self.uut.add_lines(1, ["5"])
+        self.uut += other
+        self.assertIs(self.uut, uut)
+        self.assertEqual(self.uut.modified, ["5", "3", "4", "3", "4"])
+        self.assertEqual(other.modified, ["1", "3", "4", "3", "4"])
+
+        # Nothing is changed if the diffs conflict.
+        conflicting = Diff(self.file, rename="some.py")
+        conflicting.delete_line(4)
+        conflicting.add_lines(1, ["6"])
+        self.assertRaises(ConflictError, self.uut.__iadd__, conflicting)
+        self.assertEqual(self.uut.modified, ["5", "3", "4", "3", "4"])
+        self.assertEqual(self.uut.rename, False)
+
     def test_addition_rename(self):
         uut = Diff(self.file, rename=False)
         other = Diff(self.file, rename=False)
@@ -187,6 +243,23 @@ class DiffTest(unittest.TestCase):
         self.uut = Diff.from_string_arrays(a, b)
         self.assertEqual(self.uut.modified, b)
 
+    def test_from_string_arrays_repeated_lines(self):
+        a = ["x", "a", "x", "b", "x", "x", "c", "y"]
+        b = ["x", "x", "b", "x", "c", "c", "x", "y", "x"]
+        self.uut = Diff.from_string_arrays(a, b)
+        self.assertEqual(self.uut.modified, b)
+
+        # Lines that are not unique get compared between the unique ones.
+        a = ["{\n", "}\n"] * 1000
+        b = list(a)
+        for index in range(0, len(b), 50):
+            b[index] = "changed\n"
+        b.insert(1000, "inserted\n")
+        del b[10]
+        self.uut = Diff.from_string_arrays(a, b)
+        self.assertEqual(self.uut.modified, b)
+        self.assertEqual(self.uut.stats(), (41, 41))
+
     def test_from_clang_fixit(self):
         try:
             from clang.cindex import Index, LibclangError
@@ -260,3 +333,55 @@ class DiffTest(unittest.TestCase):
         self.uut.delete = True
         self.assertEqual(self.uut.modified, [])
         self.uut.delete = False
+
+
+class DiffBenchmarkTest(unittest.TestCase):
+    """
+    Measures how long comparing big files takes. The budgets are loose, they
+    only catch the optimizations getting lost.
+    """
+
+    @staticmethod
+    def make_files(line_count, change_interval):
+        """
+        Creates the lines of a file with every fifth line empty and a version
+        of it with every ``change_interval``-th line changed.
+        """
+        file = ["    line {}\n".format(index) if index % 5 else "\n"
+                for index in range(line_count)]
+        new_file = list(file)
+        for index in range(0, line_count, change_interval):
+            new_file[index] = "    changed {}\n".format(index)
+        return file, new_file
+
+    @staticmethod
+    def time_best(function, *args):
+        times = []
+        for _ in range(3):
+            start = time.perf_counter()
+            function(*args)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    def test_from_string_arrays_against_difflib(self):
+        file, new_file = self.make_files(5000, 10)
+        self.assertEqual(Diff.from_string_arrays(file, new_file).modified,
+                         new_file)
+
+        # Comparing the whole files with difflib is how diffs were created
+        # before, it takes about 30 times as long.
+        difflib_time = self.time_best(
+            lambda: difflib.SequenceMatcher(None,
+                                            file,
+                                            new_file).get_opcodes())
+        diff_time = self.time_best(Diff.from_string_arrays, file, new_file)
+        self.assertLess(diff_time, difflib_time / 3)
+
+    def test_from_string_arrays_scaling(self):
+        # Four times the lines take about five times as long, comparing them
+        # all with each other would take sixteen times as long.
+        small_time = self.time_best(Diff.from_string_arrays,
+                                    *self.make_files(10000, 10))
+        big_time = self.time_best(Diff.from_string_arrays,
+                                  *self.make_files(40000, 10))
+        self.assertLess(big_time, small_time * 10)
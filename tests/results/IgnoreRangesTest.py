@@ -0,0 +1,58 @@
+import unittest
+
+from coalib.results.IgnoreRanges import IgnoreRanges
+from coalib.results.Result import Result
+from coalib.results.SourceRange import SourceRange
+
+
+class IgnoreRangesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.uut = IgnoreRanges([
+            (["abear"], SourceRange.from_values("f", 3, 1, 4, 10)),
+            (["abear"], SourceRange.from_values("f", 10, 5, 20, 1)),
+            (["abear"], SourceRange.from_values("f", 12, 1, 12, 3)),
+            (["b*"], SourceRange.from_values("g", 1, 1, 1, 10))])
+
+    def check(self, origin, *args):
+        return self.uut.is_ignored(Result.from_values(origin, "msg", *args))
+
+    def test_overlaps(self):
+        self.assertFalse(self.check("ABear", "f", 1, 1))
+        self.assertTrue(self.check("ABear", "f", 3, 1))
+        self.assertTrue(self.check("ABear", "f", 4, 10))
+        self.assertFalse(self.check("ABear", "f", 4, 11))
+        self.assertTrue(self.check("ABear", "f", 5, 1, 10, 5))
+        self.assertFalse(self.check("ABear", "f", 5, 1, 10, 4))
+        # Lies within the long range only, not the short one starting later.
+        self.assertTrue(self.check("ABear", "f", 15))
+        self.assertFalse(self.check("ABear", "f", 21))
+        self.assertFalse(self.check("ABear", "other file", 3, 1))
+
+    def test_whole_lines_and_files(self):
+        # Positions without a column or line come first, like in ranges.
+        self.assertFalse(self.check("ABear", "f", 3))
+        self.assertTrue(self.check("ABear", "f", 20))
+        self.assertFalse(self.check("ABear", "f"))
+        self.uut.add([], SourceRange.from_values("f", 30))
+        self.assertFalse(self.check("ABear", "f", 30, 4))
+        self.assertTrue(self.check("OtherBear", "f", 30))
+        self.assertFalse(self.check("OtherBear", "f", 3, 1))
+
+    def test_bears(self):
+        self.assertFalse(self.check("OtherBear", "f", 3, 1))
+        self.assertTrue(self.check("BBear", "g", 1, 1))
+        self.assertFalse(self.check("ABear", "g", 1, 1))
+
+    def test_multiple_affected_ranges(self):
+        result = Result("ABear",
+                        "msg",
+                        affected_code=(SourceRange.from_values("f", 1, 1),
+                                       SourceRange.from_values("f", 11, 1)))
+        self.assertTrue(self.uut.is_ignored(result))
+        self.assertFalse(self.uut.is_ignored(Result("ABear", "msg")))
+
+    def test_iter(self):
+        self.assertEqual(len(self.uut), 4)
+        self.assertEqual([bears for bears, source_range in self.uut],
+                         [["abear"], ["abear"], ["abear"], ["b*"]])
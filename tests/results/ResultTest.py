@@ -84,6 +84,10 @@ class ResultTest(unittest.TestCase):
 
         self.assertEqual(file_dict, expected_file_dict)
 
+        # Changing the applied file does not change the diff.
+        file_dict["f_a"].append("4")
+        self.assertEqual(diff.modified, ["1", "3_changed"])
+
     def test_add(self):
         file_dict = {
             "f_a": ["1", "2", "3"],